@@ -0,0 +1,187 @@
+"""
+Document AI Text Benchmark - Throughput of INCOTERM detection, misc-charge
+extraction and the PDF fallback, with a regression gate
+
+Run from backend/:
+
+    python -m benchmarks.bench_document_ai                  # print results
+    python -m benchmarks.bench_document_ai --save-baseline  # record baselines/document_ai.json
+    python -m benchmarks.bench_document_ai --check [--threshold 0.25]
+
+--check exits 1 when a case returns the wrong answer or got slower than
+its baseline by more than the threshold, so CI can run it as a gate.
+Timings are divided by a fixed calibration workload measured in the
+same run, which keeps a baseline usable across similar machines; still,
+record the baseline on the runner that does the checking. The gate uses
+each case's fastest run (as timeit does): medians on shared machines
+swing with whatever else is running, the minimum hardly moves.
+
+Inputs come from benchmarks/document_ai_corpus.py (small, large, early,
+none, adversarial). The PDF cases need PyMuPDF and are skipped without it:
+pdf_fallback_* extracts the whole text layer, pdf_scan_* streams pages from
+a file on disk into IncotermScanner and stops at the first code, as
+process_packing_list does. Both call PyMuPDF directly, not through the
+parse pool, so they time parsing rather than process hand-off.
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import closing
+
+from benchmarks import document_ai_corpus as corpus
+from services.document_ai import (
+    IncotermScanner, find_incoterm, extract_misc_charges, iter_pdf_pages
+)
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "document_ai.json")
+
+# Each case runs at least this long (and at least MIN_RUNS times)
+MIN_SECONDS = 0.5
+MIN_RUNS = 5
+
+DEFAULT_THRESHOLD = 0.25
+
+
+def _cases() -> list:
+    """(name, function, input, expected result)."""
+    incoterms = {"small": "FOB", "large": "CIF", "early": "CFR", "none": None, "adversarial": "EXW"}
+    charges = {"small": 1250.0, "large": 48300.5, "early": 7420.0, "none": 0.0, "adversarial": 310.0}
+
+    cases = []
+    for size in corpus.SIZES:
+        cases.append((f"incoterm_{size}", lambda text: find_incoterm(text)["term"],
+                      corpus.packing_list(size), incoterms[size]))
+    for size in corpus.SIZES:
+        cases.append((f"misc_charges_{size}", extract_misc_charges, corpus.invoice(size), charges[size]))
+
+    try:
+        import fitz  # noqa: F401 - PyMuPDF
+    except ImportError:
+        print("⚠️ PyMuPDF not installed - skipping PDF fallback cases")
+        return cases
+    for size in ("small", "large"):
+        text = corpus.packing_list(size)
+        cases.append((f"pdf_fallback_{size}", lambda data: len("".join(iter_pdf_pages(data))) > 0,
+                      corpus.pdf(text), True))
+    for size in ("large", "early", "none"):
+        cases.append((f"pdf_scan_{size}", _scan_pdf, _pdf_file(corpus.packing_list(size)), incoterms[size]))
+    return cases
+
+
+def _pdf_file(text: str) -> str:
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+        f.write(corpus.pdf(text))
+    return f.name
+
+
+def _scan_pdf(path: str):
+    scanner = IncotermScanner()
+    with closing(iter_pdf_pages(path)) as pages:
+        for page in pages:
+            if scanner.feed(page):
+                break
+    return scanner.result()["term"]
+
+
+def _calibration_ms() -> float:
+    """A fixed regex + Python workload; timings are reported relative to it."""
+    text = "CARTON 40 PCS GROSS 12.50 KG NET 11.00 KG MODEL 1234-A\n" * 2000
+    pattern = re.compile(r"\b(\d+(?:\.\d+)?)\s*KG\b")
+    return min(_measure(lambda data: sum(float(m) for m in pattern.findall(data)), text))
+
+
+def _measure(func, data) -> list:
+    runs = []
+    started_all = time.perf_counter()
+    while len(runs) < MIN_RUNS or time.perf_counter() - started_all < MIN_SECONDS:
+        started = time.perf_counter()
+        func(data)
+        runs.append((time.perf_counter() - started) * 1000)
+    return runs
+
+
+def run() -> dict:
+    _calibration_ms()  # warm up first; the first runs in a fresh process are slow
+    calibration = _calibration_ms()
+    results = {"calibration_ms": round(calibration, 4), "cases": {}}
+    print(f"{'case':<26}{'size':>10}{'best':>12}{'median':>12}{'MB/s':>10}  result")
+    for name, func, data, expected in _cases():
+        actual = func(data)
+        runs = _measure(func, data)
+        best, median = min(runs), statistics.median(runs)
+        size = os.path.getsize(data) if name.startswith("pdf_scan") else len(data)
+        results["cases"][name] = {
+            "bytes": size,
+            "best_ms": round(best, 4),
+            "median_ms": round(median, 4),
+            "relative": round(best / calibration, 4),
+            "mb_per_s": round(size / 1e6 / (best / 1000), 2),
+            "correct": actual == expected,
+        }
+        status = "ok" if actual == expected else f"WRONG: {actual!r} (expected {expected!r})"
+        print(f"{name:<26}{size // 1024:>8}KB{best:>10.3f}ms{median:>10.3f}ms"
+              f"{results['cases'][name]['mb_per_s']:>10}  {status}")
+        if name.startswith("pdf_scan"):
+            os.unlink(data)
+    return results
+
+
+def check(results: dict, baseline: dict, threshold: float) -> list:
+    """Problems found: wrong answers, and cases slower than baseline * (1 + threshold)."""
+    problems = []
+    for name, case in results["cases"].items():
+        if not case["correct"]:
+            problems.append(f"{name}: wrong result")
+        before = baseline["cases"].get(name)
+        if not before:
+            continue
+        ratio = case["relative"] / before["relative"]
+        if ratio > 1 + threshold:
+            problems.append(f"{name}: {ratio:.2f}x the baseline time "
+                            f"({case['best_ms']}ms vs {before['best_ms']}ms)")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark services/document_ai text processing")
+    parser.add_argument("--save-baseline", action="store_true", help=f"Write results to {BASELINE_FILE}")
+    parser.add_argument("--check", action="store_true", help="Exit 1 on wrong results or regressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown over the baseline (0.25 = 25%%)")
+    parser.add_argument("--output", default=None, help="Also write results as JSON here")
+    args = parser.parse_args()
+
+    results = run()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(BASELINE_FILE), exist_ok=True)
+        with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"✅ Baseline written to {BASELINE_FILE}")
+
+    if args.check:
+        if not os.path.exists(BASELINE_FILE):
+            sys.exit(f"❌ No baseline at {BASELINE_FILE} - run with --save-baseline first")
+        with open(BASELINE_FILE, encoding="utf-8") as f:
+            baseline = json.load(f)
+        problems = check(results, baseline, args.threshold)
+        if problems:
+            print("❌ Document AI benchmark regressions:")
+            for problem in problems:
+                print(f"   {problem}")
+            sys.exit(1)
+        print(f"✅ Within {args.threshold:.0%} of the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Serialization Benchmark - JSON cost of a large list response, before and after orjson
+
+Both variants serve the same synthetic /new-jobs-style payload through a
+real FastAPI app (in-process, TestClient), so the numbers include
+FastAPI's response handling and rendering:
+
+- before: per-row .isoformat() loop, dict returned (jsonable_encoder + JSONResponse)
+- after:  rows_to_dicts, ORJSONResponse returned by the handler (serialization.py),
+          so jsonable_encoder is skipped and orjson gets the native values
+
+Run from backend/:  python -m benchmarks.bench_serialization [rows]
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from serialization import ORJSONResponse, rows_to_dicts
+
+COLUMNS = ['id', 'job_no', 'customer_id', 'status', 'eta', 'etd', 'weight',
+           'created_at', 'updated_at']
+DATE_COLUMNS = ('eta', 'etd', 'created_at', 'updated_at')
+
+REQUESTS = 20
+
+
+def _rows(count: int) -> list:
+    base = datetime(2024, 1, 1, 8, 30)
+    return [
+        (i, f"JOB-{i:06d}", i % 97, "in_transit", base + timedelta(days=i % 30),
+         base + timedelta(days=i % 20), Decimal("1250.75"),
+         base + timedelta(minutes=i), base + timedelta(minutes=2 * i))
+        for i in range(count)
+    ]
+
+
+def _before_app(rows: list) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/new-jobs", response_model=dict)
+    def get_all_new_jobs():
+        jobs = []
+        for row in rows:
+            job = dict(zip(COLUMNS, row))
+            for key in DATE_COLUMNS:
+                if job[key]:
+                    job[key] = job[key].isoformat()
+            jobs.append(job)
+        return {"jobs": jobs, "count": len(jobs)}
+
+    return app
+
+
+def _after_app(rows: list) -> FastAPI:
+    app = FastAPI(default_response_class=ORJSONResponse)
+
+    @app.get("/new-jobs", response_model=dict)
+    def get_all_new_jobs():
+        jobs = rows_to_dicts(COLUMNS, rows)
+        return ORJSONResponse({"jobs": jobs, "count": len(jobs)})
+
+    return app
+
+
+def _time(client: TestClient) -> tuple:
+    body = client.get("/new-jobs").json()  # warm-up
+    best = float("inf")
+    for _ in range(REQUESTS):
+        start = time.perf_counter()
+        client.get("/new-jobs")
+        best = min(best, time.perf_counter() - start)
+    return best, body
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    rows = _rows(count)
+
+    before, before_body = _time(TestClient(_before_app(rows)))
+    after, after_body = _time(TestClient(_after_app(rows)))
+    assert before_body == after_body, "responses differ"
+
+    print(f"GET /new-jobs with {count} rows, best of {REQUESTS}")
+    print(f"  before (isoformat loop, JSONResponse):  {before * 1000:8.2f} ms")
+    print(f"  after  (native rows, ORJSONResponse):   {after * 1000:8.2f} ms")
+    print(f"  saved {(before - after) * 1000:.2f} ms per request ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
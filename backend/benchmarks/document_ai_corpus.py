@@ -0,0 +1,151 @@
+"""
+Synthetic OCR corpus for the services/document_ai benchmarks
+
+Deterministic (seeded) stand-ins for what Document AI / PyMuPDF hand
+back for packing lists and invoices:
+
+- small:       a one-page document, the term / charge in the usual place
+- large:       a multi-page document (hundreds of KB) with the match near the end
+- early:       the same size, with the match on the first page
+- none:        a large document with nothing to find, so every pattern scans it all
+- adversarial: near misses - terms inside longer words, keywords followed by
+               long whitespace runs (OCR'd table layouts) and no amount
+
+Write the corpus to disk (text files and PDFs) to look at it:
+
+    python -m benchmarks.document_ai_corpus --out /tmp/doc_corpus
+"""
+
+import argparse
+import os
+import random
+
+SEED = 1234
+
+PRODUCTS = ["CERAMIC TILES", "COTTON YARN", "STEEL FASTENERS", "LED PANELS", "PVC RESIN",
+            "AUTO PARTS", "GLASSWARE", "SOLAR MODULES", "OFFICE CHAIRS", "KITCHEN SINKS"]
+PORTS = ["SHANGHAI", "NINGBO", "SINGAPORE", "BUSAN", "JEBEL ALI", "ROTTERDAM"]
+
+SIZES = ["small", "large", "early", "none", "adversarial"]
+
+
+def _line_items(rng: random.Random, count: int) -> list:
+    lines = []
+    for i in range(count):
+        cartons = rng.randint(1, 400)
+        lines.append(
+            f"{i + 1:>4}  {rng.choice(PRODUCTS):<18} MODEL {rng.randint(1000, 9999)}-{rng.choice('ABCDEFGH')}"
+            f"   {cartons:>4} CTNS   {cartons * rng.randint(6, 48):>6} PCS"
+            f"   GW {rng.uniform(10, 900):8.2f} KG   NW {rng.uniform(8, 850):8.2f} KG"
+            f"   {rng.uniform(0.1, 12):6.3f} CBM"
+        )
+    return lines
+
+
+def _header(rng: random.Random, title: str) -> list:
+    return [
+        title,
+        f"SHIPPER: {rng.choice(PRODUCTS).split()[0]} INDUSTRIAL CO., LTD",
+        "CONSIGNEE: 4S IMPORTS PVT LTD, CHENNAI, INDIA",
+        f"PORT OF LOADING: {rng.choice(PORTS)}    PORT OF DISCHARGE: CHENNAI",
+        f"INVOICE NO: INV{rng.randint(100000, 999999)}    DATE: 2024-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}",
+        "",
+    ]
+
+
+def _pages(rng: random.Random, title: str, pages: int, items_per_page: int = 45) -> list:
+    out = []
+    for page in range(pages):
+        out.extend(_header(rng, title))
+        out.extend(_line_items(rng, items_per_page))
+        out.append(f"PAGE {page + 1} OF {pages}")
+        out.append("")
+    return out
+
+
+def packing_list(size: str, seed: int = SEED) -> str:
+    """Packing list text; size is one of SIZES."""
+    rng = random.Random(seed)
+    if size == "small":
+        lines = _pages(rng, "PACKING LIST", 1)
+        lines.insert(-2, "TERMS OF DELIVERY: FOB SHANGHAI")
+    elif size == "large":
+        lines = _pages(rng, "PACKING LIST", 60)
+        lines.insert(-2, "TERMS OF DELIVERY: CIF CHENNAI")
+    elif size == "early":
+        lines = _pages(rng, "PACKING LIST", 60)
+        lines.insert(8, "TERMS OF DELIVERY: CFR CHENNAI")
+    elif size == "none":
+        lines = _pages(rng, "PACKING LIST", 60)
+    elif size == "adversarial":
+        lines = _pages(rng, "PACKING LIST", 30)
+        near_misses = ["FOBX", "CIFRA", "DAPPER", "EXWX", "FCAS", "CPTR", "DDPX", "CANDF",
+                       "C &AMP;", "EX -WORKS", "FREE ONBOARD", "COST FREIGHT", "FREECARRIER"]
+        for i in range(0, len(lines), 3):
+            lines[i] += "   " + " ".join(rng.choice(near_misses) for _ in range(6))
+        lines.insert(-2, "DELIVERY: EX WORKS NINGBO")
+    else:
+        raise ValueError(f"Invalid size '{size}'. Must be one of: {SIZES}")
+    return "\n".join(lines)
+
+
+def invoice(size: str, seed: int = SEED) -> str:
+    """Commercial invoice text; size is one of SIZES."""
+    rng = random.Random(seed + 1)
+    if size == "small":
+        lines = _pages(rng, "COMMERCIAL INVOICE", 1)
+        lines.insert(-2, "MISC CHARGES: USD 1,250.00")
+    elif size == "large":
+        lines = _pages(rng, "COMMERCIAL INVOICE", 60)
+        lines.insert(-2, "MISCELLANEOUS CHARGES : INR 48,300.50")
+    elif size == "early":
+        lines = _pages(rng, "COMMERCIAL INVOICE", 60)
+        lines.insert(8, "MISC CHARGES - RS. 7,420")
+    elif size == "none":
+        lines = _pages(rng, "COMMERCIAL INVOICE", 60)
+    elif size == "adversarial":
+        lines = _pages(rng, "COMMERCIAL INVOICE", 5)
+        # Column-aligned OCR output: keyword, a wide gap, then text instead of an amount
+        for keyword in ["MISC", "MISCELLANEOUS", "OTHER CHARGES", "ADDITIONAL CHARGES", "MISC."]:
+            lines.insert(rng.randrange(len(lines)), keyword + " " * 60 + "AS PER CONTRACT")
+        lines.insert(-2, "OTHER CHARGES: USD 310.00")
+    else:
+        raise ValueError(f"Invalid size '{size}'. Must be one of: {SIZES}")
+    return "\n".join(lines)
+
+
+def pdf(text: str) -> bytes:
+    """Text laid out on A4 pages with an embedded text layer (needs PyMuPDF)."""
+    import fitz
+
+    doc = fitz.open()
+    lines = text.split("\n")
+    per_page = 60
+    for start in range(0, len(lines), per_page):
+        page = doc.new_page(width=595, height=842)
+        page.insert_text((36, 40), "\n".join(lines[start:start + per_page]), fontsize=6)
+    data = doc.tobytes(garbage=3, deflate=True)
+    doc.close()
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write the synthetic document corpus to disk")
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    for kind, generate in (("packing_list", packing_list), ("invoice", invoice)):
+        for size in SIZES:
+            text = generate(size, args.seed)
+            base = os.path.join(args.out, f"{kind}_{size}")
+            with open(base + ".txt", "w", encoding="utf-8") as f:
+                f.write(text)
+            with open(base + ".pdf", "wb") as f:
+                f.write(pdf(text))
+            print(f"   {base}.txt ({len(text) // 1024} KB) + .pdf")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""
+Load Generator - Concurrent HTTP load against a running backend, JSON results
+
+    python -m benchmarks.loadtest [--base-url http://127.0.0.1:8000] \\
+        [--scenarios new_jobs_list,new_job_detail,milestones,upload,login] \\
+        [--concurrency 16] [--duration 30] [--output after.json] [--compare before.json]
+
+Typical run against the local stand-in:
+
+    python -m benchmarks.local_postgres start
+    eval "$(python -m benchmarks.local_postgres env)"
+    python -m benchmarks.seed --scale 0.1
+    LOGIN_RATE_LIMIT_PER_IP=1000000 LOGIN_RATE_LIMIT_PER_EMAIL=1000000 \\
+        uvicorn main:app --workers 4 --port 8000
+    python -m benchmarks.loadtest --output after.json --compare before.json
+
+Each scenario runs for --duration seconds with --concurrency threads, each
+thread on its own keep-alive connection. Requests are authenticated as the
+admin of --tenant (seeded by benchmarks/seed.py). Per scenario the output
+holds request/error counts, status codes, throughput and latency
+p50/p95/p99/mean/max in milliseconds; --compare adds the change against
+an earlier output file.
+"""
+
+import argparse
+import http.client
+import json
+import platform
+import random
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+from benchmarks.seed import BENCH_PASSWORD
+
+# Same projection the job list page asks for (src/pages/JobList.tsx)
+LIST_FIELDS = "id,job_no,bl_no,vessel_name,eta,status,customer_name,created_at"
+
+# Job ids sampled for the detail/milestone scenarios
+SAMPLE_JOBS = 1000
+
+
+class Client:
+    """One keep-alive HTTP connection (one per worker thread)."""
+
+    def __init__(self, base_url: str, timeout: float):
+        parts = urlsplit(base_url)
+        connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self._connect = lambda: connection_class(parts.hostname, parts.port, timeout=timeout)
+        self.prefix = parts.path.rstrip("/")
+        self.conn = self._connect()
+
+    def request(self, method: str, path: str, body: bytes = None, headers: dict = None) -> tuple:
+        try:
+            self.conn.request(method, self.prefix + path, body=body, headers=headers or {})
+            response = self.conn.getresponse()
+            return response.status, response.read()
+        except (http.client.HTTPException, OSError):
+            # Reconnect on the next request; the failure still counts
+            self.conn.close()
+            self.conn = self._connect()
+            raise
+
+    def close(self):
+        self.conn.close()
+
+
+# ============================================================
+# SCENARIOS
+# ============================================================
+
+def _multipart(fields: dict, filename: str, content: bytes, content_type: str) -> tuple:
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    parts.append(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f'Content-Type: {content_type}\r\n\r\n'.encode() + content + b"\r\n"
+    )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def _sample_pdf() -> bytes:
+    """A one-page packing-list-like PDF (PyMuPDF when available, else a minimal hand-written file)."""
+    try:
+        import fitz
+        doc = fitz.open()
+        page = doc.new_page()
+        page.insert_text((72, 72), "PACKING LIST\nTerms of delivery: FOB SHANGHAI\nGross weight: 12,400 KG")
+        data = doc.tobytes()
+        doc.close()
+        return data
+    except ImportError:
+        return (b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n"
+                b"2 0 obj<</Type/Pages/Kids[3 0 R]/Count 1>>endobj\n"
+                b"3 0 obj<</Type/Page/Parent 2 0 R/MediaBox[0 0 612 792]>>endobj\n"
+                b"trailer<</Root 1 0 R>>\n%%EOF\n")
+
+
+def build_scenarios(args, token: str, job_ids: list) -> dict:
+    """name -> callable(client) returning (status, body)."""
+    auth = {"Authorization": f"Bearer {token}"}
+    pdf = _sample_pdf()
+    login_body = json.dumps({"email": args.email, "password": BENCH_PASSWORD}).encode()
+
+    def new_jobs_list(client):
+        return client.request("GET", f"/api/new-jobs?fields={LIST_FIELDS}", headers=auth)
+
+    def new_job_detail(client):
+        return client.request("GET", f"/api/new-jobs/{random.choice(job_ids)}", headers=auth)
+
+    def milestones(client):
+        return client.request("GET", f"/api/milestones?job_id={random.choice(job_ids)}", headers=auth)
+
+    def upload(client):
+        body, content_type = _multipart({"doc_type": args.upload_doc_type, "job_no": "BENCH"},
+                                        "bench.pdf", pdf, "application/pdf")
+        return client.request("POST", "/api/upload", body=body, headers={**auth, "Content-Type": content_type})
+
+    def login(client):
+        return client.request("POST", "/api/auth/login", body=login_body,
+                              headers={"Content-Type": "application/json"})
+
+    return {
+        "new_jobs_list": new_jobs_list,
+        "new_job_detail": new_job_detail,
+        "milestones": milestones,
+        "upload": upload,
+        "login": login,
+    }
+
+
+# ============================================================
+# RUNNER
+# ============================================================
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def run_scenario(name: str, func, args) -> dict:
+    deadline = time.monotonic() + args.warmup + args.duration
+    measure_from = time.monotonic() + args.warmup
+    latencies = []
+    status_counts = {}
+    errors = [0]
+    lock = threading.Lock()
+
+    def worker():
+        client = Client(args.base_url, args.timeout)
+        local_latencies, local_statuses, local_errors = [], {}, 0
+        try:
+            while True:
+                started = time.monotonic()
+                if started >= deadline:
+                    break
+                try:
+                    status, _ = func(client)
+                except Exception:
+                    status = "error"
+                elapsed = time.monotonic() - started
+                if started < measure_from:
+                    continue
+                local_latencies.append(elapsed * 1000)
+                local_statuses[status] = local_statuses.get(status, 0) + 1
+                if status == "error" or status >= 400:
+                    local_errors += 1
+        finally:
+            client.close()
+        with lock:
+            latencies.extend(local_latencies)
+            for status, count in local_statuses.items():
+                status_counts[str(status)] = status_counts.get(str(status), 0) + count
+            errors[0] += local_errors
+
+    print(f"🔄 {name}: {args.concurrency} workers, {args.warmup}s warmup + {args.duration}s")
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    result = {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "status_counts": status_counts,
+        "throughput_rps": round(len(latencies) / args.duration, 2),
+        "latency_ms": {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "mean": sum(latencies) / len(latencies) if latencies else None,
+            "max": latencies[-1] if latencies else None,
+        },
+    }
+    result["latency_ms"] = {k: round(v, 2) if v is not None else None for k, v in result["latency_ms"].items()}
+    latency = result["latency_ms"]
+    print(f"   {result['requests']} requests, {result['errors']} errors, {result['throughput_rps']} req/s, "
+          f"p50 {latency['p50']}ms p95 {latency['p95']}ms p99 {latency['p99']}ms")
+    return result
+
+
+def compare(current: dict, baseline: dict) -> dict:
+    """Relative change per scenario: throughput and latency percentiles (negative latency = faster)."""
+    changes = {}
+    for name, result in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+
+        def change(now, then):
+            if now is None or not then:
+                return None
+            return round((now - then) / then * 100, 1)
+
+        changes[name] = {
+            "throughput_rps_pct": change(result["throughput_rps"], before["throughput_rps"]),
+            **{f"{p}_pct": change(result["latency_ms"][p], before["latency_ms"][p]) for p in ("p50", "p95", "p99")},
+        }
+    return changes
+
+
+def _login(client: Client, email: str) -> str:
+    status, body = client.request("POST", "/api/auth/login",
+                                  body=json.dumps({"email": email, "password": BENCH_PASSWORD}).encode(),
+                                  headers={"Content-Type": "application/json"})
+    data = json.loads(body) if status == 200 else {}
+    if not data.get("token"):
+        sys.exit(f"❌ Login as {email} failed ({status}): {body[:200]!r} - was the database seeded?")
+    return data["token"]
+
+
+def _sample_job_ids(client: Client, token: str) -> list:
+    status, body = client.request("GET", "/api/new-jobs?fields=id", headers={"Authorization": f"Bearer {token}"})
+    if status != 200:
+        sys.exit(f"❌ Could not list jobs ({status}): {body[:200]!r}")
+    ids = [job["id"] for job in json.loads(body)["jobs"]]
+    if not ids:
+        sys.exit("❌ Tenant has no jobs - was the database seeded?")
+    return random.sample(ids, min(SAMPLE_JOBS, len(ids)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the backend API")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--scenarios", default="new_jobs_list,new_job_detail,milestones,upload,login")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30, help="Measured seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=3, help="Unmeasured seconds before each scenario")
+    parser.add_argument("--timeout", type=float, default=60, help="Per-request timeout in seconds")
+    parser.add_argument("--tenant", type=int, default=10, help="Seeded tenant to run as (1 holds the most jobs)")
+    parser.add_argument("--upload-doc-type", default="bl", help="packing_list also runs INCOTERM extraction")
+    parser.add_argument("--label", default=None, help="Free text stored in the output (e.g. branch name)")
+    parser.add_argument("--output", default=None, help="Write results as JSON here (default: stdout)")
+    parser.add_argument("--compare", default=None, help="Earlier --output file to compare against")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    args.email = f"user1@tenant{args.tenant}.bench.test"
+    random.seed(args.seed)
+
+    setup = Client(args.base_url, args.timeout)
+    token = _login(setup, args.email)
+    job_ids = _sample_job_ids(setup, token)
+    setup.close()
+
+    scenarios = build_scenarios(args, token, job_ids)
+    selected = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in selected if name not in scenarios]
+    if unknown:
+        sys.exit(f"❌ Invalid scenarios: {unknown}. Must be any of: {list(scenarios)}")
+
+    output = {
+        "label": args.label,
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "base_url": args.base_url,
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "tenant": args.tenant,
+        "host": platform.node(),
+        "scenarios": {name: run_scenario(name, scenarios[name], args) for name in selected},
+    }
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            output["compared_to"] = args.compare
+            output["change"] = compare(output, json.load(f))
+
+    text = json.dumps(output, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"✅ Results written to {args.output}")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
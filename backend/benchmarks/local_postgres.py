@@ -0,0 +1,165 @@
+"""
+Local Postgres stand-in for benchmarks - disposable, never the shared database
+
+    python -m benchmarks.local_postgres start [--docker] [--port 55432]
+    eval "$(python -m benchmarks.local_postgres env)"
+    python -m benchmarks.local_postgres stop  [--docker]
+
+Without --docker a throwaway cluster is created with initdb/pg_ctl under
+benchmarks/.pgdata (PostgreSQL binaries on PATH). With --docker a
+postgres:16 container named 4s-bench-postgres is started instead.
+
+Either way the app connects as a non-superuser role owning the database
+(superusers bypass row-level security, see migrations/010), and
+`env` prints the DB_* variables config.py picks up.
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import psycopg2
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(HERE, ".pgdata")
+CONTAINER = "4s-bench-postgres"
+IMAGE = "postgres:16"
+
+SUPERUSER = "postgres"
+SUPERUSER_PASSWORD = "bench-super"
+APP_USER = "bench_app"
+APP_PASSWORD = "bench-app"
+DATABASE = "logistics_bench"
+
+# Tuned for a disposable benchmark box, not for durability
+SERVER_SETTINGS = {
+    "shared_buffers": "1GB",
+    "work_mem": "32MB",
+    "maintenance_work_mem": "512MB",
+    "max_connections": "200",
+    "fsync": "off",
+    "synchronous_commit": "off",
+    "full_page_writes": "off",
+}
+
+
+def _run(cmd: list, **kwargs):
+    print("$ " + " ".join(cmd))
+    subprocess.run(cmd, check=True, **kwargs)
+
+
+def _start_pg_ctl(port: int):
+    for binary in ("initdb", "pg_ctl"):
+        if not shutil.which(binary):
+            sys.exit(f"❌ {binary} not found on PATH - install PostgreSQL or use --docker")
+    if not os.path.exists(os.path.join(DATA_DIR, "PG_VERSION")):
+        with tempfile.NamedTemporaryFile("w", delete=False) as pwfile:
+            pwfile.write(SUPERUSER_PASSWORD)
+        try:
+            _run(["initdb", "-D", DATA_DIR, "-U", SUPERUSER, "--pwfile", pwfile.name,
+                  "--auth", "scram-sha-256", "--encoding", "UTF8"])
+        finally:
+            os.unlink(pwfile.name)
+    options = " ".join(f"-c {k}={v}" for k, v in SERVER_SETTINGS.items())
+    _run(["pg_ctl", "-D", DATA_DIR, "-l", os.path.join(DATA_DIR, "server.log"),
+          "-o", f"-p {port} -k {DATA_DIR} {options}", "-w", "start"])
+
+
+def _start_docker(port: int):
+    options = []
+    for k, v in SERVER_SETTINGS.items():
+        options += ["-c", f"{k}={v}"]
+    _run(["docker", "run", "-d", "--rm", "--name", CONTAINER, "-p", f"{port}:5432",
+          "-e", f"POSTGRES_PASSWORD={SUPERUSER_PASSWORD}", "--shm-size=1g", IMAGE] + options)
+
+
+def _wait_ready(port: int, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            psycopg2.connect(host="localhost", port=port, user=SUPERUSER,
+                             password=SUPERUSER_PASSWORD, dbname="postgres").close()
+            return
+        except psycopg2.OperationalError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.5)
+
+
+def _create_app_database(port: int):
+    conn = psycopg2.connect(host="localhost", port=port, user=SUPERUSER,
+                            password=SUPERUSER_PASSWORD, dbname="postgres")
+    conn.autocommit = True
+    cursor = conn.cursor()
+    cursor.execute("SELECT 1 FROM pg_roles WHERE rolname = %s", (APP_USER,))
+    if not cursor.fetchone():
+        cursor.execute(f"CREATE ROLE {APP_USER} LOGIN PASSWORD %s", (APP_PASSWORD,))
+    cursor.execute("SELECT 1 FROM pg_database WHERE datname = %s", (DATABASE,))
+    if not cursor.fetchone():
+        cursor.execute(f"CREATE DATABASE {DATABASE} OWNER {APP_USER}")
+    conn.close()
+
+    # Extensions the migrations use, created by the superuser
+    conn = psycopg2.connect(host="localhost", port=port, user=SUPERUSER,
+                            password=SUPERUSER_PASSWORD, dbname=DATABASE)
+    conn.autocommit = True
+    conn.cursor().execute("CREATE EXTENSION IF NOT EXISTS pg_trgm; CREATE EXTENSION IF NOT EXISTS btree_gin")
+    conn.close()
+
+
+def env_vars(port: int) -> dict:
+    return {
+        "DB_HOST": "localhost",
+        "DB_PORT": str(port),
+        "DB_NAME": DATABASE,
+        "DB_USER": APP_USER,
+        "DB_PASSWORD": APP_PASSWORD,
+    }
+
+
+def start(port: int, docker: bool):
+    if docker:
+        _start_docker(port)
+    else:
+        _start_pg_ctl(port)
+    _wait_ready(port)
+    _create_app_database(port)
+    print(f"✅ Benchmark Postgres ready on localhost:{port}/{DATABASE}")
+
+
+def stop(docker: bool):
+    if docker:
+        _run(["docker", "stop", CONTAINER])
+    else:
+        _run(["pg_ctl", "-D", DATA_DIR, "-m", "fast", "stop"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Disposable Postgres for benchmarks")
+    parser.add_argument("command", choices=["start", "stop", "env", "destroy"])
+    parser.add_argument("--port", type=int, default=55432)
+    parser.add_argument("--docker", action="store_true", help="Use a postgres:16 container instead of pg_ctl")
+    args = parser.parse_args()
+
+    if args.command == "start":
+        start(args.port, args.docker)
+    elif args.command == "stop":
+        stop(args.docker)
+    elif args.command == "destroy":
+        try:
+            stop(args.docker)
+        except subprocess.CalledProcessError:
+            pass  # not running
+        if not args.docker:
+            shutil.rmtree(DATA_DIR, ignore_errors=True)
+    else:
+        for key, value in env_vars(args.port).items():
+            print(f"export {key}={value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Benchmark data generator - migrations plus realistic volumes, all in SQL
+
+    python -m benchmarks.seed [--scale 1.0] [--reset]
+
+Connects with DB_CONFIG (point it at benchmarks/local_postgres.py via
+the DB_* variables - never at a shared database) and:
+1. applies migrations/*.sql in order
+2. fills the tables with generate_series, in job-id batches
+
+At --scale 1.0: 50 tenants, 10k customers, 1,000 users, 1M jobs
+(skewed so a few tenants own most of them), 2M containers, 3M documents,
+10M milestones and 10M activity log rows. setseed() makes the data
+identical between runs, so results can be compared.
+
+Every user's password is BENCH_PASSWORD; user1@tenant<N>.bench.test is
+tenant N's admin.
+"""
+
+import argparse
+import glob
+import os
+import time
+
+import psycopg2
+
+from config import DB_CONFIG
+from services.passwords import hash_password
+
+BENCH_PASSWORD = "bench-password"
+
+TENANTS = 50
+USERS_PER_TENANT = 20
+CUSTOMERS_PER_TENANT = 200
+JOBS = 1_000_000
+CONTAINERS_PER_JOB = 2
+DOCUMENTS_PER_JOB = 3
+MILESTONES_PER_JOB = 10
+ACTIVITY_LOGS_PER_JOB = 10
+
+BATCH_JOBS = 50_000
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+
+# Job columns production has that no migration creates yet
+EXTRA_JOB_COLUMNS = """
+    ALTER TABLE jobs ADD COLUMN IF NOT EXISTS incoterm VARCHAR(20);
+    ALTER TABLE jobs ADD COLUMN IF NOT EXISTS invoice_path VARCHAR(500);
+    ALTER TABLE jobs ADD COLUMN IF NOT EXISTS freight_payment_path VARCHAR(500);
+    ALTER TABLE jobs ADD COLUMN IF NOT EXISTS misc_charges_amount NUMERIC(12, 2);
+"""
+
+SEED_TABLES = ["activity_logs", "job_milestones", "documents", "containers", "jobs",
+               "customers", "users", "tenants"]
+
+TENANTS_SQL = """
+    INSERT INTO tenants (id, company_name, contact_name, email, phone, plan)
+    SELECT g, 'Bench Broker ' || g, 'Owner ' || g, 'owner' || g || '@bench.test',
+           '+91 90000 ' || lpad(g::text, 5, '0'), (ARRAY['basic', 'pro', 'enterprise'])[1 + g % 3]
+    FROM generate_series(1, %(tenants)s) g
+"""
+
+USERS_SQL = """
+    INSERT INTO users (id, tenant_id, name, email, password_hash, role)
+    SELECT (t - 1) * %(per_tenant)s + u, t, 'User ' || u || ' of ' || t,
+           'user' || u || '@tenant' || t || '.bench.test', %(password_hash)s,
+           CASE WHEN u = 1 THEN 'admin' ELSE 'staff' END
+    FROM generate_series(1, %(tenants)s) t, generate_series(1, %(per_tenant)s) u
+"""
+
+CUSTOMERS_SQL = """
+    INSERT INTO customers (id, tenant_id, company_name, contact_person, phone, email, gst_no)
+    SELECT (t - 1) * %(per_tenant)s + c, t, 'Importer ' || t || '-' || c || ' Pvt Ltd', 'Contact ' || c,
+           '+91 98' || lpad(((t * 1000 + c) % 100000000)::text, 8, '0'),
+           'accounts' || c || '@importer' || t || '.bench.test',
+           '33AAAAA' || lpad(c::text, 4, '0') || 'A1Z' || (c % 10)
+    FROM generate_series(1, %(tenants)s) t, generate_series(1, %(per_tenant)s) c
+"""
+
+# power(random(), 3): tenant 1 gets the largest share, the tail stays small
+JOBS_SQL = """
+    INSERT INTO jobs (id, tenant_id, job_no, bl_no, shipping_line, vessel_name, voyage_no, pol, pod,
+                      eta, ata, status, customer_id, created_at, incoterm, bl_file_path,
+                      packing_list_path, invoice_path, misc_charges_amount)
+    SELECT g, t, 'JOB/' || to_char(created, 'YYMM') || '/' || g, 'BL' || lpad(g::text, 10, '0'),
+           (ARRAY['Maersk', 'MSC', 'CMA CGM', 'Hapag-Lloyd', 'ONE', 'Evergreen'])[1 + g % 6],
+           (ARRAY['MSC Aurora', 'Maersk Essen', 'CMA CGM Marco Polo', 'Ever Given', 'ONE Apus'])[1 + g % 5],
+           'V' || (g % 900 + 100), (ARRAY['Shanghai', 'Singapore', 'Rotterdam', 'Jebel Ali', 'Busan'])[1 + g % 5],
+           (ARRAY['Chennai', 'Nhava Sheva', 'Mundra', 'Tuticorin'])[1 + g % 4],
+           created::date + 20, CASE WHEN g % 3 = 0 THEN created::date + 22 END,
+           (ARRAY['created', 'in_transit', 'arrived', 'cleared', 'delivered', 'closed'])[1 + g % 6],
+           (t - 1) * %(customers_per_tenant)s + 1 + g % %(customers_per_tenant)s, created,
+           (ARRAY['FOB', 'CIF', 'DAP', 'CFR', 'EXW'])[1 + g % 5],
+           'uploads/bl/bench_' || g || '.pdf', 'uploads/pl/bench_' || g || '.pdf',
+           CASE WHEN g % 2 = 0 THEN 'uploads/invoice/bench_' || g || '.pdf' END,
+           CASE WHEN g % 4 = 0 THEN round((random() * 5000)::numeric, 2) END
+    FROM (
+        SELECT g, 1 + floor(power(random(), 3) * %(tenants)s)::int AS t,
+               now() - random() * interval '730 days' AS created
+        FROM generate_series(%(first)s, %(last)s) g
+    ) s
+"""
+
+CONTAINERS_SQL = """
+    INSERT INTO containers (job_id, container_no, size, type, seal_no, status)
+    SELECT j, (ARRAY['MSCU', 'MAEU', 'CMAU', 'HLXU'])[1 + j % 4] || lpad((j * 10 + k)::text, 7, '0'),
+           (ARRAY['20', '40', '45'])[1 + (j + k) % 3], CASE WHEN k = 1 THEN 'dry' ELSE 'reefer' END,
+           'SL' || j || k, (ARRAY['pending', 'discharged', 'in_transit', 'delivered'])[1 + j % 4]
+    FROM generate_series(%(first)s, %(last)s) j, generate_series(1, %(per_job)s) k
+"""
+
+DOCUMENTS_SQL = """
+    INSERT INTO documents (job_id, doc_type, file_url, uploaded_at)
+    SELECT j, (ARRAY['BL', 'Invoice', 'PackingList', 'BOE', 'EwayBill'])[1 + k % 5],
+           'uploads/bench/' || j || '_' || k || '.pdf', now() - random() * interval '700 days'
+    FROM generate_series(%(first)s, %(last)s) j, generate_series(1, %(per_job)s) k
+"""
+
+MILESTONES_SQL = """
+    INSERT INTO job_milestones (job_id, stage, milestone_code, milestone_name, status, completed_at, created_at)
+    SELECT j.id, mt.stage, mt.milestone_code, mt.milestone_name,
+           CASE WHEN mt.sequence_order <= j.id % 12 THEN 'completed'
+                WHEN mt.sequence_order = j.id % 12 + 1 AND j.id % 7 = 0 THEN 'delayed' ELSE 'pending' END,
+           CASE WHEN mt.sequence_order <= j.id % 12 THEN j.created_at + mt.sequence_order * interval '2 days' END,
+           j.created_at
+    FROM jobs j
+    CROSS JOIN (SELECT * FROM milestone_templates ORDER BY sequence_order LIMIT %(per_job)s) mt
+    WHERE j.id BETWEEN %(first)s AND %(last)s
+"""
+
+ACTIVITY_LOGS_SQL = """
+    INSERT INTO activity_logs (tenant_id, user_id, entity, entity_id, action, details, created_at)
+    SELECT j.tenant_id, (j.tenant_id - 1) * %(users_per_tenant)s + 1 + k % %(users_per_tenant)s,
+           (ARRAY['job', 'job', 'document', 'milestone'])[1 + k % 4], j.id,
+           (ARRAY['created', 'updated', 'viewed', 'updated'])[1 + k % 4],
+           jsonb_build_object('field', (ARRAY['status', 'eta', 'vessel_name'])[1 + k % 3], 'seq', k),
+           j.created_at + k * interval '3 hours'
+    FROM jobs j, generate_series(1, %(per_job)s) k
+    WHERE j.id BETWEEN %(first)s AND %(last)s
+"""
+
+
+def _timed(label: str, cursor, sql: str, params: dict = None):
+    started = time.perf_counter()
+    cursor.execute(sql, params)
+    print(f"   {label}: {cursor.rowcount:,} rows in {time.perf_counter() - started:.1f}s")
+
+
+def apply_migrations(conn):
+    cursor = conn.cursor()
+    for path in sorted(glob.glob(os.path.join(MIGRATIONS_DIR, "*.sql"))):
+        with open(path, encoding="utf-8") as f:
+            cursor.execute(f.read())
+        conn.commit()
+        print(f"   applied {os.path.basename(path)}")
+    cursor.execute(EXTRA_JOB_COLUMNS)
+    conn.commit()
+
+
+def seed(conn, scale: float):
+    cursor = conn.cursor()
+    jobs = max(1, int(JOBS * scale))
+    tenants = max(1, int(TENANTS * min(scale, 1.0)))
+
+    cursor.execute("SELECT setseed(0.42)")
+    _timed("tenants", cursor, TENANTS_SQL, {"tenants": tenants})
+    _timed("users", cursor, USERS_SQL, {"tenants": tenants, "per_tenant": USERS_PER_TENANT,
+                                        "password_hash": hash_password(BENCH_PASSWORD)})
+    _timed("customers", cursor, CUSTOMERS_SQL, {"tenants": tenants, "per_tenant": CUSTOMERS_PER_TENANT})
+    conn.commit()
+
+    for first in range(1, jobs + 1, BATCH_JOBS):
+        last = min(first + BATCH_JOBS - 1, jobs)
+        print(f"🔄 Jobs {first:,}-{last:,} of {jobs:,}")
+        batch = {"first": first, "last": last}
+        _timed("jobs", cursor, JOBS_SQL, {**batch, "tenants": tenants,
+                                          "customers_per_tenant": CUSTOMERS_PER_TENANT})
+        _timed("containers", cursor, CONTAINERS_SQL, {**batch, "per_job": CONTAINERS_PER_JOB})
+        _timed("documents", cursor, DOCUMENTS_SQL, {**batch, "per_job": DOCUMENTS_PER_JOB})
+        _timed("milestones", cursor, MILESTONES_SQL, {**batch, "per_job": MILESTONES_PER_JOB})
+        _timed("activity_logs", cursor, ACTIVITY_LOGS_SQL, {**batch, "per_job": ACTIVITY_LOGS_PER_JOB,
+                                                            "users_per_tenant": USERS_PER_TENANT})
+        conn.commit()
+
+    # Explicit ids were inserted; move the sequences past them
+    for table in SEED_TABLES:
+        cursor.execute(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE(MAX(id), 1)) FROM {table}")
+    conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a benchmark database")
+    parser.add_argument("--scale", type=float, default=1.0, help="1.0 = 1M jobs / 10M milestones")
+    parser.add_argument("--reset", action="store_true", help="Truncate previously seeded tables first")
+    args = parser.parse_args()
+
+    print(f"🗄️  Seeding {DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']} (scale {args.scale})")
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        cursor = conn.cursor()
+        # Seeding spans all tenants (see migrations/010_enable_tenant_rls.sql)
+        cursor.execute("SET app.rls_bypass = 'on'")
+        conn.commit()
+
+        apply_migrations(conn)
+
+        if args.reset:
+            cursor.execute(f"TRUNCATE {', '.join(SEED_TABLES)} RESTART IDENTITY CASCADE")
+            conn.commit()
+        cursor.execute("SELECT COUNT(*) FROM jobs")
+        if cursor.fetchone()[0]:
+            raise SystemExit("❌ jobs is not empty - rerun with --reset to replace the data")
+
+        started = time.perf_counter()
+        seed(conn, args.scale)
+
+        conn.autocommit = True
+        cursor.execute("VACUUM ANALYZE")
+        print(f"✅ Seeded in {time.perf_counter() - started:.0f}s. "
+              f"Log in as user1@tenant1.bench.test / {BENCH_PASSWORD}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -107,16 +107,23 @@ API_PREFIX = config["API_PREFIX"]
 # Full API URL
 API_URL = f"{APP_URL}{API_PREFIX}"
 
-# Database Settings
+# Database Settings (DB_* environment variables override, e.g. for a local benchmark database)
 DB_CONFIG = {
-    "host": config["DB_HOST"],
-    "port": config["DB_PORT"],
-    "database": config["DB_NAME"],
-    "user": config["DB_USER"],
-    "password": config["DB_PASSWORD"],
+    "host": os.getenv("DB_HOST", config["DB_HOST"]),
+    "port": int(os.getenv("DB_PORT", config["DB_PORT"])),
+    "database": os.getenv("DB_NAME", config["DB_NAME"]),
+    "user": os.getenv("DB_USER", config["DB_USER"]),
+    "password": os.getenv("DB_PASSWORD", config["DB_PASSWORD"]),
     "connect_timeout": 5,
 }
 
+# Connection pool opened at app startup (main.py); each uvicorn worker has its own
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "2"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "20"))
+
+# Seconds a request waits for a free pooled connection before failing
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+
 # CORS Settings
 CORS_ORIGINS = config["CORS_ORIGINS"]
 
@@ -125,6 +132,177 @@ DEBUG = config["DEBUG"]
 RELOAD = config["RELOAD"]
 
 
+# ============================================================
+# ALERT DISPATCH SETTINGS
+# ============================================================
+
+# Pending alerts claimed per dispatch cycle
+ALERT_DISPATCH_BATCH_SIZE = int(os.getenv("ALERT_DISPATCH_BATCH_SIZE", "100"))
+
+# Seconds the worker sleeps when the queue is empty
+ALERT_DISPATCH_INTERVAL = float(os.getenv("ALERT_DISPATCH_INTERVAL", "5"))
+
+# Parallel sends across recipients/channels
+ALERT_SEND_CONCURRENCY = int(os.getenv("ALERT_SEND_CONCURRENCY", "8"))
+
+# The same message for the same job on the same channel is sent once per window
+ALERT_DEDUP_WINDOW_SECONDS = int(os.getenv("ALERT_DEDUP_WINDOW_SECONDS", "3600"))
+
+# Provider calls per second, per channel
+ALERT_RATE_LIMITS = {
+    "email": float(os.getenv("ALERT_RATE_LIMIT_EMAIL", "20")),
+    "sms": float(os.getenv("ALERT_RATE_LIMIT_SMS", "5")),
+    "whatsapp": float(os.getenv("ALERT_RATE_LIMIT_WHATSAPP", "5")),
+}
+
+# Register in-memory stub transports for every channel: alerts are marked sent
+# without being delivered. Development and tests only
+ALERT_STUB_TRANSPORTS = os.getenv("ALERT_STUB_TRANSPORTS", "false").lower() == "true"
+
+# Seconds a claimed alert stays invisible to other dispatchers before it can be re-claimed
+ALERT_VISIBILITY_TIMEOUT = int(os.getenv("ALERT_VISIBILITY_TIMEOUT", "60"))
+
+# Sent/failed alerts older than this move to alerts_archive
+ALERT_ARCHIVE_AFTER_DAYS = int(os.getenv("ALERT_ARCHIVE_AFTER_DAYS", "30"))
+
+# Seconds between sweeps of time-based alert rules (ETA windows, not gated out)
+ALERT_RULE_SWEEP_INTERVAL = float(os.getenv("ALERT_RULE_SWEEP_INTERVAL", "300"))
+
+
+# ============================================================
+# AUTH SETTINGS
+# ============================================================
+
+# Threads reserved for password hashing/verification (bounds CPU spent on logins)
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+
+# scrypt cost (N = 2**PASSWORD_SCRYPT_LOG_N); hashes with a lower cost are upgraded on login
+PASSWORD_SCRYPT_LOG_N = int(os.getenv("PASSWORD_SCRYPT_LOG_N", "15"))
+
+# HMAC key for session tokens - MUST be set (and shared by all workers) in production;
+# the app refuses to start there without it. In development a random per-process
+# key is used instead and tokens die with the process.
+SESSION_SECRET = os.getenv("SESSION_SECRET", "")
+
+# Session token lifetime
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", str(12 * 3600)))
+
+# Seconds between background full reloads of the in-process revocation list
+# (NOTIFY keeps it current in between)
+SESSION_REVOCATION_REFRESH = int(os.getenv("SESSION_REVOCATION_REFRESH", "300"))
+
+# Login throttling: (attempts, window seconds) per client IP and per email address
+LOGIN_RATE_LIMIT_PER_IP = (int(os.getenv("LOGIN_RATE_LIMIT_PER_IP", "30")), 300)
+LOGIN_RATE_LIMIT_PER_EMAIL = (int(os.getenv("LOGIN_RATE_LIMIT_PER_EMAIL", "10")), 900)
+
+# Where rate-limit counters live: "memory" (per process) or a redis:// URL (shared by workers)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+
+# Max keys tracked by the in-memory backend (least recently used are evicted)
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+# Use the first X-Forwarded-For address as the client IP (only behind a trusted proxy)
+TRUST_FORWARDED_FOR = os.getenv("TRUST_FORWARDED_FOR", "false").lower() == "true"
+
+# Row-level tenant isolation (migrations/010_enable_tenant_rls.sql). Requests
+# with neither a session token nor an accepted ?tenant_id= see no tenant data.
+# Strict: only session tokens scope a request.
+# Non-strict (default while clients move to tokens): the legacy ?tenant_id= query
+# parameter scopes requests without a token.
+TENANT_ISOLATION_STRICT = os.getenv("TENANT_ISOLATION_STRICT", "false").lower() == "true"
+
+
+# ============================================================
+# RESPONSE CACHE SETTINGS
+# ============================================================
+
+# Seconds a cached list response may be served (writes invalidate sooner)
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+
+# Max cached responses per worker (least recently used are evicted)
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2000"))
+
+# Broadcast invalidations to the other uvicorn workers via Postgres NOTIFY
+RESPONSE_CACHE_SHARED_INVALIDATION = os.getenv("RESPONSE_CACHE_SHARED_INVALIDATION", "false").lower() == "true"
+
+
+# ============================================================
+# OBSERVABILITY SETTINGS
+# ============================================================
+
+# Serve Prometheus metrics at /metrics and time every request
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+# Operator endpoints (/api/admin/*, ?profile=1) are for admins of these tenants only -
+# the platform's own tenant, not customers. Comma-separated ids; empty disables them
+OPERATOR_TENANT_IDS = frozenset(int(t) for t in os.getenv("OPERATOR_TENANT_IDS", "").split(",") if t.strip())
+
+# Statements slower than this are logged (normalized SQL, params shape, rows, caller); 0 disables
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "500"))
+
+# Share of slow SELECTs re-run with EXPLAIN (ANALYZE, BUFFERS) and stored in slow_query_plans (0 = off)
+SLOW_QUERY_EXPLAIN_SAMPLE_RATE = float(os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE_RATE", "0"))
+
+# At most this many EXPLAIN captures per minute, and each is cut off after the timeout
+SLOW_QUERY_EXPLAIN_PER_MINUTE = int(os.getenv("SLOW_QUERY_EXPLAIN_PER_MINUTE", "6"))
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS = int(os.getenv("SLOW_QUERY_EXPLAIN_TIMEOUT_MS", "10000"))
+
+# OpenTelemetry tracing: "" (off), "otlp" (local collector, OTEL_EXPORTER_OTLP_ENDPOINT), "file" or "console"
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "").lower()
+
+# JSON-lines span file for TRACING_EXPORTER=file
+TRACING_FILE = os.getenv("TRACING_FILE", "traces.jsonl")
+
+# Share of new traces recorded (incoming traceparent sampling decisions are honoured)
+TRACING_SAMPLE_RATIO = float(os.getenv("TRACING_SAMPLE_RATIO", "1.0"))
+
+# Longest whole-worker profile /api/admin/profile will take
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+
+
+# ============================================================
+# DOCUMENT PROCESSING SETTINGS
+# ============================================================
+
+# Read at most the first N pages of a PDF's embedded text (0 = every page);
+# INCOTERM detection stops earlier, as soon as a code is found
+PDF_SCAN_MAX_PAGES = int(os.getenv("PDF_SCAN_MAX_PAGES", "0"))
+
+# Worker processes for local parsing (PyMuPDF, text scanning) per uvicorn worker;
+# 0 parses inline in the request thread
+PARSE_POOL_WORKERS = int(os.getenv("PARSE_POOL_WORKERS", str(os.cpu_count() or 1)))
+
+# Parse tasks allowed to wait for a busy pool before new ones are rejected
+PARSE_POOL_MAX_QUEUE = int(os.getenv("PARSE_POOL_MAX_QUEUE", "32"))
+
+# Seconds a parse task may take, queueing included; a stuck worker is killed
+PARSE_POOL_TASK_TIMEOUT = float(os.getenv("PARSE_POOL_TASK_TIMEOUT", "60"))
+
+# Replace each worker process after this many tasks (0 = never)
+PARSE_POOL_MAX_TASKS_PER_CHILD = int(os.getenv("PARSE_POOL_MAX_TASKS_PER_CHILD", "200"))
+
+# Text extraction backends, tried in this order until one returns text
+# (services/ocr_backends.py): embedded = a PDF's own text layer,
+# tesseract = local OCR, document_ai = Google Cloud Document AI
+OCR_BACKENDS = [name.strip() for name in os.getenv("OCR_BACKENDS", "embedded,tesseract,document_ai").split(",")
+                if name.strip()]
+
+# Less text than this (ignoring whitespace) counts as none, e.g. a scanned
+# PDF whose text layer is only page numbers; the next backend is tried
+OCR_MIN_TEXT_CHARS = int(os.getenv("OCR_MIN_TEXT_CHARS", "20"))
+
+# Tesseract executable, languages (e.g. "eng+deu"), PDF render resolution
+# and the limit per page / image
+TESSERACT_CMD = os.getenv("TESSERACT_CMD", "tesseract")
+TESSERACT_LANG = os.getenv("TESSERACT_LANG", "eng")
+TESSERACT_DPI = int(os.getenv("TESSERACT_DPI", "300"))
+TESSERACT_TIMEOUT = float(os.getenv("TESSERACT_TIMEOUT", "30"))
+
+# OCR at most the first N pages of a scanned PDF (0 = every page); each page is
+# its own parse pool task, so a long scan doesn't run into PARSE_POOL_TASK_TIMEOUT
+TESSERACT_MAX_PAGES = int(os.getenv("TESSERACT_MAX_PAGES", "10"))
+
+
 # ============================================================
 # PRINT CURRENT CONFIGURATION
 # ============================================================
@@ -1,26 +1,186 @@
 """
 Database Connection Module for 4S Logistics
 Uses centralized configuration from config.py
+
+Tenant isolation: every connection handed out by get_connection() carries
+the current tenant context (app.tenant_id / app.rls_bypass), which the
+row-level security policies in migrations/010_enable_tenant_rls.sql
+enforce. The context is a contextvar set per request by
+services/tenant_context.py; background work uses system_context(). Without
+either, a connection sees no tenant rows.
+
+Pooling: main.py opens a ThreadedConnectionPool (DB_POOL_MIN..DB_POOL_MAX)
+at startup; get_connection() waits up to DB_POOL_TIMEOUT for a free one.
+Without the pool (scripts, workers) every call opens a new connection.
+
+Instrumentation: connection checkouts and every statement run through a
+cursor from these connections are timed into services/metrics.py. A
+statement's query name is the function that executed it
+(e.g. routes.new_job.get_all_new_jobs). Statements slower than
+SLOW_QUERY_THRESHOLD_MS go to services/slow_queries.py. Both are also
+traced as spans when tracing is on (services/tracing.py).
 """
 
+import sys
+import threading
+import time
+
 import psycopg2
 from psycopg2 import pool
+from psycopg2.extensions import connection as _pg_connection, cursor as _pg_cursor
 from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import Optional
 
 # Import configuration
-from config import DB_CONFIG, DEBUG
+from config import (
+    DB_CONFIG, DEBUG, SLOW_QUERY_THRESHOLD_MS,
+    DB_POOL_MIN, DB_POOL_MAX, DB_POOL_TIMEOUT
+)
+from services import metrics, tracing
 
 
-# Connection pool (optional - for better performance)
-connection_pool: Optional[pool.SimpleConnectionPool] = None
+# Connection pool (optional - opened by main.py at startup)
+connection_pool: Optional[pool.ThreadedConnectionPool] = None
 
+# One slot per pooled connection: getconn() raises instead of waiting when
+# the pool is exhausted, so checkouts queue here first
+_pool_slots: Optional[threading.BoundedSemaphore] = None
 
-def init_connection_pool(min_conn: int = 1, max_conn: int = 10):
-    """Initialize a connection pool for better performance."""
-    global connection_pool
+
+# ============================================================
+# TENANT CONTEXT
+# ============================================================
+
+# Tenant id for the current request, SYSTEM for trusted background work,
+# or None when the caller is unauthenticated / unscoped
+SYSTEM = "system"
+_tenant_context: ContextVar = ContextVar("tenant_context", default=None)
+
+
+# ============================================================
+# INSTRUMENTATION
+# ============================================================
+
+_SLOW_QUERY_SECONDS = SLOW_QUERY_THRESHOLD_MS / 1000
+
+
+def _query_name() -> str:
+    """module.function of the code that called execute(), skipping psycopg2 helpers."""
+    # _query_name <- InstrumentedCursor.execute/executemany <- caller
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_globals.get("__name__", "").startswith("psycopg2"):
+        frame = frame.f_back
+    if frame is None:
+        return "unknown"
+    return f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_name}"
+
+
+class InstrumentedCursor(_pg_cursor):
+    """Cursor that records each statement's execution time under its query name."""
+
+    def _observe(self, name: str, query, vars, started: float, failed: bool, many: bool = False):
+        elapsed = time.perf_counter() - started
+        metrics.observe_query(name, elapsed, failed)
+        if _SLOW_QUERY_SECONDS and elapsed >= _SLOW_QUERY_SECONDS and not failed:
+            from services import slow_queries
+            slow_queries.record(self, query, vars, elapsed, name, explain=not many)
+
+    def execute(self, query, vars=None):
+        name = _query_name()
+        started = time.perf_counter()
+        failed = True
+        try:
+            with tracing.db_span(name, query):
+                result = super().execute(query, vars)
+            failed = False
+            return result
+        finally:
+            self._observe(name, query, vars, started, failed)
+
+    def executemany(self, query, vars_list):
+        name = _query_name()
+        started = time.perf_counter()
+        failed = True
+        try:
+            with tracing.db_span(name, query):
+                result = super().executemany(query, vars_list)
+            failed = False
+            return result
+        finally:
+            self._observe(name, query, vars_list, started, failed, many=True)
+
+
+class TenantConnection(_pg_connection):
+    """psycopg2 connection that remembers which tenant settings it last committed."""
+    applied_context = ()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cursor_factory = InstrumentedCursor
+
+
+def get_tenant_context():
+    return _tenant_context.get()
+
+
+def set_tenant_context(tenant_id):
+    """Set the tenant for the rest of the current context (request). Returns a reset token."""
+    return _tenant_context.set(tenant_id)
+
+
+def reset_tenant_context(token):
+    _tenant_context.reset(token)
+
+
+@contextmanager
+def tenant_context(tenant_id):
+    """Run a block as the given tenant (or SYSTEM)."""
+    token = _tenant_context.set(tenant_id)
+    try:
+        yield
+    finally:
+        _tenant_context.reset(token)
+
+
+def system_context():
+    """Run a block with tenant isolation bypassed (login lookup, workers, sweeps)."""
+    return tenant_context(SYSTEM)
+
+
+def _apply_tenant_context(conn):
+    """Make the connection's session settings match the current context."""
+    context = _tenant_context.get()
+    if context == SYSTEM:
+        settings = ("", "on")
+    elif context is not None:
+        settings = (str(context), "off")
+    else:
+        # Unscoped callers see no tenant rows; only system_context() bypasses RLS
+        settings = ("", "off")
+
+    if getattr(conn, "applied_context", None) == settings:
+        return
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT set_config('app.tenant_id', %s, false), set_config('app.rls_bypass', %s, false)",
+        settings
+    )
+    # Committed so a later rollback can't revert to another checkout's tenant
+    conn.commit()
+    if isinstance(conn, TenantConnection):
+        conn.applied_context = settings
+
+
+def init_connection_pool(min_conn: int = DB_POOL_MIN, max_conn: int = DB_POOL_MAX):
+    """Initialize the (thread-safe) connection pool used by get_connection()."""
+    global connection_pool, _pool_slots
     try:
-        connection_pool = pool.SimpleConnectionPool(min_conn, max_conn, **DB_CONFIG)
+        connection_pool = pool.ThreadedConnectionPool(
+            min_conn, max_conn, connection_factory=TenantConnection, **DB_CONFIG
+        )
+        _pool_slots = threading.BoundedSemaphore(max_conn)
+        _record_pool_stats()
         if DEBUG:
             print(f"✅ Database connection pool initialized ({min_conn}-{max_conn} connections)")
         return True
@@ -29,15 +189,35 @@ def init_connection_pool(min_conn: int = 1, max_conn: int = 10):
         return False
 
 
+def _record_pool_stats():
+    if connection_pool:
+        metrics.set_pool_stats(len(connection_pool._used), len(connection_pool._pool), connection_pool.maxconn)
+
+
 def get_connection():
-    """Get a database connection."""
+    """Get a database connection scoped to the current tenant context."""
     global connection_pool
+    conn = None
+    started = time.perf_counter()
     try:
-        if connection_pool:
-            return connection_pool.getconn()
-        else:
-            return psycopg2.connect(**DB_CONFIG)
+        with tracing.span("db.get_connection", pooled=connection_pool is not None):
+            if connection_pool:
+                if not _pool_slots.acquire(timeout=DB_POOL_TIMEOUT):
+                    raise Exception(f"no pooled connection free within {DB_POOL_TIMEOUT:g}s")
+                try:
+                    conn = connection_pool.getconn()
+                except Exception:
+                    _pool_slots.release()
+                    raise
+            else:
+                conn = psycopg2.connect(connection_factory=TenantConnection, **DB_CONFIG)
+            _apply_tenant_context(conn)
+        metrics.observe_checkout(time.perf_counter() - started)
+        _record_pool_stats()
+        return conn
     except Exception as e:
+        if conn:
+            release_connection(conn)
         raise Exception(f"Database connection failed: {str(e)}")
 
 
@@ -46,7 +226,14 @@ def release_connection(conn):
     global connection_pool
     if conn:
         if connection_pool:
-            connection_pool.putconn(conn)
+            # Discard whatever the caller left open (e.g. an early return without commit)
+            try:
+                if not conn.closed and conn.status != psycopg2.extensions.STATUS_READY:
+                    conn.rollback()
+                connection_pool.putconn(conn, close=bool(conn.closed))
+            finally:
+                _pool_slots.release()
+            _record_pool_stats()
         else:
             conn.close()
 
@@ -56,6 +243,7 @@ def close_all_connections():
     global connection_pool
     if connection_pool:
         connection_pool.closeall()
+        connection_pool = None
         if DEBUG:
             print("🔌 All database connections closed")
 
@@ -81,6 +269,7 @@ def get_db_cursor(commit: bool = False):
 
 def test_connection() -> dict:
     """Test the database connection."""
+    conn = None
     try:
         conn = get_connection()
         cursor = conn.cursor()
@@ -88,7 +277,6 @@ def test_connection() -> dict:
         version = cursor.fetchone()[0]
         cursor.execute("SELECT current_database();")
         db_name = cursor.fetchone()[0]
-        release_connection(conn)
         
         return {
             "status": "connected",
@@ -99,6 +287,9 @@ def test_connection() -> dict:
         }
     except Exception as e:
         return {"status": "failed", "error": str(e)}
+    finally:
+        if conn:
+            release_connection(conn)
 
 
 if __name__ == "__main__":
@@ -3,17 +3,20 @@
 Serves both API and Frontend from the same URL/port
 """
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 import uvicorn
 import os
 
 # Import configuration
 from config import (
     API_HOST, API_PORT, CORS_ORIGINS, 
-    DEBUG, RELOAD, print_config, ENVIRONMENT
+    DEBUG, RELOAD, print_config, ENVIRONMENT, METRICS_ENABLED
 )
 
 # Import routes
@@ -31,6 +34,32 @@ from routes.transport import router as transport_router
 from routes.activity_log import router as activity_log_router
 from routes.auth import router as auth_router
 from routes.upload import router as upload_router
+from routes.search import router as search_router
+from routes.autocomplete import router as autocomplete_router
+from routes.export import router as export_router
+from routes.job_import import router as job_import_router
+from routes.alert_rule import router as alert_rule_router
+from routes.admin import router as admin_router
+
+from db_connection import init_connection_pool, close_all_connections
+from services.tenant_context import TenantContextMiddleware
+from services.profiler import ProfileMiddleware
+from services import metrics, parse_pool, session_tokens, tracing
+from serialization import ORJSONResponse
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pooled DB connections (without the pool every request opens its own)
+    await run_in_threadpool(init_connection_pool)
+    # Load the session revocation list before the first request is validated
+    await run_in_threadpool(session_tokens.start_revocation_sync)
+    # Warm document parsing workers before the first upload needs them
+    parse_pool.start()
+    yield
+    parse_pool.shutdown()
+    close_all_connections()
+
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -38,7 +67,9 @@ app = FastAPI(
     description="Backend API for 4S Logistics Customs Management System",
     version="1.0.0",
     docs_url="/api/docs",  # Move docs under /api
-    redoc_url="/api/redoc"
+    redoc_url="/api/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Enable CORS
@@ -50,6 +81,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Scope each request's DB connections to its tenant (row-level security)
+app.add_middleware(TenantContextMiddleware)
+
+# ?profile=1 on any request (admins only) returns its stack-sampled profile instead of the body
+app.add_middleware(ProfileMiddleware)
+
+# Request latency / in-flight metrics (outermost, so they include the other middleware)
+if METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
+# Request spans (TRACING_EXPORTER); added last so the span covers every other middleware
+if tracing.init_tracing():
+    app.add_middleware(tracing.TracingMiddleware)
+
 # Include API routers - all under /api prefix
 # Legacy routes
 app.include_router(job_router, prefix="/api", tags=["Jobs (Legacy)"])
@@ -68,6 +113,12 @@ app.include_router(transport_router, prefix="/api", tags=["Transport"])
 app.include_router(activity_log_router, prefix="/api", tags=["Activity Logs"])
 app.include_router(auth_router, prefix="/api", tags=["Authentication"])
 app.include_router(upload_router, prefix="/api", tags=["File Upload"])
+app.include_router(search_router, prefix="/api", tags=["Search"])
+app.include_router(autocomplete_router, prefix="/api", tags=["Autocomplete"])
+app.include_router(export_router, prefix="/api", tags=["Exports"])
+app.include_router(job_import_router, prefix="/api", tags=["Jobs"])
+app.include_router(alert_rule_router, prefix="/api", tags=["Alert Rules"])
+app.include_router(admin_router, prefix="/api", tags=["Admin"])
 
 
 # ============================================================
@@ -102,6 +153,14 @@ def health_check():
     }
 
 
+if METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    def prometheus_metrics():
+        """Prometheus scrape endpoint"""
+        body, content_type = metrics.render()
+        return Response(content=body, media_type=content_type)
+
+
 # ============================================================
 # STATIC FILES (Frontend) - Only in production or when built
 # ============================================================
@@ -0,0 +1,31 @@
+-- ============================================================
+-- Migration: Trigram indexes for global search
+-- Backs /api/search (partial BL / container / vessel / customer lookups)
+-- ============================================================
+
+-- pg_trgm gives GIN-indexable ILIKE '%...%' and similarity() ranking
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- btree_gin lets tenant_id live in the same GIN index as the trigram column,
+-- so a tenant-scoped search is a single index scan instead of a recheck
+-- across every tenant's rows
+CREATE EXTENSION IF NOT EXISTS btree_gin;
+
+CREATE INDEX IF NOT EXISTS idx_jobs_job_no_trgm
+    ON jobs USING gin (tenant_id, job_no gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_bl_no_trgm
+    ON jobs USING gin (tenant_id, bl_no gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_vessel_name_trgm
+    ON jobs USING gin (tenant_id, vessel_name gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_customers_company_name_trgm
+    ON customers USING gin (tenant_id, company_name gin_trgm_ops);
+
+-- containers has no tenant_id; tenant scope comes from the join to jobs
+CREATE INDEX IF NOT EXISTS idx_containers_container_no_trgm
+    ON containers USING gin (container_no gin_trgm_ops);
+
+-- Success message
+SELECT 'Added trigram search indexes on jobs, containers and customers' as result;
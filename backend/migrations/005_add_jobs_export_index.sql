@@ -0,0 +1,12 @@
+-- ============================================================
+-- Migration: Index for tenant + date-range job scans
+-- Backs /api/exports/jobs month-end extracts
+-- ============================================================
+
+-- Lets the export walk one tenant's jobs in created_at order straight off
+-- the index, so the server-side cursor starts streaming immediately
+CREATE INDEX IF NOT EXISTS idx_jobs_tenant_created
+    ON jobs(tenant_id, created_at);
+
+-- Success message
+SELECT 'Added jobs(tenant_id, created_at) index' as result;
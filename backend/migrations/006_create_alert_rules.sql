@@ -0,0 +1,42 @@
+-- ============================================================
+-- Migration: Tenant-defined alert rules
+-- Evaluated by services/alert_rules.py on job/milestone changes
+-- and by a periodic sweep for time-based triggers
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS alert_rules (
+    id SERIAL PRIMARY KEY,
+    tenant_id INTEGER NOT NULL REFERENCES tenants(id) ON DELETE CASCADE,
+    name VARCHAR(255) NOT NULL,
+    trigger_type VARCHAR(50) NOT NULL, -- eta_within, milestone_delayed, milestone_completed, not_gated_out
+    params JSONB NOT NULL DEFAULT '{}', -- {"hours": 48}, {"milestone_code": "OOC_GRANTED"}, {"days": 3}
+    alert_type VARCHAR(20) NOT NULL DEFAULT 'email', -- email, sms, whatsapp
+    message_template TEXT NOT NULL, -- placeholders: {job_no} {bl_no} {vessel_name} {eta} {milestone}
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- One row per (rule, job, occurrence) so a rule never fires twice for the same event
+CREATE TABLE IF NOT EXISTS alert_rule_firings (
+    rule_id INTEGER NOT NULL REFERENCES alert_rules(id) ON DELETE CASCADE,
+    job_id INTEGER NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+    fire_key VARCHAR(100) NOT NULL, -- e.g. eta:2024-05-01, delayed:<milestone id>
+    fired_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (rule_id, job_id, fire_key)
+);
+
+CREATE INDEX IF NOT EXISTS idx_alert_rules_tenant_trigger
+    ON alert_rules(tenant_id, trigger_type) WHERE is_active = TRUE;
+
+-- Sweep predicates: open jobs by ETA, completed milestones by code and time
+CREATE INDEX IF NOT EXISTS idx_jobs_open_eta
+    ON jobs(tenant_id, eta) WHERE ata IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_milestones_completed_code
+    ON job_milestones(milestone_code, completed_at) WHERE status = 'completed';
+
+CREATE INDEX IF NOT EXISTS idx_milestones_job_code
+    ON job_milestones(job_id, milestone_code);
+
+-- Success message
+SELECT 'Created alert_rules and alert_rule_firings tables' as result;
@@ -0,0 +1,41 @@
+-- ============================================================
+-- Migration: Lease-based pending-alert queue + archive
+-- Backs /api/alerts/queue and services/alert_queue.py
+-- ============================================================
+
+ALTER TABLE alerts ADD COLUMN IF NOT EXISTS created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+ALTER TABLE alerts ADD COLUMN IF NOT EXISTS settled_at TIMESTAMP; -- when it became sent/failed/suppressed
+ALTER TABLE alerts ADD COLUMN IF NOT EXISTS leased_until TIMESTAMP; -- visibility timeout of the current claim
+ALTER TABLE alerts ADD COLUMN IF NOT EXISTS lease_owner VARCHAR(100); -- dispatcher holding the claim
+ALTER TABLE alerts ADD COLUMN IF NOT EXISTS attempts INTEGER NOT NULL DEFAULT 0;
+
+UPDATE alerts SET settled_at = COALESCE(sent_at, created_at)
+WHERE status <> 'pending' AND settled_at IS NULL;
+
+-- Only unsent rows live in this index, so claiming stays an index range scan
+-- no matter how much history accumulates
+CREATE INDEX IF NOT EXISTS idx_alerts_pending
+    ON alerts(id) WHERE status = 'pending';
+
+-- Settled rows by age, for moving them to the archive
+CREATE INDEX IF NOT EXISTS idx_alerts_settled
+    ON alerts(settled_at) WHERE status <> 'pending';
+
+-- Settled alerts older than the retention window (no FK: jobs may be gone)
+CREATE TABLE IF NOT EXISTS alerts_archive (
+    id INTEGER PRIMARY KEY,
+    job_id INTEGER NOT NULL,
+    alert_type VARCHAR(20) NOT NULL,
+    message TEXT NOT NULL,
+    sent_at TIMESTAMP,
+    status VARCHAR(20),
+    created_at TIMESTAMP,
+    settled_at TIMESTAMP,
+    attempts INTEGER,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_alerts_archive_job ON alerts_archive(job_id);
+
+-- Success message
+SELECT 'Added alert queue lease columns, partial indexes and alerts_archive' as result;
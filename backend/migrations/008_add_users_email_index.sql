@@ -0,0 +1,9 @@
+-- ============================================================
+-- Migration: Index users by email for login
+-- The unique key is (tenant_id, email), which can't serve a lookup by email alone
+-- ============================================================
+
+CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
+
+-- Success message
+SELECT 'Added users(email) index' as result;
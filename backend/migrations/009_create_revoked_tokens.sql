@@ -0,0 +1,17 @@
+-- ============================================================
+-- Migration: Revoked session tokens
+-- Read into memory by services/session_tokens.py; rows are only
+-- needed until the token would have expired anyway
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS revoked_tokens (
+    jti VARCHAR(64) PRIMARY KEY,
+    user_id INTEGER,
+    expires_at TIMESTAMPTZ NOT NULL,
+    revoked_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_revoked_tokens_expires ON revoked_tokens(expires_at);
+
+-- Success message
+SELECT 'Created revoked_tokens table' as result;
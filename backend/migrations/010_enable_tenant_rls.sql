@@ -0,0 +1,64 @@
+-- ============================================================
+-- Migration: Row-level tenant isolation
+--
+-- db_connection.get_connection() sets, on every checkout:
+--   app.tenant_id   - tenant of the authenticated request ('' if none)
+--   app.rls_bypass  - 'on' for system work (login lookup, workers, sweeps)
+--
+-- With neither set a session sees no tenant rows at all.
+-- FORCE makes the policies apply to the table owner (the app's DB user)
+-- as well; superusers always bypass RLS, so the app must not connect as one.
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION app_current_tenant() RETURNS INTEGER
+LANGUAGE sql STABLE AS $$
+    SELECT NULLIF(current_setting('app.tenant_id', true), '')::INTEGER
+$$;
+
+CREATE OR REPLACE FUNCTION app_rls_bypass() RETURNS BOOLEAN
+LANGUAGE sql STABLE AS $$
+    SELECT COALESCE(current_setting('app.rls_bypass', true), '') = 'on'
+$$;
+
+-- Tables with their own tenant_id
+DO $$
+DECLARE
+    t TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['users', 'customers', 'jobs', 'alert_rules', 'activity_logs']
+    LOOP
+        EXECUTE format('ALTER TABLE %I ENABLE ROW LEVEL SECURITY', t);
+        EXECUTE format('ALTER TABLE %I FORCE ROW LEVEL SECURITY', t);
+        EXECUTE format('DROP POLICY IF EXISTS tenant_isolation ON %I', t);
+        EXECUTE format(
+            'CREATE POLICY tenant_isolation ON %I
+                USING (app_rls_bypass() OR tenant_id = app_current_tenant())
+                WITH CHECK (app_rls_bypass() OR tenant_id = app_current_tenant())', t);
+    END LOOP;
+END $$;
+
+-- Tables owned through their job (jobs.id primary key lookup per row)
+DO $$
+DECLARE
+    t TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['containers', 'job_milestones', 'documents', 'alerts', 'transport',
+                             'customs_status', 'alert_rule_firings', 'alerts_archive']
+    LOOP
+        EXECUTE format('ALTER TABLE %I ENABLE ROW LEVEL SECURITY', t);
+        EXECUTE format('ALTER TABLE %I FORCE ROW LEVEL SECURITY', t);
+        EXECUTE format('DROP POLICY IF EXISTS tenant_isolation ON %I', t);
+        EXECUTE format(
+            'CREATE POLICY tenant_isolation ON %1$I
+                USING (app_rls_bypass() OR EXISTS (
+                    SELECT 1 FROM jobs j WHERE j.id = %1$I.job_id AND j.tenant_id = app_current_tenant()))
+                WITH CHECK (app_rls_bypass() OR EXISTS (
+                    SELECT 1 FROM jobs j WHERE j.id = %1$I.job_id AND j.tenant_id = app_current_tenant()))', t);
+    END LOOP;
+END $$;
+
+-- tenants (the registry used by signup/login) and milestone_templates
+-- (shared by all tenants) are intentionally left without policies.
+
+-- Success message
+SELECT 'Enabled row-level tenant isolation' as result;
@@ -0,0 +1,24 @@
+-- ============================================================
+-- Migration: Slow query plans
+-- EXPLAIN (ANALYZE, BUFFERS) output sampled from slow statements by
+-- services/slow_queries.py; reviewed via /api/admin/slow-queries (operators only).
+-- Holds no tenant values as long as plans are scrubbed of literals before they
+-- are stored (see 012_scrub_slow_query_plans.sql); no RLS, not tenant-scoped.
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS slow_query_plans (
+    id SERIAL PRIMARY KEY,
+    query_name VARCHAR(200) NOT NULL, -- module.function that ran the statement
+    normalized_sql TEXT NOT NULL,
+    params_shape VARCHAR(500),
+    duration_ms NUMERIC(12, 2) NOT NULL, -- time of the original execution
+    row_count INTEGER,
+    plan JSONB NOT NULL, -- EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)
+    captured_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_slow_query_plans_captured ON slow_query_plans(captured_at DESC);
+CREATE INDEX IF NOT EXISTS idx_slow_query_plans_name ON slow_query_plans(query_name, captured_at DESC);
+
+-- Success message
+SELECT 'Created slow_query_plans table' as result;
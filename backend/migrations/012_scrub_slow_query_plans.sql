@@ -0,0 +1,14 @@
+-- ============================================================
+-- Migration: Drop unscrubbed slow query plans
+-- Plans captured before services/slow_queries.py scrubbed literals can
+-- contain tenant values (psycopg2 interpolates parameters client-side, so
+-- Filter / Index Cond show emails, names, BL numbers). New captures are
+-- stored scrubbed and flagged; the rest are only diagnostic samples.
+-- ============================================================
+
+ALTER TABLE slow_query_plans ADD COLUMN IF NOT EXISTS literals_scrubbed BOOLEAN NOT NULL DEFAULT FALSE;
+
+DELETE FROM slow_query_plans WHERE NOT literals_scrubbed;
+
+-- Success message
+SELECT 'Removed unscrubbed slow query plans' as result;
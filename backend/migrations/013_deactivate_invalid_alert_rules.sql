@@ -0,0 +1,23 @@
+-- ============================================================
+-- Migration: Deactivate alert rules with invalid params
+-- The rule candidate queries (services/alert_rules.py) cast params->>'hours'
+-- and params->>'days' to int, and every active rule runs in one statement,
+-- so a single non-integer or huge value failed evaluation for all tenants.
+-- New rules are validated (hours 1-8760, days 1-365); rules saved before
+-- that which don't fit are switched off for their owners to fix.
+-- ============================================================
+
+UPDATE alert_rules
+SET is_active = FALSE
+WHERE is_active
+  AND (
+      (trigger_type = 'eta_within' AND NOT CASE
+          WHEN COALESCE(params->>'hours', '') ~ '^[0-9]{1,4}$' THEN (params->>'hours')::int BETWEEN 1 AND 8760
+          ELSE FALSE END)
+   OR (trigger_type = 'not_gated_out' AND NOT CASE
+          WHEN COALESCE(params->>'days', '') ~ '^[0-9]{1,3}$' THEN (params->>'days')::int BETWEEN 1 AND 365
+          ELSE FALSE END)
+  );
+
+-- Success message
+SELECT 'Deactivated alert rules with invalid params' as result;
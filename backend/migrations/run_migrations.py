@@ -28,6 +28,9 @@ def run_migration(sql_file: str):
         conn = psycopg2.connect(**DB_CONFIG)
         cursor = conn.cursor()
         
+        # Migrations see every tenant's rows (see 010_enable_tenant_rls.sql)
+        cursor.execute("SET app.rls_bypass = 'on'")
+        
         # Execute migration
         cursor.execute(sql_content)
         
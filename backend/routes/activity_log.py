@@ -9,6 +9,7 @@ from datetime import datetime
 import json
 
 from db_connection import get_connection, release_connection
+from serialization import ORJSONResponse, rows_to_dicts
 
 router = APIRouter()
 
@@ -67,17 +68,11 @@ def get_activity_logs(
         
         cursor.execute(query, tuple(params))
         
-        logs = []
         columns = ['id', 'tenant_id', 'user_id', 'entity', 'entity_id', 'action', 
                    'details', 'created_at', 'user_name', 'tenant_name']
-        
-        for row in cursor.fetchall():
-            log = dict(zip(columns, row))
-            if log['created_at']:
-                log['created_at'] = log['created_at'].isoformat()
-            logs.append(log)
+        logs = rows_to_dicts(columns, cursor.fetchall())
             
-        return {"logs": logs, "count": len(logs)}
+        return ORJSONResponse({"logs": logs, "count": len(logs)})
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch activity logs: {str(e)}")
@@ -107,7 +102,7 @@ def create_activity_log(log: ActivityLogCreate):
         
         return {
             "id": row[0], 
-            "created_at": row[1].isoformat() if row[1] else None,
+            "created_at": row[1],
             "message": "Activity logged"
         }
         
@@ -137,17 +132,11 @@ def get_entity_activity(entity: str, entity_id: int):
             ORDER BY a.created_at DESC
         """, (entity, entity_id))
         
-        logs = []
         columns = ['id', 'tenant_id', 'user_id', 'entity', 'entity_id', 'action', 
                    'details', 'created_at', 'user_name']
-        
-        for row in cursor.fetchall():
-            log = dict(zip(columns, row))
-            if log['created_at']:
-                log['created_at'] = log['created_at'].isoformat()
-            logs.append(log)
+        logs = rows_to_dicts(columns, cursor.fetchall())
             
-        return {"logs": logs, "count": len(logs)}
+        return ORJSONResponse({"logs": logs, "count": len(logs)})
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch activity: {str(e)}")
@@ -0,0 +1,102 @@
+"""
+Admin Routes - Operational endpoints for platform operators
+(admins of an OPERATOR_TENANT_IDS tenant; see session_tokens.require_operator)
+Slow query plans are captured by services/slow_queries.py,
+profiles are taken by services/profiler.py
+"""
+
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import Response
+from typing import Optional
+import os
+
+from db_connection import get_connection, release_connection
+from serialization import row_to_dict, rows_to_dicts
+from services import profiler
+from services.session_tokens import require_operator
+
+router = APIRouter()
+
+PLAN_SUMMARY_COLUMNS = ['id', 'query_name', 'normalized_sql', 'params_shape', 'duration_ms',
+                        'row_count', 'captured_at']
+
+
+# ============== Routes ==============
+
+@router.get("/admin/slow-queries", response_model=dict)
+def get_slow_query_plans(
+    query_name: Optional[str] = None,
+    limit: int = 50,
+    session: dict = Depends(require_operator)
+):
+    """Recently captured slow query plans (newest first), without the plan bodies."""
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+
+        query = f"SELECT {', '.join(PLAN_SUMMARY_COLUMNS)} FROM slow_query_plans"
+        params = []
+        if query_name:
+            query += " WHERE query_name = %s"
+            params.append(query_name)
+        query += " ORDER BY captured_at DESC LIMIT %s"
+        params.append(max(1, min(limit, 500)))
+
+        cursor.execute(query, tuple(params))
+        plans = rows_to_dicts(PLAN_SUMMARY_COLUMNS, cursor.fetchall())
+
+        return {"plans": plans, "count": len(plans)}
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch slow query plans: {str(e)}")
+    finally:
+        if conn:
+            release_connection(conn)
+
+
+@router.get("/admin/slow-queries/{plan_id}", response_model=dict)
+def get_slow_query_plan(plan_id: int, session: dict = Depends(require_operator)):
+    """One captured plan with its EXPLAIN (ANALYZE, BUFFERS) output."""
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute(f"""
+            SELECT {', '.join(PLAN_SUMMARY_COLUMNS)}, plan
+            FROM slow_query_plans WHERE id = %s
+        """, (plan_id,))
+        row = cursor.fetchone()
+        if not row:
+            raise HTTPException(status_code=404, detail=f"Slow query plan {plan_id} not found")
+
+        return {"plan": row_to_dict(PLAN_SUMMARY_COLUMNS + ['plan'], row)}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch slow query plan: {str(e)}")
+    finally:
+        if conn:
+            release_connection(conn)
+
+
+@router.get("/admin/profile")
+def profile_worker(
+    seconds: float = Query(10, gt=0, description="Sampling duration (capped at PROFILE_MAX_SECONDS)"),
+    interval_ms: float = Query(5, ge=1, le=100, description="Milliseconds between stack samples"),
+    format: str = Query("speedscope", description="speedscope or folded"),
+    session: dict = Depends(require_operator)
+):
+    """Sample every thread of the worker that serves this request and return a flamegraph file."""
+    if format not in ("speedscope", "folded"):
+        raise HTTPException(status_code=400, detail="Invalid format. Must be one of: ['speedscope', 'folded']")
+    try:
+        sampler = profiler.profile_for(seconds, interval_ms / 1000)
+    except profiler.ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    body, media_type, filename = profiler.render(sampler, f"worker {os.getpid()} ({sampler.duration:.1f}s)", format)
+    return Response(content=body, media_type=media_type,
+                    headers={"Content-Disposition": f'attachment; filename="{filename}"'})
@@ -1,13 +1,18 @@
 """
 Alert Routes - API endpoints for managing alerts (notifications)
+The /alerts/queue endpoints work across every tenant (services/alert_queue.py
+runs under system_context()), so they are for operators only.
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 
 from db_connection import get_connection, release_connection
+from serialization import ORJSONResponse, rows_to_dicts
+from services import alert_queue
+from services.session_tokens import require_operator
 
 router = APIRouter()
 
@@ -24,6 +29,27 @@ class AlertUpdate(BaseModel):
     status: Optional[str] = None  # pending, sent, failed
 
 
+class QueueClaim(BaseModel):
+    owner: str = Field(..., max_length=100, description="Dispatcher name holding the lease")
+    limit: int = Field(50, ge=1, le=1000, description="Max alerts to lease")
+    visibility_timeout: int = Field(60, ge=1, le=3600, description="Seconds before unsettled alerts become visible again")
+
+
+class QueueResult(BaseModel):
+    id: int
+    status: str  # sent, failed, suppressed
+
+
+class QueueAck(BaseModel):
+    owner: str = Field(..., max_length=100)
+    results: List[QueueResult]
+
+
+class QueueRelease(BaseModel):
+    owner: str = Field(..., max_length=100)
+    ids: List[int]
+
+
 # ============== Routes ==============
 
 @router.get("/alerts", response_model=dict)
@@ -53,16 +79,10 @@ def get_all_alerts(job_id: Optional[int] = None, status: Optional[str] = None):
         
         cursor.execute(query, tuple(params))
         
-        alerts = []
         columns = ['id', 'job_id', 'alert_type', 'message', 'sent_at', 'status', 'job_no']
-        
-        for row in cursor.fetchall():
-            alert = dict(zip(columns, row))
-            if alert['sent_at']:
-                alert['sent_at'] = alert['sent_at'].isoformat()
-            alerts.append(alert)
+        alerts = rows_to_dicts(columns, cursor.fetchall())
             
-        return {"alerts": alerts, "count": len(alerts)}
+        return ORJSONResponse({"alerts": alerts, "count": len(alerts)})
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch alerts: {str(e)}")
@@ -101,6 +121,82 @@ def create_alert(alert: AlertCreate):
             release_connection(conn)
 
 
+@router.post("/alerts/dispatch", response_model=dict)
+def dispatch_alerts(batch_size: Optional[int] = None, session: dict = Depends(require_operator)):
+    """Run one dispatch cycle now (the worker normally does this continuously)."""
+    try:
+        from services.alert_dispatcher import dispatch_once
+        summary = dispatch_once(batch_size) if batch_size else dispatch_once()
+        return {**summary, "message": f"Dispatched {summary['sent']} alerts"}
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to dispatch alerts: {str(e)}")
+
+
+@router.get("/alerts/queue", response_model=dict)
+def peek_alert_queue(limit: int = 50, session: dict = Depends(require_operator)):
+    """Visible (pending, unleased) alerts in the order dispatchers will claim them."""
+    try:
+        alerts = alert_queue.peek(min(limit, 1000))
+        return {"alerts": alerts, "count": len(alerts)}
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch alert queue: {str(e)}")
+
+
+@router.post("/alerts/queue/claim", response_model=dict)
+def claim_alerts(claim: QueueClaim, session: dict = Depends(require_operator)):
+    """Lease pending alerts to a dispatcher; unsettled leases expire after visibility_timeout."""
+    try:
+        alerts = alert_queue.claim(claim.owner, claim.limit, claim.visibility_timeout)
+        return {"alerts": alerts, "count": len(alerts)}
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to claim alerts: {str(e)}")
+
+
+@router.post("/alerts/queue/ack", response_model=dict)
+def ack_alerts(ack: QueueAck, session: dict = Depends(require_operator)):
+    """Settle leased alerts as sent/failed/suppressed."""
+    try:
+        settled = alert_queue.ack(ack.owner, [(r.id, r.status) for r in ack.results])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to acknowledge alerts: {str(e)}")
+
+    settled_ids = set(settled)
+    return {
+        "settled": settled,
+        "lease_lost": [r.id for r in ack.results if r.id not in settled_ids],
+        "message": f"Settled {len(settled)} alerts"
+    }
+
+
+@router.post("/alerts/queue/release", response_model=dict)
+def release_alerts(release: QueueRelease, session: dict = Depends(require_operator)):
+    """Return leased alerts to the queue before their visibility timeout."""
+    try:
+        released = alert_queue.release(release.owner, release.ids)
+        return {"released": released, "message": f"Released {released} alerts"}
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to release alerts: {str(e)}")
+
+
+@router.post("/alerts/queue/archive", response_model=dict)
+def archive_alerts(older_than_days: Optional[int] = None, session: dict = Depends(require_operator)):
+    """Move settled alerts past the retention window into alerts_archive."""
+    if older_than_days is not None and older_than_days < 0:
+        raise HTTPException(status_code=400, detail="older_than_days must be >= 0")
+    try:
+        archived = alert_queue.archive() if older_than_days is None else alert_queue.archive(older_than_days)
+        return {"archived": archived, "message": f"Archived {archived} alerts"}
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to archive alerts: {str(e)}")
+
+
 @router.put("/alerts/{alert_id}", response_model=dict)
 def update_alert(alert_id: int, alert: AlertUpdate):
     """Update alert status (mark as sent/failed)."""
@@ -116,16 +212,23 @@ def update_alert(alert_id: int, alert: AlertUpdate):
         if alert.status == 'sent':
             sent_at = datetime.now()
         
+        # Settling by hand also drops any dispatcher lease
+        settled_at = None if alert.status == 'pending' else datetime.now()
+        
         if sent_at:
             cursor.execute("""
-                UPDATE alerts SET status = %s, sent_at = %s WHERE id = %s
+                UPDATE alerts SET status = %s, sent_at = %s, settled_at = %s,
+                                  leased_until = NULL, lease_owner = NULL
+                WHERE id = %s
                 RETURNING id, status, sent_at
-            """, (alert.status, sent_at, alert_id))
+            """, (alert.status, sent_at, settled_at, alert_id))
         else:
             cursor.execute("""
-                UPDATE alerts SET status = %s WHERE id = %s
+                UPDATE alerts SET status = %s, settled_at = %s,
+                                  leased_until = NULL, lease_owner = NULL
+                WHERE id = %s
                 RETURNING id, status, sent_at
-            """, (alert.status, alert_id))
+            """, (alert.status, settled_at, alert_id))
         
         row = cursor.fetchone()
         if not row:
@@ -136,7 +239,7 @@ def update_alert(alert_id: int, alert: AlertUpdate):
         return {
             "id": row[0], 
             "status": row[1],
-            "sent_at": row[2].isoformat() if row[2] else None,
+            "sent_at": row[2],
             "message": "Alert updated"
         }
         
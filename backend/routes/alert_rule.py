@@ -0,0 +1,210 @@
+"""
+Alert Rule Routes - API endpoints for tenant-defined automatic alert triggers
+Rules are evaluated by services/alert_rules.py
+"""
+
+from fastapi import APIRouter, HTTPException, Depends
+from pydantic import BaseModel, Field
+from typing import Optional
+import json
+
+from db_connection import get_connection, release_connection
+from serialization import ORJSONResponse, row_to_dict
+from services.alert_rules import validate_rule, validate_alert_type, run_sweep
+from services.session_tokens import require_operator
+
+router = APIRouter()
+
+
+# ============== Pydantic Models ==============
+
+class AlertRuleCreate(BaseModel):
+    tenant_id: int = Field(..., description="Tenant ID")
+    name: str = Field(..., description="Rule name")
+    trigger_type: str = Field(..., description="eta_within, milestone_delayed, milestone_completed, not_gated_out")
+    params: dict = Field(default_factory=dict, description='e.g. {"hours": 48} or {"milestone_code": "OOC_GRANTED"}')
+    alert_type: str = Field("email", description="Alert type: email, sms, whatsapp")
+    message_template: str = Field(..., description="Message with {job_no} {bl_no} {vessel_name} {eta} {milestone}")
+
+
+class AlertRuleUpdate(BaseModel):
+    name: Optional[str] = None
+    params: Optional[dict] = None
+    alert_type: Optional[str] = None
+    message_template: Optional[str] = None
+    is_active: Optional[bool] = None
+
+
+RULE_COLUMNS = ['id', 'tenant_id', 'name', 'trigger_type', 'params', 'alert_type',
+                'message_template', 'is_active', 'created_at']
+
+
+def _rule_to_dict(row) -> dict:
+    return row_to_dict(RULE_COLUMNS, row)
+
+
+# ============== Routes ==============
+
+@router.get("/alert-rules", response_model=dict)
+def get_alert_rules(tenant_id: Optional[int] = None):
+    """Get all alert rules, optionally filtered by tenant."""
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+
+        query = f"SELECT {', '.join(RULE_COLUMNS)} FROM alert_rules"
+        params = []
+        if tenant_id:
+            query += " WHERE tenant_id = %s"
+            params.append(tenant_id)
+        query += " ORDER BY id"
+
+        cursor.execute(query, tuple(params))
+        rules = [_rule_to_dict(row) for row in cursor.fetchall()]
+
+        return ORJSONResponse({"rules": rules, "count": len(rules)})
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch alert rules: {str(e)}")
+    finally:
+        if conn:
+            release_connection(conn)
+
+
+@router.post("/alert-rules", response_model=dict)
+def create_alert_rule(rule: AlertRuleCreate):
+    """Create an alert rule."""
+    try:
+        params = validate_rule(rule.trigger_type, rule.params)
+        validate_alert_type(rule.alert_type)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute(f"""
+            INSERT INTO alert_rules (tenant_id, name, trigger_type, params, alert_type, message_template)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            RETURNING {', '.join(RULE_COLUMNS)}
+        """, (rule.tenant_id, rule.name, rule.trigger_type, json.dumps(params),
+              rule.alert_type, rule.message_template))
+
+        row = cursor.fetchone()
+        conn.commit()
+
+        return {"rule": _rule_to_dict(row), "message": "Alert rule created successfully"}
+
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        if "foreign key" in str(e).lower():
+            raise HTTPException(status_code=400, detail="Tenant not found")
+        raise HTTPException(status_code=500, detail=f"Failed to create alert rule: {str(e)}")
+    finally:
+        if conn:
+            release_connection(conn)
+
+
+@router.post("/alert-rules/sweep", response_model=dict)
+def sweep_alert_rules(session: dict = Depends(require_operator)):
+    """Evaluate time-based rules now across all tenants (the sweeper worker normally does this periodically)."""
+    try:
+        queued = run_sweep()
+        return {"queued": queued, "message": f"Queued {queued} alerts"}
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to sweep alert rules: {str(e)}")
+
+
+@router.put("/alert-rules/{rule_id}", response_model=dict)
+def update_alert_rule(rule_id: int, rule: AlertRuleUpdate):
+    """Update an alert rule."""
+    if rule.alert_type:
+        try:
+            validate_alert_type(rule.alert_type)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+
+        if rule.params is not None:
+            cursor.execute("SELECT trigger_type FROM alert_rules WHERE id = %s", (rule_id,))
+            existing = cursor.fetchone()
+            if not existing:
+                raise HTTPException(status_code=404, detail=f"Alert rule {rule_id} not found")
+            try:
+                rule_params = validate_rule(existing[0], rule.params)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+        updates = []
+        params = []
+
+        if rule.name: updates.append("name = %s"); params.append(rule.name)
+        if rule.params is not None: updates.append("params = %s"); params.append(json.dumps(rule_params))
+        if rule.alert_type: updates.append("alert_type = %s"); params.append(rule.alert_type)
+        if rule.message_template: updates.append("message_template = %s"); params.append(rule.message_template)
+        if rule.is_active is not None: updates.append("is_active = %s"); params.append(rule.is_active)
+
+        if not updates:
+            raise HTTPException(status_code=400, detail="No fields to update")
+
+        params.append(rule_id)
+
+        cursor.execute(f"""
+            UPDATE alert_rules SET {', '.join(updates)} WHERE id = %s
+            RETURNING {', '.join(RULE_COLUMNS)}
+        """, tuple(params))
+
+        row = cursor.fetchone()
+        if not row:
+            raise HTTPException(status_code=404, detail=f"Alert rule {rule_id} not found")
+
+        conn.commit()
+
+        return {"rule": _rule_to_dict(row), "message": "Alert rule updated"}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to update alert rule: {str(e)}")
+    finally:
+        if conn:
+            release_connection(conn)
+
+
+@router.delete("/alert-rules/{rule_id}")
+def delete_alert_rule(rule_id: int):
+    """Delete an alert rule."""
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute("DELETE FROM alert_rules WHERE id = %s RETURNING id", (rule_id,))
+        deleted = cursor.fetchone()
+
+        if not deleted:
+            raise HTTPException(status_code=404, detail=f"Alert rule {rule_id} not found")
+
+        conn.commit()
+        return {"message": f"Alert rule deleted successfully"}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to delete alert rule: {str(e)}")
+    finally:
+        if conn:
+            release_connection(conn)
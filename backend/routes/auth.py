@@ -1,13 +1,19 @@
 """
 Authentication Routes - Login/Signup verification
+Password hashing/verification runs on the bounded pool in services/passwords.py
+Successful logins return a signed session token (services/session_tokens.py)
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
 from typing import Optional
-import hashlib
 
-from db_connection import get_connection, release_connection
+from db_connection import get_connection, release_connection, system_context
+from services import passwords
+from services.session_tokens import issue_token, revoke, require_session
+from services.rate_limiter import RateLimiter, client_ip, enforce
+from config import LOGIN_RATE_LIMIT_PER_IP, LOGIN_RATE_LIMIT_PER_EMAIL
 
 router = APIRouter()
 
@@ -23,72 +29,164 @@ class LoginResponse(BaseModel):
     success: bool
     user: Optional[dict] = None
     tenant: Optional[dict] = None
+    token: Optional[str] = None  # send as "Authorization: Bearer <token>"
+    expires_at: Optional[int] = None  # epoch seconds
     message: str
 
 
-# ============== Routes ==============
+# Same email may exist under several tenants; each candidate's password is checked
+MAX_LOGIN_CANDIDATES = 5
 
-@router.post("/auth/login", response_model=LoginResponse)
-def login(request: LoginRequest):
-    """Authenticate user with email and password."""
+# Checked before any DB or hashing work
+ip_limiter = RateLimiter("auth:ip", *LOGIN_RATE_LIMIT_PER_IP)
+email_limiter = RateLimiter("auth:email", *LOGIN_RATE_LIMIT_PER_EMAIL)
+
+
+def _normalize_email(email: str) -> str:
+    return (email or "").strip().lower()
+
+
+def _find_login_candidates(email: str) -> list:
+    """Users with this email (idx_users_email), with their tenant."""
     conn = None
     try:
-        conn = get_connection()
+        with system_context():
+            conn = get_connection()
         cursor = conn.cursor()
-        
-        # Hash the password the same way user.py does (SHA256)
-        password_hash = hashlib.sha256(request.password.encode()).hexdigest()
-        
-        # Find user by email and password_hash
         cursor.execute("""
-            SELECT u.id, u.tenant_id, u.name, u.email, u.role,
+            SELECT u.id, u.tenant_id, u.name, u.email, u.role, u.password_hash,
                    t.company_name, t.plan
             FROM users u
             JOIN tenants t ON u.tenant_id = t.id
-            WHERE u.email = %s AND u.password_hash = %s
-        """, (request.email, password_hash))
-        
-        row = cursor.fetchone()
-        
-        if not row:
-            return LoginResponse(
-                success=False,
-                message="Invalid email or password"
-            )
-        
-        user_id, tenant_id, name, email, role, company_name, plan = row
-        
+            WHERE u.email = %s
+            ORDER BY u.id
+            LIMIT %s
+        """, (email, MAX_LOGIN_CANDIDATES))
+        return cursor.fetchall()
+    finally:
+        if conn:
+            release_connection(conn)
+
+
+def _upgrade_password_hash(user_id: int, old_hash: str, new_hash: str):
+    """Replace a legacy/outdated hash, unless the password changed in the meantime."""
+    conn = None
+    try:
+        with system_context():
+            conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE users SET password_hash = %s WHERE id = %s AND password_hash = %s",
+            (new_hash, user_id, old_hash)
+        )
+        conn.commit()
+    except Exception:
+        if conn:
+            conn.rollback()
+        raise
+    finally:
+        if conn:
+            release_connection(conn)
+
+
+# ============== Routes ==============
+
+@router.post("/auth/login", response_model=LoginResponse)
+async def login(request: LoginRequest, raw_request: Request):
+    """Authenticate user with email and password."""
+    # The limiter may call Redis; keep it off the event loop
+    await run_in_threadpool(
+        enforce, (ip_limiter, client_ip(raw_request)), (email_limiter, _normalize_email(request.email))
+    )
+
+    try:
+        candidates = await run_in_threadpool(_find_login_candidates, request.email)
+
+        if not candidates:
+            await passwords.verify_dummy_async(request.password)
+            return LoginResponse(success=False, message="Invalid email or password")
+
+        for row in candidates:
+            matches, needs_rehash = await passwords.verify_password_async(request.password, row[5])
+            if matches:
+                break
+        else:
+            return LoginResponse(success=False, message="Invalid email or password")
+
+        user_id, tenant_id, name, email, role, password_hash, company_name, plan = row
+
+        # Transparently move SHA-256 / lower-cost hashes to the current scheme
+        if needs_rehash:
+            try:
+                new_hash = await passwords.hash_password_async(request.password)
+                await run_in_threadpool(_upgrade_password_hash, user_id, password_hash, new_hash)
+            except Exception as e:
+                print(f"⚠️ Password hash upgrade failed for user {user_id}: {e}")
+
+        user = {
+            "id": user_id,
+            "tenant_id": tenant_id,
+            "name": name,
+            "email": email,
+            "role": role
+        }
+        tenant = {
+            "id": tenant_id,
+            "company_name": company_name,
+            "plan": plan
+        }
+        token, expires_at = issue_token(user, tenant)
+
         # Return user and tenant info
         return LoginResponse(
             success=True,
-            user={
-                "id": user_id,
-                "tenant_id": tenant_id,
-                "name": name,
-                "email": email,
-                "role": role
-            },
-            tenant={
-                "id": tenant_id,
-                "company_name": company_name,
-                "plan": plan
-            },
+            user=user,
+            tenant=tenant,
+            token=token,
+            expires_at=expires_at,
             message="Login successful"
         )
-        
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Login failed: {str(e)}")
-    finally:
-        if conn:
-            release_connection(conn)
+
+
+@router.get("/auth/me")
+def get_current_session(session: dict = Depends(require_session)):
+    """Who the bearer token belongs to (answered from the token, no database lookup)."""
+    return {
+        "user": {
+            "id": session["user_id"],
+            "tenant_id": session["tenant_id"],
+            "name": session["name"],
+            "email": session["email"],
+            "role": session["role"]
+        },
+        "tenant": {"id": session["tenant_id"], "plan": session["plan"]},
+        "expires_at": session["exp"]
+    }
+
+
+@router.post("/auth/logout")
+def logout(session: dict = Depends(require_session)):
+    """Revoke the bearer token in every API process."""
+    try:
+        revoke({"jti": session["jti"], "sub": session["user_id"], "exp": session["exp"]})
+        return {"message": "Logged out"}
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Logout failed: {str(e)}")
 
 
 @router.post("/auth/verify-email")
-def verify_email(email: str):
+def verify_email(email: str, raw_request: Request):
     """Check if email exists (for forgot password)."""
+    enforce((ip_limiter, client_ip(raw_request)), (email_limiter, _normalize_email(email)))
+
     conn = None
     try:
-        conn = get_connection()
+        with system_context():
+            conn = get_connection()
         cursor = conn.cursor()
         
         cursor.execute("SELECT id, name FROM users WHERE email = %s", (email,))
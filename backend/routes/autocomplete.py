@@ -0,0 +1,32 @@
+"""
+Autocomplete Routes - Typeahead suggestions for the job wizard pickers
+Served from the per-tenant in-memory prefix index in services/autocomplete.py
+"""
+
+from fastapi import APIRouter, HTTPException
+
+from services import autocomplete
+
+router = APIRouter()
+
+
+MAX_SUGGESTIONS = 50
+
+
+# ============== Routes ==============
+
+@router.get("/autocomplete/{field}", response_model=dict)
+def get_suggestions(field: str, tenant_id: int, q: str = "", limit: int = 10):
+    """Get suggestions for customer, shipping_line, vessel_name or port starting with `q`."""
+    if field not in autocomplete.FIELDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid field. Must be one of: {autocomplete.FIELDS}"
+        )
+
+    try:
+        suggestions = autocomplete.suggest(tenant_id, field, q, max(1, min(limit, MAX_SUGGESTIONS)))
+        return {"field": field, "query": q, "suggestions": suggestions, "count": len(suggestions)}
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch suggestions: {str(e)}")
@@ -6,11 +6,17 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 from typing import Optional, List
 
+from psycopg2.extras import execute_values
+
 from db_connection import get_connection, release_connection
 
 router = APIRouter()
 
 
+# Largest array accepted by the batch endpoints (one BL rarely exceeds ~100)
+MAX_BATCH_SIZE = 500
+
+
 # ============== Pydantic Models ==============
 
 class ContainerCreate(BaseModel):
@@ -29,6 +35,20 @@ class ContainerUpdate(BaseModel):
     status: Optional[str] = None  # pending, discharged, in_transit, delivered
 
 
+class ContainerBatchCreate(BaseModel):
+    containers: List[ContainerCreate] = Field(..., description="Containers to add")
+
+
+class ContainerBatchStatusUpdate(BaseModel):
+    status: str = Field(..., description="New status: pending, discharged, in_transit, delivered")
+    job_id: Optional[int] = None  # update every container on this job
+    container_ids: Optional[List[int]] = None  # or only these containers
+
+
+class ContainerBatchDelete(BaseModel):
+    container_ids: List[int] = Field(..., description="Container IDs to delete")
+
+
 # ============== Routes ==============
 
 @router.get("/containers", response_model=dict)
@@ -98,6 +118,167 @@ def create_container(container: ContainerCreate):
             release_connection(conn)
 
 
+@router.post("/containers/batch", response_model=dict)
+def create_containers_batch(batch: ContainerBatchCreate):
+    """Create many containers in one transaction (single multi-row INSERT)."""
+    if not batch.containers:
+        raise HTTPException(status_code=400, detail="No containers given")
+    if len(batch.containers) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SIZE} containers per batch")
+    
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        
+        # Resolve all referenced jobs up front so one bad job_id fails only its items
+        job_ids = list({c.job_id for c in batch.containers})
+        cursor.execute("SELECT id FROM jobs WHERE id = ANY(%s)", (job_ids,))
+        existing_jobs = {r[0] for r in cursor.fetchall()}
+        
+        results = [None] * len(batch.containers)
+        valid = []
+        for index, c in enumerate(batch.containers):
+            if c.job_id not in existing_jobs:
+                results[index] = {"index": index, "container_no": c.container_no, "success": False, "error": "Job not found"}
+            else:
+                valid.append((index, c))
+        
+        if valid:
+            # RETURNING order isn't guaranteed to follow VALUES, so each item gets
+            # its id up front and the returned rows are matched back by id
+            cursor.execute("SELECT nextval(pg_get_serial_sequence('containers', 'id')) FROM generate_series(1, %s)",
+                           (len(valid),))
+            ids = [r[0] for r in cursor.fetchall()]
+            rows = execute_values(cursor, """
+                INSERT INTO containers (id, job_id, container_no, size, type, seal_no)
+                VALUES %s
+                RETURNING id, container_no, status
+            """, [(container_id, c.job_id, c.container_no, c.size, c.type, c.seal_no)
+                  for container_id, (_, c) in zip(ids, valid)],
+                page_size=len(valid), fetch=True)
+            
+            rows_by_id = {row[0]: row for row in rows}
+            for container_id, (index, _) in zip(ids, valid):
+                row = rows_by_id[container_id]
+                results[index] = {"index": index, "id": row[0], "container_no": row[1], "status": row[2], "success": True}
+        
+        conn.commit()
+        
+        created = len(valid)
+        return {
+            "results": results,
+            "created": created,
+            "failed": len(results) - created,
+            "message": f"{created} containers added"
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to create containers: {str(e)}")
+    finally:
+        if conn:
+            release_connection(conn)
+
+
+@router.put("/containers/batch/status", response_model=dict)
+def update_containers_status_batch(batch: ContainerBatchStatusUpdate):
+    """Set the status of every container on a job, or of the given containers, in one UPDATE."""
+    if batch.job_id is None and not batch.container_ids:
+        raise HTTPException(status_code=400, detail="Either job_id or container_ids is required")
+    if batch.container_ids and len(batch.container_ids) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SIZE} containers per batch")
+    
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        
+        conditions = []
+        params = [batch.status]
+        if batch.job_id is not None:
+            conditions.append("job_id = %s"); params.append(batch.job_id)
+        if batch.container_ids:
+            conditions.append("id = ANY(%s)"); params.append(batch.container_ids)
+        
+        cursor.execute(f"""
+            UPDATE containers SET status = %s WHERE {' AND '.join(conditions)}
+            RETURNING id, container_no, status
+        """, tuple(params))
+        
+        updated = {r[0]: r for r in cursor.fetchall()}
+        conn.commit()
+        
+        if batch.container_ids:
+            results = []
+            for container_id in batch.container_ids:
+                row = updated.get(container_id)
+                if row:
+                    results.append({"id": row[0], "container_no": row[1], "status": row[2], "success": True})
+                else:
+                    results.append({"id": container_id, "success": False, "error": "Container not found"})
+        else:
+            results = [{"id": r[0], "container_no": r[1], "status": r[2], "success": True} for r in updated.values()]
+        
+        return {
+            "results": results,
+            "updated": len(updated),
+            "message": f"{len(updated)} containers marked {batch.status}"
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to update containers: {str(e)}")
+    finally:
+        if conn:
+            release_connection(conn)
+
+
+@router.post("/containers/batch/delete", response_model=dict)
+def delete_containers_batch(batch: ContainerBatchDelete):
+    """Delete many containers in one statement."""
+    if not batch.container_ids:
+        raise HTTPException(status_code=400, detail="No container IDs given")
+    if len(batch.container_ids) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SIZE} containers per batch")
+    
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("DELETE FROM containers WHERE id = ANY(%s) RETURNING id", (batch.container_ids,))
+        deleted = {r[0] for r in cursor.fetchall()}
+        conn.commit()
+        
+        results = [
+            {"id": container_id, "success": True} if container_id in deleted
+            else {"id": container_id, "success": False, "error": "Container not found"}
+            for container_id in batch.container_ids
+        ]
+        return {
+            "results": results,
+            "deleted": len(deleted),
+            "message": f"{len(deleted)} containers deleted"
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to delete containers: {str(e)}")
+    finally:
+        if conn:
+            release_connection(conn)
+
+
 @router.get("/containers/{container_id}", response_model=dict)
 def get_container(container_id: int):
     """Get a specific container."""
@@ -8,6 +8,8 @@ from typing import Optional, List
 from datetime import datetime
 
 from db_connection import get_connection, release_connection
+from serialization import ORJSONResponse, row_to_dict, rows_to_dicts
+from services import autocomplete, response_cache
 
 router = APIRouter()
 
@@ -39,12 +41,13 @@ class CustomerResponse(BaseModel):
     phone: Optional[str]
     email: Optional[str]
     gst_no: Optional[str]
-    created_at: Optional[str]
+    created_at: Optional[datetime]
 
 
 # ============== Routes ==============
 
 @router.get("/customers", response_model=dict)
+@response_cache.cached("customers")
 def get_all_customers(tenant_id: Optional[int] = None):
     """Get all customers, optionally filtered by tenant."""
     conn = None
@@ -63,16 +66,10 @@ def get_all_customers(tenant_id: Optional[int] = None):
                 FROM customers ORDER BY company_name ASC
             """)
         
-        customers = []
         columns = ['id', 'tenant_id', 'company_name', 'contact_person', 'phone', 'email', 'gst_no', 'created_at']
-        
-        for row in cursor.fetchall():
-            customer = dict(zip(columns, row))
-            if customer['created_at']:
-                customer['created_at'] = customer['created_at'].isoformat()
-            customers.append(customer)
+        customers = rows_to_dicts(columns, cursor.fetchall())
             
-        return {"customers": customers, "count": len(customers)}
+        return ORJSONResponse({"customers": customers, "count": len(customers)})
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch customers: {str(e)}")
@@ -100,9 +97,10 @@ def create_customer(customer: CustomerCreate):
         conn.commit()
         
         columns = ['id', 'tenant_id', 'company_name', 'contact_person', 'phone', 'email', 'gst_no', 'created_at']
-        result = dict(zip(columns, row))
-        if result['created_at']:
-            result['created_at'] = result['created_at'].isoformat()
+        result = row_to_dict(columns, row)
+        
+        autocomplete.record_customer(result['tenant_id'], result['id'], result['company_name'])
+        response_cache.invalidate("customers", result['tenant_id'])
         
         return result
         
@@ -135,9 +133,7 @@ def get_customer(customer_id: int):
             raise HTTPException(status_code=404, detail=f"Customer {customer_id} not found")
         
         columns = ['id', 'tenant_id', 'company_name', 'contact_person', 'phone', 'email', 'gst_no', 'created_at']
-        result = dict(zip(columns, row))
-        if result['created_at']:
-            result['created_at'] = result['created_at'].isoformat()
+        result = row_to_dict(columns, row)
         
         return result
         
@@ -184,9 +180,11 @@ def update_customer(customer_id: int, customer: CustomerUpdate):
         conn.commit()
         
         columns = ['id', 'tenant_id', 'company_name', 'contact_person', 'phone', 'email', 'gst_no', 'created_at']
-        result = dict(zip(columns, row))
-        if result['created_at']:
-            result['created_at'] = result['created_at'].isoformat()
+        result = row_to_dict(columns, row)
+        
+        autocomplete.record_customer(result['tenant_id'], result['id'], result['company_name'])
+        response_cache.invalidate("customers", result['tenant_id'])
+        response_cache.invalidate("new_jobs", result['tenant_id'])  # job lists show customer_name
         
         return result
         
@@ -209,13 +207,17 @@ def delete_customer(customer_id: int):
         conn = get_connection()
         cursor = conn.cursor()
         
-        cursor.execute("DELETE FROM customers WHERE id = %s RETURNING id", (customer_id,))
+        cursor.execute("DELETE FROM customers WHERE id = %s RETURNING id, tenant_id", (customer_id,))
         deleted = cursor.fetchone()
         
         if not deleted:
             raise HTTPException(status_code=404, detail=f"Customer {customer_id} not found")
         
         conn.commit()
+        
+        autocomplete.remove_customer(deleted[1], deleted[0])
+        response_cache.invalidate("customers", deleted[1])
+        response_cache.invalidate("new_jobs", deleted[1])
         return {"message": f"Customer {customer_id} deleted successfully"}
         
     except HTTPException:
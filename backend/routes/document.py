@@ -8,6 +8,7 @@ from typing import Optional, List
 from datetime import datetime
 
 from db_connection import get_connection, release_connection
+from serialization import ORJSONResponse, row_to_dict, rows_to_dicts
 
 router = APIRouter()
 
@@ -57,16 +58,10 @@ def get_all_documents(job_id: Optional[int] = None, doc_type: Optional[str] = No
         
         cursor.execute(query, tuple(params))
         
-        documents = []
         columns = ['id', 'job_id', 'doc_type', 'file_url', 'uploaded_by', 'uploaded_at', 'job_no', 'uploader_name']
-        
-        for row in cursor.fetchall():
-            doc = dict(zip(columns, row))
-            if doc['uploaded_at']:
-                doc['uploaded_at'] = doc['uploaded_at'].isoformat()
-            documents.append(doc)
+        documents = rows_to_dicts(columns, cursor.fetchall())
             
-        return {"documents": documents, "count": len(documents)}
+        return ORJSONResponse({"documents": documents, "count": len(documents)})
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch documents: {str(e)}")
@@ -95,7 +90,7 @@ def create_document(document: DocumentCreate):
         return {
             "id": row[0], 
             "doc_type": row[1],
-            "uploaded_at": row[2].isoformat() if row[2] else None,
+            "uploaded_at": row[2],
             "message": "Document added successfully"
         }
         
@@ -132,11 +127,9 @@ def get_document(document_id: int):
             raise HTTPException(status_code=404, detail=f"Document {document_id} not found")
         
         columns = ['id', 'job_id', 'doc_type', 'file_url', 'uploaded_by', 'uploaded_at', 'job_no', 'uploader_name']
-        doc = dict(zip(columns, row))
-        if doc['uploaded_at']:
-            doc['uploaded_at'] = doc['uploaded_at'].isoformat()
+        doc = row_to_dict(columns, row)
         
-        return {"document": doc}
+        return ORJSONResponse({"document": doc})
         
     except HTTPException:
         raise
@@ -0,0 +1,228 @@
+"""
+Export Routes - Month-end extracts of jobs with milestones, containers and transport times
+Streams rows from a server-side cursor; nothing is materialized in Python.
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse, FileResponse
+from starlette.background import BackgroundTask
+from typing import Optional
+from datetime import date, timedelta
+import csv
+import io
+import os
+import tempfile
+
+from db_connection import get_connection, release_connection
+
+router = APIRouter()
+
+
+EXPORT_FORMATS = ["csv", "xlsx"]
+
+# Rows pulled from the server-side cursor per round trip
+EXPORT_BATCH_SIZE = 2000
+
+JOB_COLUMNS = [
+    ("job_no", "j.job_no"),
+    ("status", "j.status"),
+    ("customer_name", "cu.company_name"),
+    ("bl_no", "j.bl_no"),
+    ("shipping_line", "j.shipping_line"),
+    ("vessel_name", "j.vessel_name"),
+    ("voyage_no", "j.voyage_no"),
+    ("pol", "j.pol"),
+    ("pod", "j.pod"),
+    ("eta", "j.eta"),
+    ("ata", "j.ata"),
+    ("incoterm", "j.incoterm"),
+    ("created_at", "j.created_at"),
+    ("container_count", "ct.container_count"),
+    ("containers", "ct.container_nos"),
+]
+
+TRANSPORT_COLUMNS = [
+    ("gate_out_time", "tr.gate_out_time"),
+    ("delivered_time", "tr.delivered_time"),
+]
+
+
+def _open_export_cursor(conn, tenant_id: int, date_from: date, date_to: date, status: Optional[str]):
+    """
+    Declare a server-side cursor over jobs pivoted with one completed_at
+    column per active milestone template. Child tables are read through
+    LATERAL sub-queries so rows stream in created_at order without a
+    full-table aggregate.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT milestone_code FROM milestone_templates
+        WHERE is_active = TRUE ORDER BY sequence_order
+    """)
+    milestone_codes = [r[0] for r in cursor.fetchall()]
+    cursor.close()
+
+    milestone_selects = ", ".join(
+        f"MAX(m.completed_at) FILTER (WHERE m.milestone_code = %(code_{i})s) AS m_{i}"
+        for i in range(len(milestone_codes))
+    ) or "NULL AS m_none"
+
+    select_list = [expr for _, expr in JOB_COLUMNS]
+    select_list += [f"ms.m_{i}" for i in range(len(milestone_codes))]
+    select_list += [expr for _, expr in TRANSPORT_COLUMNS]
+
+    query = f"""
+        SELECT {', '.join(select_list)}
+        FROM jobs j
+        LEFT JOIN customers cu ON j.customer_id = cu.id
+        LEFT JOIN LATERAL (
+            SELECT {milestone_selects}
+            FROM job_milestones m WHERE m.job_id = j.id
+        ) ms ON TRUE
+        LEFT JOIN LATERAL (
+            SELECT COUNT(*) AS container_count,
+                   string_agg(c.container_no, ' ' ORDER BY c.container_no) AS container_nos
+            FROM containers c WHERE c.job_id = j.id
+        ) ct ON TRUE
+        LEFT JOIN LATERAL (
+            SELECT MIN(t.gate_out_time) AS gate_out_time, MAX(t.delivered_time) AS delivered_time
+            FROM transport t WHERE t.job_id = j.id
+        ) tr ON TRUE
+        WHERE j.tenant_id = %(tenant_id)s
+          AND j.created_at >= %(date_from)s AND j.created_at < %(date_to)s
+    """
+    params = {
+        "tenant_id": tenant_id,
+        "date_from": date_from,
+        "date_to": date_to + timedelta(days=1),
+    }
+    for i, code in enumerate(milestone_codes):
+        params[f"code_{i}"] = code
+
+    if status:
+        query += " AND j.status = %(status)s"
+        params["status"] = status
+
+    query += " ORDER BY j.created_at, j.id"
+
+    header = [name for name, _ in JOB_COLUMNS] + milestone_codes + [name for name, _ in TRANSPORT_COLUMNS]
+
+    # Named cursor = server-side; rows are fetched EXPORT_BATCH_SIZE at a time
+    export_cursor = conn.cursor(name="jobs_export")
+    export_cursor.itersize = EXPORT_BATCH_SIZE
+    export_cursor.execute(query, params)
+    return header, export_cursor
+
+
+def _stream_csv(tenant_id: int, date_from: date, date_to: date, status: Optional[str]):
+    """
+    Yield CSV chunks batch by batch. The connection is taken on the first
+    chunk and released when the generator finishes or is closed, so a
+    client that disconnects before the body starts never holds one.
+    """
+    conn = None
+    cursor = None
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    try:
+        conn = get_connection()
+        header, cursor = _open_export_cursor(conn, tenant_id, date_from, date_to, status)
+        writer.writerow(header)
+        while True:
+            rows = cursor.fetchmany(EXPORT_BATCH_SIZE)
+            if not rows:
+                break
+            writer.writerows(rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+        yield buffer.getvalue()
+    finally:
+        if cursor is not None:
+            cursor.close()
+        if conn:
+            release_connection(conn)
+
+
+def _write_xlsx(cursor, header) -> str:
+    """
+    Write rows into an XLSX temp file using XlsxWriter's constant_memory mode
+    (each row is flushed to disk as soon as the next one starts).
+    """
+    try:
+        import xlsxwriter
+    except ImportError:
+        raise HTTPException(status_code=500, detail="XLSX export requires the XlsxWriter package")
+
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        workbook = xlsxwriter.Workbook(path, {
+            "constant_memory": True,
+            "default_date_format": "yyyy-mm-dd hh:mm",
+        })
+        sheet = workbook.add_worksheet("Jobs")
+        sheet.write_row(0, 0, header)
+        row_no = 1
+        while True:
+            rows = cursor.fetchmany(EXPORT_BATCH_SIZE)
+            if not rows:
+                break
+            for row in rows:
+                sheet.write_row(row_no, 0, row)
+                row_no += 1
+        workbook.close()
+        return path
+    except Exception:
+        os.remove(path)
+        raise
+
+
+# ============== Routes ==============
+
+@router.get("/exports/jobs")
+def export_jobs(
+    tenant_id: int,
+    date_from: date = Query(..., description="First job creation date (inclusive)"),
+    date_to: date = Query(..., description="Last job creation date (inclusive)"),
+    status: Optional[str] = None,
+    format: str = "csv"
+):
+    """Export a tenant's jobs with milestone timestamps, containers and transport times."""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Invalid format. Must be one of: {EXPORT_FORMATS}")
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="date_to must be on or after date_from")
+
+    filename = f"jobs_{tenant_id}_{date_from.isoformat()}_{date_to.isoformat()}.{format}"
+
+    if format == "csv":
+        # Errors past this point end the stream early; the 200 status has already gone out
+        return StreamingResponse(
+            _stream_csv(tenant_id, date_from, date_to, status),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+        )
+
+    conn = None
+    try:
+        conn = get_connection()
+        header, cursor = _open_export_cursor(conn, tenant_id, date_from, date_to, status)
+        path = _write_xlsx(cursor, header)
+        cursor.close()
+        release_connection(conn)
+        conn = None
+        return FileResponse(
+            path,
+            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            filename=filename,
+            background=BackgroundTask(os.remove, path)
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to export jobs: {str(e)}")
+    finally:
+        if conn:
+            release_connection(conn)
@@ -0,0 +1,299 @@
+"""
+Job Import Routes - Bulk job onboarding from CSV/XLSX spreadsheets
+Rows are validated in batches, COPY'd into a temp staging table and merged
+into customers / jobs / containers (and optionally job_milestones) with
+set-based SQL inside a single transaction.
+"""
+
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form
+from datetime import date, datetime
+import csv
+import io
+import os
+import re
+
+from db_connection import get_connection, release_connection
+from services import autocomplete, response_cache
+
+router = APIRouter()
+
+
+IMPORT_EXTENSIONS = ['.csv', '.xlsx']
+
+# Valid rows are COPY'd to staging in batches of this size
+IMPORT_BATCH_SIZE = 1000
+
+# Keep the response bounded for badly broken files
+MAX_REPORTED_ERRORS = 1000
+
+# Column -> max length (matches migrations/001_create_core_tables.sql)
+TEXT_COLUMNS = {
+    'job_no': 50,
+    'bl_no': 100,
+    'shipping_line': 100,
+    'vessel_name': 100,
+    'voyage_no': 50,
+    'pol': 100,
+    'pod': 100,
+    'incoterm': 10,
+    'customer_name': 255,
+}
+
+# Spreadsheet header aliases -> staging column
+HEADER_ALIASES = {
+    'customer': 'customer_name',
+    'container_no': 'container_nos',
+    'containers': 'container_nos',
+    'port_of_loading': 'pol',
+    'port_of_discharge': 'pod',
+}
+
+STAGING_COLUMNS = list(TEXT_COLUMNS.keys()) + ['eta', 'container_nos']
+
+CONTAINER_SPLIT = re.compile(r'[\s,;]+')
+
+
+def _normalize_header(value) -> str:
+    key = str(value or "").strip().lower().replace(" ", "_")
+    return HEADER_ALIASES.get(key, key)
+
+
+def _read_csv(upload: UploadFile):
+    """Yield (row_no, dict) from a CSV upload without loading it whole."""
+    text = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+    reader = csv.reader(text)
+    header = [_normalize_header(h) for h in next(reader, [])]
+    for row_no, values in enumerate(reader, start=2):
+        if any(v.strip() for v in values):
+            yield row_no, dict(zip(header, values))
+
+
+def _read_xlsx(upload: UploadFile):
+    """Yield (row_no, dict) from the first sheet of an XLSX upload (read-only mode)."""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise HTTPException(status_code=500, detail="XLSX import requires the openpyxl package")
+
+    workbook = load_workbook(upload.file, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [_normalize_header(h) for h in next(rows, [])]
+        for row_no, values in enumerate(rows, start=2):
+            if any(v not in (None, "") for v in values):
+                yield row_no, dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def _validate_row(row: dict, seen_job_nos: set):
+    """Return (staging values, None) for a good row or (None, error message)."""
+    clean = {}
+    for column, max_length in TEXT_COLUMNS.items():
+        value = row.get(column)
+        value = str(value).strip() if value is not None else ""
+        if len(value) > max_length:
+            return None, f"{column} longer than {max_length} characters"
+        clean[column] = value or None
+
+    if not clean['job_no']:
+        return None, "job_no is required"
+    if clean['job_no'] in seen_job_nos:
+        return None, f"Duplicate job_no {clean['job_no']} in file"
+
+    eta = row.get('eta')
+    if isinstance(eta, datetime):
+        eta = eta.date()
+    elif eta not in (None, "") and not isinstance(eta, date):
+        try:
+            eta = datetime.strptime(str(eta).strip(), "%Y-%m-%d").date()
+        except ValueError:
+            return None, f"Invalid eta '{eta}', expected YYYY-MM-DD"
+    clean['eta'] = eta or None
+
+    containers = [c for c in CONTAINER_SPLIT.split(str(row.get('container_nos') or "").upper()) if c]
+    too_long = [c for c in containers if len(c) > 20]
+    if too_long:
+        return None, f"Invalid container number {too_long[0]}"
+    clean['container_nos'] = " ".join(dict.fromkeys(containers)) or None
+
+    seen_job_nos.add(clean['job_no'])
+    return [clean[c] for c in STAGING_COLUMNS], None
+
+
+def _copy_batch(cursor, batch: list):
+    """COPY one batch of validated rows into the staging table."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(batch)
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY job_import_staging (row_no, {', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+        buffer
+    )
+
+
+# ============== Routes ==============
+
+@router.post("/new-jobs/import", response_model=dict)
+def import_jobs(
+    file: UploadFile = File(...),
+    tenant_id: int = Form(...),
+    seed_milestones: bool = Form(False)
+):
+    """
+    Bulk-create jobs from a CSV/XLSX file.
+    Columns: job_no (required), bl_no, shipping_line, vessel_name, voyage_no,
+    pol, pod, eta (YYYY-MM-DD), incoterm, customer_name, container_nos.
+    Unknown customers are created; rows that fail are reported, the rest are imported.
+    """
+    file_ext = os.path.splitext(file.filename or "")[1].lower()
+    if file_ext not in IMPORT_EXTENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File type not allowed. Allowed: {', '.join(IMPORT_EXTENSIONS)}"
+        )
+
+    errors = []
+    total_rows = 0
+
+    def report(row_no, job_no, message):
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"row": row_no, "job_no": job_no, "error": message})
+
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TEMP TABLE job_import_staging (
+                row_no INTEGER NOT NULL,
+                job_no VARCHAR(50) NOT NULL,
+                bl_no VARCHAR(100),
+                shipping_line VARCHAR(100),
+                vessel_name VARCHAR(100),
+                voyage_no VARCHAR(50),
+                pol VARCHAR(100),
+                pod VARCHAR(100),
+                incoterm VARCHAR(10),
+                customer_name VARCHAR(255),
+                eta DATE,
+                container_nos TEXT,
+                job_id INTEGER
+            ) ON COMMIT DROP
+        """)
+
+        rows = _read_xlsx(file) if file_ext == '.xlsx' else _read_csv(file)
+        seen_job_nos = set()
+        batch = []
+        for row_no, row in rows:
+            total_rows += 1
+            values, error = _validate_row(row, seen_job_nos)
+            if error:
+                report(row_no, row.get('job_no'), error)
+                continue
+            batch.append([row_no] + values)
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                _copy_batch(cursor, batch)
+                batch = []
+        if batch:
+            _copy_batch(cursor, batch)
+
+        params = {"tenant_id": tenant_id}
+
+        # 1. Customers referenced by name that don't exist yet
+        cursor.execute("""
+            INSERT INTO customers (tenant_id, company_name)
+            SELECT DISTINCT ON (lower(s.customer_name)) %(tenant_id)s, s.customer_name
+            FROM job_import_staging s
+            WHERE s.customer_name IS NOT NULL
+              AND NOT EXISTS (
+                  SELECT 1 FROM customers c
+                  WHERE c.tenant_id = %(tenant_id)s AND lower(c.company_name) = lower(s.customer_name)
+              )
+            ORDER BY lower(s.customer_name), s.row_no
+        """, params)
+        customers_created = cursor.rowcount
+
+        # 2. Jobs; existing job numbers are skipped and reported below
+        cursor.execute("""
+            WITH inserted AS (
+                INSERT INTO jobs (tenant_id, job_no, customer_id, bl_no, shipping_line, vessel_name,
+                                  voyage_no, pol, pod, eta, incoterm)
+                SELECT %(tenant_id)s, s.job_no, cu.id, s.bl_no, s.shipping_line, s.vessel_name,
+                       s.voyage_no, s.pol, s.pod, s.eta, s.incoterm
+                FROM job_import_staging s
+                LEFT JOIN LATERAL (
+                    SELECT c.id FROM customers c
+                    WHERE c.tenant_id = %(tenant_id)s AND lower(c.company_name) = lower(s.customer_name)
+                    ORDER BY c.id LIMIT 1
+                ) cu ON TRUE
+                ORDER BY s.row_no
+                ON CONFLICT (tenant_id, job_no) DO NOTHING
+                RETURNING id, job_no
+            )
+            UPDATE job_import_staging s SET job_id = inserted.id
+            FROM inserted WHERE s.job_no = inserted.job_no
+        """, params)
+        jobs_imported = cursor.rowcount
+
+        cursor.execute("SELECT row_no, job_no FROM job_import_staging WHERE job_id IS NULL ORDER BY row_no")
+        for row_no, job_no in cursor.fetchall():
+            report(row_no, job_no, "Job number already exists for this tenant")
+
+        # 3. Containers, one row per number in the container_nos column
+        cursor.execute("""
+            INSERT INTO containers (job_id, container_no)
+            SELECT s.job_id, c.container_no
+            FROM job_import_staging s
+            CROSS JOIN LATERAL unnest(string_to_array(s.container_nos, ' ')) AS c(container_no)
+            WHERE s.job_id IS NOT NULL AND s.container_nos IS NOT NULL
+        """)
+        containers_created = cursor.rowcount
+
+        # 4. Optionally seed every imported job with the active milestone templates
+        milestones_created = 0
+        if seed_milestones:
+            cursor.execute("""
+                INSERT INTO job_milestones (job_id, stage, milestone_code, milestone_name)
+                SELECT s.job_id, t.stage, t.milestone_code, t.milestone_name
+                FROM job_import_staging s
+                CROSS JOIN milestone_templates t
+                WHERE s.job_id IS NOT NULL AND t.is_active = TRUE
+                ORDER BY s.row_no, t.sequence_order
+            """)
+            milestones_created = cursor.rowcount
+
+        conn.commit()
+
+        if jobs_imported or customers_created:
+            autocomplete.invalidate(tenant_id)
+            response_cache.invalidate("new_jobs", tenant_id)
+            response_cache.invalidate("customers", tenant_id)
+
+        errors.sort(key=lambda e: e["row"])
+        return {
+            "total_rows": total_rows,
+            "imported": jobs_imported,
+            "failed": total_rows - jobs_imported,
+            "customers_created": customers_created,
+            "containers_created": containers_created,
+            "milestones_created": milestones_created,
+            "errors": errors,
+            "errors_truncated": total_rows - jobs_imported > len(errors),
+            "message": f"Imported {jobs_imported} of {total_rows} jobs"
+        }
+
+    except HTTPException:
+        if conn:
+            conn.rollback()
+        raise
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        if "foreign key" in str(e).lower():
+            raise HTTPException(status_code=400, detail="Tenant not found")
+        raise HTTPException(status_code=500, detail=f"Failed to import jobs: {str(e)}")
+    finally:
+        if conn:
+            release_connection(conn)
@@ -8,6 +8,8 @@ from typing import Optional, List
 from datetime import datetime
 
 from db_connection import get_connection, release_connection
+from serialization import ORJSONResponse, rows_to_dicts
+from services import alert_rules, response_cache
 
 router = APIRouter()
 
@@ -58,19 +60,11 @@ def get_all_milestones(job_id: Optional[int] = None, status: Optional[str] = Non
         
         cursor.execute(query, tuple(params))
         
-        milestones = []
         columns = ['id', 'job_id', 'stage', 'milestone_code', 'milestone_name', 
                    'status', 'completed_at', 'remarks', 'created_at', 'job_no']
-        
-        for row in cursor.fetchall():
-            m = dict(zip(columns, row))
-            if m['completed_at']:
-                m['completed_at'] = m['completed_at'].isoformat()
-            if m['created_at']:
-                m['created_at'] = m['created_at'].isoformat()
-            milestones.append(m)
+        milestones = rows_to_dicts(columns, cursor.fetchall())
             
-        return {"milestones": milestones, "count": len(milestones)}
+        return ORJSONResponse({"milestones": milestones, "count": len(milestones)})
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch milestones: {str(e)}")
@@ -80,6 +74,7 @@ def get_all_milestones(job_id: Optional[int] = None, status: Optional[str] = Non
 
 
 @router.get("/milestone-templates", response_model=dict)
+@response_cache.cached("milestone_templates", ttl=300)
 def get_milestone_templates():
     """Get all milestone templates (predefined workflow stages)."""
     conn = None
@@ -100,7 +95,7 @@ def get_milestone_templates():
         for row in cursor.fetchall():
             templates.append(dict(zip(columns, row)))
             
-        return {"templates": templates, "count": len(templates)}
+        return ORJSONResponse({"templates": templates, "count": len(templates)})
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch templates: {str(e)}")
@@ -131,7 +126,7 @@ def create_milestone(milestone: MilestoneCreate):
             "id": row[0], 
             "milestone_code": row[1], 
             "status": row[2],
-            "created_at": row[3].isoformat() if row[3] else None,
+            "created_at": row[3],
             "message": "Milestone added successfully"
         }
         
@@ -229,7 +224,7 @@ def update_milestone(milestone_id: int, milestone: MilestoneUpdate):
         
         cursor.execute(f"""
             UPDATE job_milestones SET {', '.join(updates)} WHERE id = %s
-            RETURNING id, milestone_code, status, completed_at
+            RETURNING id, milestone_code, status, completed_at, job_id
         """, tuple(params))
         
         row = cursor.fetchone()
@@ -238,11 +233,13 @@ def update_milestone(milestone_id: int, milestone: MilestoneUpdate):
         
         conn.commit()
         
+        alert_rules.on_milestone_changed(row[4])
+        
         return {
             "id": row[0], 
             "milestone_code": row[1], 
             "status": row[2],
-            "completed_at": row[3].isoformat() if row[3] else None,
+            "completed_at": row[3],
             "message": "Milestone updated"
         }
         
@@ -2,15 +2,56 @@
 New Jobs Routes - API endpoints for the new jobs table (SaaS multi-tenant)
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel, Field
 from typing import Optional, List
-from datetime import date, datetime
+from datetime import datetime
 
 from db_connection import get_connection, release_connection
+from serialization import ORJSONResponse, row_to_dict, rows_to_dicts, parse_fields
+from services import autocomplete, alert_rules, response_cache
 
 router = APIRouter()
 
+# Fields a client can ask for with ?fields= -> SELECT expression
+JOB_FIELDS = {
+    'id': 'j.id',
+    'tenant_id': 'j.tenant_id',
+    'job_no': 'j.job_no',
+    'bl_no': 'j.bl_no',
+    'shipping_line': 'j.shipping_line',
+    'vessel_name': 'j.vessel_name',
+    'voyage_no': 'j.voyage_no',
+    'pol': 'j.pol',
+    'pod': 'j.pod',
+    'eta': 'j.eta',
+    'ata': 'j.ata',
+    'status': 'j.status',
+    'customer_id': 'j.customer_id',
+    'created_at': 'j.created_at',
+    'bl_file_path': 'j.bl_file_path',
+    'packing_list_path': 'j.packing_list_path',
+    'incoterm': 'j.incoterm',
+    'invoice_path': 'j.invoice_path',
+    'freight_payment_path': 'j.freight_payment_path',
+    'misc_charges_amount': 'j.misc_charges_amount',
+    'customer_name': 'c.company_name',
+}
+
+# Child collections of /new-jobs/{id} (?include=)
+JOB_INCLUDES = ['containers', 'milestones', 'documents']
+
+FIELDS_DESCRIPTION = f"Comma-separated subset of: {', '.join(JOB_FIELDS)} (id is always returned)"
+
+
+def _job_select(fields: Optional[list]) -> tuple:
+    """(columns, SELECT ... FROM ... clause) for the requested job fields; all of them when None."""
+    columns = list(JOB_FIELDS) if fields is None else ['id'] + [f for f in fields if f != 'id']
+    query = f"SELECT {', '.join(JOB_FIELDS[c] for c in columns)} FROM jobs j"
+    if 'customer_name' in columns:
+        query += " LEFT JOIN customers c ON j.customer_id = c.id"
+    return columns, query
+
 
 # ============== Pydantic Models ==============
 
@@ -50,23 +91,21 @@ class NewJobUpdate(BaseModel):
 # ============== Routes ==============
 
 @router.get("/new-jobs", response_model=dict)
-def get_all_new_jobs(tenant_id: Optional[int] = None, status: Optional[str] = None):
+@response_cache.cached("new_jobs")
+def get_all_new_jobs(
+    tenant_id: Optional[int] = None,
+    status: Optional[str] = None,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+):
     """Get all jobs from the new jobs table, optionally filtered by tenant and status."""
+    columns, query = _job_select(parse_fields(fields, JOB_FIELDS))
+
     conn = None
     try:
         conn = get_connection()
         cursor = conn.cursor()
         
-        query = """
-            SELECT j.id, j.tenant_id, j.job_no, j.bl_no, j.shipping_line, j.vessel_name, 
-                   j.voyage_no, j.pol, j.pod, j.eta, j.ata, j.status, j.customer_id, 
-                   j.created_at, j.bl_file_path, j.packing_list_path, j.incoterm,
-                   j.invoice_path, j.freight_payment_path, j.misc_charges_amount,
-                   c.company_name as customer_name
-            FROM jobs j
-            LEFT JOIN customers c ON j.customer_id = c.id
-            WHERE 1=1
-        """
+        query += " WHERE 1=1"
         params = []
         
         if tenant_id:
@@ -80,20 +119,9 @@ def get_all_new_jobs(tenant_id: Optional[int] = None, status: Optional[str] = No
         
         cursor.execute(query, tuple(params))
         
-        jobs = []
-        columns = ['id', 'tenant_id', 'job_no', 'bl_no', 'shipping_line', 'vessel_name', 
-                   'voyage_no', 'pol', 'pod', 'eta', 'ata', 'status', 'customer_id', 
-                   'created_at', 'bl_file_path', 'packing_list_path', 'incoterm',
-                   'invoice_path', 'freight_payment_path', 'misc_charges_amount', 'customer_name']
-        
-        for row in cursor.fetchall():
-            job = dict(zip(columns, row))
-            for key in ['eta', 'ata', 'created_at']:
-                if job.get(key) and isinstance(job[key], (date, datetime)):
-                    job[key] = job[key].isoformat()
-            jobs.append(job)
+        jobs = rows_to_dicts(columns, cursor.fetchall())
             
-        return {"jobs": jobs, "count": len(jobs)}
+        return ORJSONResponse({"jobs": jobs, "count": len(jobs)})
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch jobs: {str(e)}")
@@ -130,11 +158,18 @@ def create_new_job(job: NewJobCreate):
         row = cursor.fetchone()
         conn.commit()
         
+        autocomplete.record_job(job.tenant_id, new={
+            "shipping_line": job.shipping_line, "vessel_name": job.vessel_name,
+            "pol": job.pol, "pod": job.pod
+        })
+        alert_rules.on_job_changed(row[0])
+        response_cache.invalidate("new_jobs", job.tenant_id)
+        
         return {
             "id": row[0],
             "job_no": row[1],
             "status": row[2],
-            "created_at": row[3].isoformat() if row[3] else None,
+            "created_at": row[3],
             "message": f"Job {row[1]} created successfully"
         }
         
@@ -150,71 +185,59 @@ def create_new_job(job: NewJobCreate):
 
 
 @router.get("/new-jobs/{job_id}", response_model=dict)
-def get_new_job(job_id: int):
+def get_new_job(
+    job_id: int,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    include: Optional[str] = Query(None, description="Comma-separated subset of: containers, milestones, documents (default: all)")
+):
     """Get a specific job with containers, milestones, and documents."""
+    columns, query = _job_select(parse_fields(fields, JOB_FIELDS))
+    includes = parse_fields(include, JOB_INCLUDES, param="include")
+    if includes is None:
+        includes = JOB_INCLUDES
+
     conn = None
     try:
         conn = get_connection()
         cursor = conn.cursor()
         
         # Get job
-        cursor.execute("""
-            SELECT j.*, c.company_name as customer_name
-            FROM jobs j
-            LEFT JOIN customers c ON j.customer_id = c.id
-            WHERE j.id = %s
-        """, (job_id,))
+        cursor.execute(query + " WHERE j.id = %s", (job_id,))
         
         row = cursor.fetchone()
         if not row:
             raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
         
-        columns = [desc[0] for desc in cursor.description]
-        job = dict(zip(columns, row))
-        
-        for key in ['eta', 'ata', 'created_at']:
-            if job.get(key) and isinstance(job[key], (date, datetime)):
-                job[key] = job[key].isoformat()
+        job = row_to_dict(columns, row)
         
         # Get containers
-        cursor.execute("""
-            SELECT id, container_no, size, type, seal_no, status 
-            FROM containers WHERE job_id = %s
-        """, (job_id,))
-        containers = []
-        for r in cursor.fetchall():
-            containers.append(dict(zip(['id', 'container_no', 'size', 'type', 'seal_no', 'status'], r)))
-        job['containers'] = containers
+        if 'containers' in includes:
+            cursor.execute("""
+                SELECT id, container_no, size, type, seal_no, status 
+                FROM containers WHERE job_id = %s
+            """, (job_id,))
+            job['containers'] = rows_to_dicts(['id', 'container_no', 'size', 'type', 'seal_no', 'status'], cursor.fetchall())
         
         # Get milestones
-        cursor.execute("""
-            SELECT id, stage, milestone_code, milestone_name, status, completed_at, remarks, created_at 
-            FROM job_milestones WHERE job_id = %s ORDER BY created_at
-        """, (job_id,))
-        milestones = []
-        for r in cursor.fetchall():
-            m = dict(zip(['id', 'stage', 'milestone_code', 'milestone_name', 'status', 'completed_at', 'remarks', 'created_at'], r))
-            if m['completed_at']:
-                m['completed_at'] = m['completed_at'].isoformat()
-            if m['created_at']:
-                m['created_at'] = m['created_at'].isoformat()
-            milestones.append(m)
-        job['milestones'] = milestones
+        if 'milestones' in includes:
+            cursor.execute("""
+                SELECT id, stage, milestone_code, milestone_name, status, completed_at, remarks, created_at 
+                FROM job_milestones WHERE job_id = %s ORDER BY created_at
+            """, (job_id,))
+            job['milestones'] = rows_to_dicts(
+                ['id', 'stage', 'milestone_code', 'milestone_name', 'status', 'completed_at', 'remarks', 'created_at'],
+                cursor.fetchall()
+            )
         
         # Get documents
-        cursor.execute("""
-            SELECT id, doc_type, file_url, uploaded_at 
-            FROM documents WHERE job_id = %s
-        """, (job_id,))
-        documents = []
-        for r in cursor.fetchall():
-            d = dict(zip(['id', 'doc_type', 'file_url', 'uploaded_at'], r))
-            if d['uploaded_at']:
-                d['uploaded_at'] = d['uploaded_at'].isoformat()
-            documents.append(d)
-        job['documents'] = documents
+        if 'documents' in includes:
+            cursor.execute("""
+                SELECT id, doc_type, file_url, uploaded_at 
+                FROM documents WHERE job_id = %s
+            """, (job_id,))
+            job['documents'] = rows_to_dicts(['id', 'doc_type', 'file_url', 'uploaded_at'], cursor.fetchall())
         
-        return {"job": job}
+        return ORJSONResponse({"job": job})
         
     except HTTPException:
         raise
@@ -262,9 +285,16 @@ def update_new_job(job_id: int, job: NewJobUpdate):
         
         params.append(job_id)
         
+        # Self-join on the locked pre-update row so the autocomplete index
+        # can retire the old values without a second query
         cursor.execute(f"""
-            UPDATE jobs SET {', '.join(updates)} WHERE id = %s
-            RETURNING id, job_no, status
+            UPDATE jobs j SET {', '.join(updates)}
+            FROM (SELECT id, shipping_line, vessel_name, pol, pod
+                  FROM jobs WHERE id = %s FOR UPDATE) old
+            WHERE j.id = old.id
+            RETURNING j.id, j.job_no, j.status, j.tenant_id,
+                      old.shipping_line, old.vessel_name, old.pol, old.pod,
+                      j.shipping_line, j.vessel_name, j.pol, j.pod
         """, tuple(params))
         
         row = cursor.fetchone()
@@ -273,6 +303,15 @@ def update_new_job(job_id: int, job: NewJobUpdate):
         
         conn.commit()
         
+        autocomplete_columns = ['shipping_line', 'vessel_name', 'pol', 'pod']
+        autocomplete.record_job(
+            row[3],
+            old=dict(zip(autocomplete_columns, row[4:8])),
+            new=dict(zip(autocomplete_columns, row[8:12]))
+        )
+        alert_rules.on_job_changed(row[0])
+        response_cache.invalidate("new_jobs", row[3])
+        
         return {"id": row[0], "job_no": row[1], "status": row[2], "message": "Job updated successfully"}
         
     except HTTPException:
@@ -294,13 +333,19 @@ def delete_new_job(job_id: int):
         conn = get_connection()
         cursor = conn.cursor()
         
-        cursor.execute("DELETE FROM jobs WHERE id = %s RETURNING id, job_no", (job_id,))
+        cursor.execute("""
+            DELETE FROM jobs WHERE id = %s
+            RETURNING id, job_no, tenant_id, shipping_line, vessel_name, pol, pod
+        """, (job_id,))
         deleted = cursor.fetchone()
         
         if not deleted:
             raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
         
         conn.commit()
+        
+        autocomplete.record_job(deleted[2], old=dict(zip(['shipping_line', 'vessel_name', 'pol', 'pod'], deleted[3:7])))
+        response_cache.invalidate("new_jobs", deleted[2])
         return {"message": f"Job {deleted[1]} deleted successfully"}
         
     except HTTPException:
@@ -0,0 +1,143 @@
+"""
+Search Routes - Global search across jobs, BL numbers, vessels, containers and customers
+Backed by pg_trgm GIN indexes (see migrations/004_add_search_trigram_indexes.sql)
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+
+from db_connection import get_connection, release_connection
+
+router = APIRouter()
+
+
+# Trigram indexes only narrow the scan once the pattern has a full trigram
+MIN_QUERY_LENGTH = 3
+MAX_RESULTS = 50
+
+# Hard ceiling per search so a pathological pattern can't hold a connection
+SEARCH_STATEMENT_TIMEOUT_MS = 2000
+
+# One sub-query per hit type. Each runs against its own trigram index, is
+# scoped to the tenant and capped with its own LIMIT before the UNION, so the
+# planner never has to rank more than (types x limit) rows.
+# Score = prefix bonus + trigram similarity, so "MSKU12" ranks "MSKU1234567"
+# above "ABCU0MSKU12".
+SEARCH_QUERIES = {
+    "job": """
+        (SELECT 'job' AS type, j.id, j.id AS job_id, j.job_no AS label, j.job_no,
+                'job_no' AS matched_field,
+                (j.job_no ILIKE %(prefix)s)::int + similarity(j.job_no, %(q)s) AS score
+         FROM jobs j
+         WHERE j.tenant_id = %(tenant_id)s AND j.job_no ILIKE %(pattern)s
+         ORDER BY score DESC
+         LIMIT %(limit)s)
+    """,
+    "bl": """
+        (SELECT 'bl' AS type, j.id, j.id AS job_id, j.bl_no AS label, j.job_no,
+                'bl_no' AS matched_field,
+                (j.bl_no ILIKE %(prefix)s)::int + similarity(j.bl_no, %(q)s) AS score
+         FROM jobs j
+         WHERE j.tenant_id = %(tenant_id)s AND j.bl_no ILIKE %(pattern)s
+         ORDER BY score DESC
+         LIMIT %(limit)s)
+    """,
+    "vessel": """
+        (SELECT 'vessel' AS type, j.id, j.id AS job_id, j.vessel_name AS label, j.job_no,
+                'vessel_name' AS matched_field,
+                (j.vessel_name ILIKE %(prefix)s)::int + similarity(j.vessel_name, %(q)s) AS score
+         FROM jobs j
+         WHERE j.tenant_id = %(tenant_id)s AND j.vessel_name ILIKE %(pattern)s
+         ORDER BY score DESC
+         LIMIT %(limit)s)
+    """,
+    "container": """
+        (SELECT 'container' AS type, c.id, c.job_id, c.container_no AS label, j.job_no,
+                'container_no' AS matched_field,
+                (c.container_no ILIKE %(prefix)s)::int + similarity(c.container_no, %(q)s) AS score
+         FROM containers c
+         JOIN jobs j ON c.job_id = j.id
+         WHERE j.tenant_id = %(tenant_id)s AND c.container_no ILIKE %(pattern)s
+         ORDER BY score DESC
+         LIMIT %(limit)s)
+    """,
+    "customer": """
+        (SELECT 'customer' AS type, cu.id, NULL::int AS job_id, cu.company_name AS label,
+                NULL::varchar AS job_no, 'company_name' AS matched_field,
+                (cu.company_name ILIKE %(prefix)s)::int + similarity(cu.company_name, %(q)s) AS score
+         FROM customers cu
+         WHERE cu.tenant_id = %(tenant_id)s AND cu.company_name ILIKE %(pattern)s
+         ORDER BY score DESC
+         LIMIT %(limit)s)
+    """,
+}
+
+
+def escape_like(value: str) -> str:
+    """Escape LIKE wildcards so user input is matched literally."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+# ============== Routes ==============
+
+@router.get("/search", response_model=dict)
+def search(
+    tenant_id: int,
+    q: str = Query(..., description="Partial job no, BL no, vessel, container no or customer name"),
+    types: Optional[str] = Query(None, description="Comma-separated subset of: job, bl, vessel, container, customer"),
+    limit: int = 20
+):
+    """Search jobs, BL numbers, vessels, containers and customers for a tenant."""
+    term = q.strip()
+    if len(term) < MIN_QUERY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"Search term must be at least {MIN_QUERY_LENGTH} characters")
+
+    if types:
+        requested = [t.strip() for t in types.split(",") if t.strip()]
+        unknown = [t for t in requested if t not in SEARCH_QUERIES]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid types: {unknown}. Must be any of: {list(SEARCH_QUERIES.keys())}"
+            )
+    else:
+        requested = list(SEARCH_QUERIES.keys())
+
+    limit = max(1, min(limit, MAX_RESULTS))
+
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute("SET LOCAL statement_timeout = %s", (SEARCH_STATEMENT_TIMEOUT_MS,))
+
+        query = " UNION ALL ".join(SEARCH_QUERIES[t] for t in requested)
+        query = f"SELECT * FROM ({query}) hits ORDER BY score DESC, label LIMIT %(limit)s"
+
+        escaped = escape_like(term)
+        cursor.execute(query, {
+            "tenant_id": tenant_id,
+            "q": term,
+            "pattern": f"%{escaped}%",
+            "prefix": f"{escaped}%",
+            "limit": limit,
+        })
+
+        hits = []
+        columns = ['type', 'id', 'job_id', 'label', 'job_no', 'matched_field', 'score']
+
+        for row in cursor.fetchall():
+            hit = dict(zip(columns, row))
+            hit['score'] = round(float(hit['score']), 4)
+            hits.append(hit)
+
+        return {"query": term, "hits": hits, "count": len(hits)}
+
+    except Exception as e:
+        if "statement timeout" in str(e).lower():
+            raise HTTPException(status_code=503, detail="Search timed out, try a more specific term")
+        raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
+    finally:
+        if conn:
+            release_connection(conn)
@@ -6,9 +6,10 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
-import hashlib
 
-from db_connection import get_connection, release_connection
+from db_connection import get_connection, release_connection, system_context
+from serialization import ORJSONResponse, row_to_dict, rows_to_dicts
+from services import passwords, response_cache
 
 router = APIRouter()
 
@@ -41,7 +42,7 @@ class TenantResponse(BaseModel):
     phone: Optional[str]
     plan: str
     status: str
-    created_at: Optional[str]
+    created_at: Optional[datetime]
 
 
 # ============== Routes ==============
@@ -59,16 +60,10 @@ def get_all_tenants():
             FROM tenants ORDER BY company_name ASC
         """)
         
-        tenants = []
         columns = ['id', 'company_name', 'contact_name', 'email', 'phone', 'plan', 'status', 'created_at']
-        
-        for row in cursor.fetchall():
-            tenant = dict(zip(columns, row))
-            if tenant['created_at']:
-                tenant['created_at'] = tenant['created_at'].isoformat()
-            tenants.append(tenant)
+        tenants = rows_to_dicts(columns, cursor.fetchall())
             
-        return {"tenants": tenants, "count": len(tenants)}
+        return ORJSONResponse({"tenants": tenants, "count": len(tenants)})
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch tenants: {str(e)}")
@@ -82,13 +77,14 @@ def create_tenant(tenant: TenantCreate):
     """Create a new tenant and automatically create admin user with password."""
     conn = None
     try:
-        conn = get_connection()
+        with system_context():
+            conn = get_connection()
         cursor = conn.cursor()
         
         # Hash password if provided
         password_hash = None
         if tenant.password:
-            password_hash = hashlib.sha256(tenant.password.encode()).hexdigest()
+            password_hash = passwords.hash_password(tenant.password)
         
         # Insert tenant with password_hash
         cursor.execute("""
@@ -113,10 +109,11 @@ def create_tenant(tenant: TenantCreate):
         
         conn.commit()
         
+        if password_hash:
+            response_cache.invalidate("users", tenant_id)
+        
         columns = ['id', 'company_name', 'contact_name', 'email', 'phone', 'plan', 'status', 'created_at']
-        result = dict(zip(columns, row))
-        if result['created_at']:
-            result['created_at'] = result['created_at'].isoformat()
+        result = row_to_dict(columns, row)
         
         return result
         
@@ -149,9 +146,7 @@ def get_tenant(tenant_id: int):
             raise HTTPException(status_code=404, detail=f"Tenant {tenant_id} not found")
         
         columns = ['id', 'company_name', 'contact_name', 'email', 'phone', 'plan', 'status', 'created_at']
-        result = dict(zip(columns, row))
-        if result['created_at']:
-            result['created_at'] = result['created_at'].isoformat()
+        result = row_to_dict(columns, row)
         
         return result
         
@@ -199,9 +194,7 @@ def update_tenant(tenant_id: int, tenant: TenantUpdate):
         conn.commit()
         
         columns = ['id', 'company_name', 'contact_name', 'email', 'phone', 'plan', 'status', 'created_at']
-        result = dict(zip(columns, row))
-        if result['created_at']:
-            result['created_at'] = result['created_at'].isoformat()
+        result = row_to_dict(columns, row)
         
         return result
         
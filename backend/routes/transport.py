@@ -8,6 +8,7 @@ from typing import Optional, List
 from datetime import datetime
 
 from db_connection import get_connection, release_connection
+from serialization import ORJSONResponse, row_to_dict, rows_to_dicts
 
 router = APIRouter()
 
@@ -55,19 +56,11 @@ def get_all_transport(job_id: Optional[int] = None):
                 JOIN jobs j ON t.job_id = j.id
             """)
         
-        records = []
         columns = ['id', 'job_id', 'transporter_name', 'vehicle_no', 'driver_phone', 
                    'gate_out_time', 'delivered_time', 'job_no']
-        
-        for row in cursor.fetchall():
-            record = dict(zip(columns, row))
-            if record['gate_out_time']:
-                record['gate_out_time'] = record['gate_out_time'].isoformat()
-            if record['delivered_time']:
-                record['delivered_time'] = record['delivered_time'].isoformat()
-            records.append(record)
+        records = rows_to_dicts(columns, cursor.fetchall())
             
-        return {"transport": records, "count": len(records)}
+        return ORJSONResponse({"transport": records, "count": len(records)})
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch transport records: {str(e)}")
@@ -128,13 +121,9 @@ def get_transport(transport_id: int):
         
         columns = ['id', 'job_id', 'transporter_name', 'vehicle_no', 'driver_phone', 
                    'gate_out_time', 'delivered_time', 'job_no']
-        record = dict(zip(columns, row))
-        if record['gate_out_time']:
-            record['gate_out_time'] = record['gate_out_time'].isoformat()
-        if record['delivered_time']:
-            record['delivered_time'] = record['delivered_time'].isoformat()
+        record = row_to_dict(columns, row)
         
-        return {"transport": record}
+        return ORJSONResponse({"transport": record})
         
     except HTTPException:
         raise
@@ -221,7 +210,7 @@ def mark_gate_out(transport_id: int):
             raise HTTPException(status_code=404, detail=f"Transport {transport_id} not found")
         
         conn.commit()
-        return {"id": row[0], "gate_out_time": row[1].isoformat(), "message": "Gate out recorded"}
+        return {"id": row[0], "gate_out_time": row[1], "message": "Gate out recorded"}
         
     except HTTPException:
         raise
@@ -252,7 +241,7 @@ def mark_delivered(transport_id: int):
             raise HTTPException(status_code=404, detail=f"Transport {transport_id} not found")
         
         conn.commit()
-        return {"id": row[0], "delivered_time": row[1].isoformat(), "message": "Delivery recorded"}
+        return {"id": row[0], "delivered_time": row[1], "message": "Delivery recorded"}
         
     except HTTPException:
         raise
@@ -4,12 +4,15 @@ Structured folder system with Document AI integration for INCOTERM extraction
 """
 
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse
 from typing import Optional
 import os
 import uuid
 from datetime import datetime
 
+from services import tracing
+
 router = APIRouter()
 
 # Base upload folder path
@@ -79,9 +82,11 @@ async def upload_file(
         file_path = os.path.join(target_folder, new_filename)
         
         # Save file
-        contents = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(contents)
+        with tracing.span("upload.read"):
+            contents = await file.read()
+        with tracing.span("upload.write_file", bytes=len(contents)):
+            with open(file_path, "wb") as f:
+                f.write(contents)
         
         # Relative path for database
         relative_path = f"uploads/{subfolder}/{new_filename}"
@@ -101,7 +106,8 @@ async def upload_file(
         if doc_type == "packing_list":
             try:
                 from services.document_ai import process_packing_list
-                incoterm_result = process_packing_list(file_path)
+                with tracing.span("upload.extract_incoterm"):
+                    incoterm_result = await run_in_threadpool(process_packing_list, file_path)
                 response["incoterm"] = incoterm_result
             except Exception as e:
                 print(f"INCOTERM extraction error: {e}")
@@ -154,9 +160,11 @@ async def extract_invoice_data(
         
         file_path = os.path.join(target_folder, new_filename)
         
-        contents = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(contents)
+        with tracing.span("upload.read"):
+            contents = await file.read()
+        with tracing.span("upload.write_file", bytes=len(contents)):
+            with open(file_path, "wb") as f:
+                f.write(contents)
         
         relative_path = f"uploads/invoice/{new_filename}"
         
@@ -173,8 +181,10 @@ async def extract_invoice_data(
         if extract_misc:
             try:
                 from services.document_ai import process_invoice
-                invoice_result = process_invoice(file_path, extract_misc=True)
+                with tracing.span("upload.extract_invoice"):
+                    invoice_result = await run_in_threadpool(process_invoice, file_path, extract_misc=True)
                 response["misc_charges"] = invoice_result.get("misc_charges", 0)
+                response["misc_charges_candidates"] = invoice_result.get("misc_charges_candidates", [])
             except Exception as e:
                 print(f"Invoice extraction error: {e}")
                 response["misc_charges"] = 0
@@ -6,9 +6,10 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
-import hashlib
 
 from db_connection import get_connection, release_connection
+from serialization import ORJSONResponse, row_to_dict, rows_to_dicts
+from services import passwords, response_cache
 
 router = APIRouter()
 
@@ -36,12 +37,13 @@ class UserResponse(BaseModel):
     name: str
     email: str
     role: str
-    created_at: Optional[str]
+    created_at: Optional[datetime]
 
 
 # ============== Routes ==============
 
 @router.get("/users", response_model=dict)
+@response_cache.cached("users")
 def get_all_users(tenant_id: Optional[int] = None):
     """Get all users, optionally filtered by tenant."""
     conn = None
@@ -60,16 +62,10 @@ def get_all_users(tenant_id: Optional[int] = None):
                 FROM users ORDER BY name ASC
             """)
         
-        users = []
         columns = ['id', 'tenant_id', 'name', 'email', 'role', 'created_at']
-        
-        for row in cursor.fetchall():
-            user = dict(zip(columns, row))
-            if user['created_at']:
-                user['created_at'] = user['created_at'].isoformat()
-            users.append(user)
+        users = rows_to_dicts(columns, cursor.fetchall())
             
-        return {"users": users, "count": len(users)}
+        return ORJSONResponse({"users": users, "count": len(users)})
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch users: {str(e)}")
@@ -86,8 +82,7 @@ def create_user(user: UserCreate):
         conn = get_connection()
         cursor = conn.cursor()
         
-        # Simple password hashing (use bcrypt in production)
-        password_hash = hashlib.sha256(user.password.encode()).hexdigest()
+        password_hash = passwords.hash_password(user.password)
         
         cursor.execute("""
             INSERT INTO users (tenant_id, name, email, password_hash, role) 
@@ -99,9 +94,9 @@ def create_user(user: UserCreate):
         conn.commit()
         
         columns = ['id', 'tenant_id', 'name', 'email', 'role', 'created_at']
-        result = dict(zip(columns, row))
-        if result['created_at']:
-            result['created_at'] = result['created_at'].isoformat()
+        result = row_to_dict(columns, row)
+        
+        response_cache.invalidate("users", result['tenant_id'])
         
         return result
         
@@ -136,9 +131,7 @@ def get_user(user_id: int):
             raise HTTPException(status_code=404, detail=f"User {user_id} not found")
         
         columns = ['id', 'tenant_id', 'name', 'email', 'role', 'created_at']
-        result = dict(zip(columns, row))
-        if result['created_at']:
-            result['created_at'] = result['created_at'].isoformat()
+        result = row_to_dict(columns, row)
         
         return result
         
@@ -165,7 +158,7 @@ def update_user(user_id: int, user: UserUpdate):
         if user.name: updates.append("name = %s"); params.append(user.name)
         if user.email: updates.append("email = %s"); params.append(user.email)
         if user.password: 
-            password_hash = hashlib.sha256(user.password.encode()).hexdigest()
+            password_hash = passwords.hash_password(user.password)
             updates.append("password_hash = %s"); params.append(password_hash)
         if user.role: updates.append("role = %s"); params.append(user.role)
         
@@ -186,9 +179,9 @@ def update_user(user_id: int, user: UserUpdate):
         conn.commit()
         
         columns = ['id', 'tenant_id', 'name', 'email', 'role', 'created_at']
-        result = dict(zip(columns, row))
-        if result['created_at']:
-            result['created_at'] = result['created_at'].isoformat()
+        result = row_to_dict(columns, row)
+        
+        response_cache.invalidate("users", result['tenant_id'])
         
         return result
         
@@ -211,13 +204,15 @@ def delete_user(user_id: int):
         conn = get_connection()
         cursor = conn.cursor()
         
-        cursor.execute("DELETE FROM users WHERE id = %s RETURNING id", (user_id,))
+        cursor.execute("DELETE FROM users WHERE id = %s RETURNING id, tenant_id", (user_id,))
         deleted = cursor.fetchone()
         
         if not deleted:
             raise HTTPException(status_code=404, detail=f"User {user_id} not found")
         
         conn.commit()
+        
+        response_cache.invalidate("users", deleted[1])
         return {"message": f"User {user_id} deleted successfully"}
         
     except HTTPException:
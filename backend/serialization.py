@@ -0,0 +1,90 @@
+"""
+Serialization Module for 4S Logistics
+Fast JSON responses (orjson), row-to-dict helpers for psycopg2 results
+and fields= / include= query param parsing
+
+orjson encodes datetime/date/time/UUID natively (ISO 8601, same text as
+.isoformat() for the naive timestamps Postgres gives us), numpy values
+with OPT_SERIALIZE_NUMPY, and Decimal / timedelta through _default below.
+
+ORJSONResponse is the app's default_response_class (see main.py), but a
+handler that returns a plain dict still goes through FastAPI's response
+serialization first (response_model validation, or jsonable_encoder
+without one), which walks every value and turns datetimes and Decimals
+into strings before render() sees them. Hot read routes
+therefore return ORJSONResponse(...) themselves, so rows reach orjson
+with their native types:
+
+    return ORJSONResponse({"jobs": rows_to_dicts(columns, rows), "count": len(rows)})
+
+(FastAPI then skips response_model validation for that route; the
+declared model still documents the response.)
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+from typing import Any, Optional
+
+import orjson
+from pydantic_core import to_jsonable_python
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        # As a string, the same text these routes sent when response_model=dict
+        # serialized them (Pydantic's JSON mode), so NUMERIC columns keep their format
+        return str(value)
+    if isinstance(value, timedelta):
+        # Postgres intervals, as ISO 8601 durations like Pydantic's JSON mode
+        return to_jsonable_python(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    if hasattr(value, "tolist"):  # numpy types orjson doesn't take directly
+        return value.tolist()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def row_to_dict(columns: list, row) -> dict:
+    """One result row as a dict; None stays None."""
+    if row is None:
+        return None
+    return dict(zip(columns, row))
+
+
+def rows_to_dicts(columns: list, rows) -> list:
+    """Result rows as dicts (values keep their Python types)."""
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def parse_fields(value: Optional[str], allowed, param: str = "fields") -> Optional[list]:
+    """
+    Comma-separated list of names from a query param, in `allowed` order.
+    None when the param wasn't given; 400 on names outside the whitelist.
+    """
+    if value is None:
+        return None
+    requested = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = sorted(requested.difference(allowed))
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid {param}: {unknown}. Must be any of: {list(allowed)}"
+        )
+    return [name for name in allowed if name in requested]
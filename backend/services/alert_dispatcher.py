@@ -0,0 +1,223 @@
+"""
+Alert Dispatcher Service - Delivers pending alerts through email / SMS / WhatsApp transports
+
+One dispatch cycle:
+1. Lease a batch of pending alerts from services/alert_queue.py
+   (several dispatchers can run side by side without picking the same rows,
+   and no row locks are held while sending)
+2. Group them per (channel, recipient) using the job's customer email/phone
+3. Drop repeats: the same job, channel and message already sent within the
+   dedup window (checked in the alerts table, so across dispatchers and
+   restarts), in flight at another dispatcher, or earlier in this batch
+4. Apply per-channel rate limits; groups over the limit are released for the next cycle
+5. Send the groups concurrently through the registered transports
+6. Settle every outcome with one bulk UPDATE (alert_queue.ack)
+
+Channels need a transport (register_transport()). Alerts for a channel
+without one are not claimed and stay pending until it is registered.
+ALERT_STUB_TRANSPORTS registers in-memory stubs for every channel
+(development and tests: alerts are marked sent without being delivered).
+
+Run as a worker:  python -m services.alert_dispatcher
+"""
+
+import os
+import socket
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+
+from config import (
+    ALERT_DISPATCH_BATCH_SIZE, ALERT_DISPATCH_INTERVAL, ALERT_SEND_CONCURRENCY,
+    ALERT_DEDUP_WINDOW_SECONDS, ALERT_RATE_LIMITS, ALERT_STUB_TRANSPORTS
+)
+from services import alert_queue
+
+CHANNELS = ["email", "sms", "whatsapp"]
+
+
+# ============================================================
+# TRANSPORTS
+# ============================================================
+
+class AlertTransport(ABC):
+    """A delivery channel. send() delivers all messages to one recipient or raises."""
+
+    channel = None
+
+    @abstractmethod
+    def send(self, recipient: str, messages: list):
+        ...
+
+
+class StubTransport(AlertTransport):
+    """Local transport that records deliveries in memory (development and tests)."""
+
+    def __init__(self, channel: str, fail: bool = False):
+        self.channel = channel
+        self.fail = fail
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def send(self, recipient: str, messages: list):
+        if self.fail:
+            raise RuntimeError(f"{self.channel} stub transport configured to fail")
+        with self._lock:
+            self.sent.append((recipient, list(messages)))
+
+
+_transports = {channel: StubTransport(channel) for channel in CHANNELS} if ALERT_STUB_TRANSPORTS else {}
+
+
+def register_transport(transport: AlertTransport):
+    """Install the transport used for transport.channel (replaces any stub)."""
+    _transports[transport.channel] = transport
+
+
+def get_transport(channel: str) -> AlertTransport:
+    return _transports.get(channel)
+
+
+# ============================================================
+# RATE LIMITING
+# ============================================================
+
+class TokenBucket:
+    """Non-blocking token bucket: `rate` tokens per second, bursts up to `rate`."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.capacity = max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+_rate_limiters = {channel: TokenBucket(rate) for channel, rate in ALERT_RATE_LIMITS.items()}
+
+
+# ============================================================
+# DISPATCH
+# ============================================================
+
+# Lease owner name for this process
+DISPATCHER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# Seconds between archive passes in the worker loop
+ARCHIVE_INTERVAL = 3600
+
+_send_pool = ThreadPoolExecutor(max_workers=ALERT_SEND_CONCURRENCY, thread_name_prefix="alert-send")
+
+
+def _send_group(channel: str, recipient: str, messages: list):
+    """Send one recipient's messages; returns None on success or the error text."""
+    transport = get_transport(channel)
+    if transport is None:
+        return f"No transport registered for channel '{channel}'"
+    try:
+        transport.send(recipient, messages)
+        return None
+    except Exception as e:
+        return str(e) or e.__class__.__name__
+
+
+def dispatch_once(batch_size: int = ALERT_DISPATCH_BATCH_SIZE) -> dict:
+    """Lease, send and settle one batch of pending alerts. Returns counts per outcome."""
+    summary = {"claimed": 0, "sent": 0, "failed": 0, "suppressed": 0, "deferred": 0}
+
+    # Leave alerts for channels without a transport pending (unknown types are still claimed and failed)
+    undeliverable = [channel for channel in CHANNELS if channel not in _transports]
+    claimed = alert_queue.claim(DISPATCHER_ID, batch_size, skip_types=undeliverable)
+    summary["claimed"] = len(claimed)
+    if not claimed:
+        return summary
+
+    outcomes = []  # (alert_id, status)
+    groups = {}    # (channel, recipient) -> [(alert_id, message)]
+    duplicates = alert_queue.duplicates(DISPATCHER_ID, [alert["id"] for alert in claimed],
+                                        ALERT_DEDUP_WINDOW_SECONDS)
+    seen = set()
+
+    for alert in claimed:
+        channel = alert["alert_type"]
+        recipient = alert["email"] if channel == "email" else alert["phone"]
+        if channel not in CHANNELS or not recipient:
+            outcomes.append((alert["id"], "failed"))
+            continue
+        key = (alert["job_id"], channel, alert["message"])
+        if key in seen or alert["id"] in duplicates:
+            outcomes.append((alert["id"], "suppressed"))
+            continue
+        seen.add(key)
+        groups.setdefault((channel, recipient), []).append((alert["id"], alert["message"]))
+
+    futures = {}
+    deferred = []
+    for (channel, recipient), items in groups.items():
+        limiter = _rate_limiters.get(channel)
+        if limiter and not limiter.try_acquire():
+            deferred.extend(alert_id for alert_id, _ in items)
+            continue
+        messages = [message for _, message in items]
+        futures[(channel, recipient)] = _send_pool.submit(_send_group, channel, recipient, messages)
+
+    for key, future in futures.items():
+        error = future.result()
+        items = groups[key]
+        if error:
+            print(f"Alert send failed ({key[0]} -> {key[1]}): {error}")
+            outcomes.extend((alert_id, "failed") for alert_id, _ in items)
+        else:
+            outcomes.extend((alert_id, "sent") for alert_id, _ in items)
+
+    alert_queue.release(DISPATCHER_ID, deferred)
+    summary["deferred"] = len(deferred)
+
+    settled = set(alert_queue.ack(DISPATCHER_ID, outcomes))
+    for alert_id, status in outcomes:
+        if alert_id in settled:
+            summary[status] += 1
+    return summary
+
+
+def run_dispatcher(stop_event: threading.Event = None):
+    """Dispatch continuously (archiving hourly); sleeps ALERT_DISPATCH_INTERVAL whenever the queue is empty."""
+    stop_event = stop_event or threading.Event()
+    last_archive = 0.0
+    while not stop_event.is_set():
+        try:
+            if time.monotonic() - last_archive > ARCHIVE_INTERVAL:
+                archived = alert_queue.archive()
+                last_archive = time.monotonic()
+                if archived:
+                    print(f"🗄️  Archived {archived} settled alerts")
+            summary = dispatch_once()
+            if summary["claimed"]:
+                print(f"📨 Alerts dispatched: {summary}")
+            if summary["claimed"] < ALERT_DISPATCH_BATCH_SIZE:
+                stop_event.wait(ALERT_DISPATCH_INTERVAL)
+        except Exception as e:
+            print(f"❌ Alert dispatch cycle failed: {e}")
+            stop_event.wait(ALERT_DISPATCH_INTERVAL)
+
+
+if __name__ == "__main__":
+    print("Starting alert dispatcher (Ctrl+C to stop)")
+    missing = [channel for channel in CHANNELS if channel not in _transports]
+    if missing:
+        print(f"⚠️ No transport registered for {', '.join(missing)} - those alerts stay pending")
+    try:
+        run_dispatcher()
+    except KeyboardInterrupt:
+        pass
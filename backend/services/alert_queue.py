@@ -0,0 +1,246 @@
+"""
+Alert Queue Service - Claim/lease access to pending alerts for parallel dispatchers
+
+- claim():   lease up to N visible pending alerts to an owner for `visibility_timeout`
+             seconds (FOR UPDATE SKIP LOCKED, committed immediately, so no locks
+             are held while messages are being sent)
+- ack():     settle leased alerts as sent / failed / suppressed in one UPDATE;
+             only the current lease owner can settle a row
+- release(): give leased alerts back before their timeout (e.g. rate-limited)
+- duplicates(): leased alerts whose job / channel / message was already sent
+             within a window, or is being sent by another dispatcher
+- archive(): move settled alerts past the retention window into alerts_archive
+
+A dispatcher that dies simply lets its leases expire; the rows become
+visible again and another dispatcher picks them up.
+
+The queue spans all tenants, so it runs under system_context().
+"""
+
+from psycopg2.extras import execute_values
+
+from config import ALERT_VISIBILITY_TIMEOUT, ALERT_ARCHIVE_AFTER_DAYS
+from db_connection import get_connection, release_connection, system_context
+
+SETTLED_STATUSES = ["sent", "failed", "suppressed"]
+
+# Rows moved per archive statement
+ARCHIVE_BATCH_SIZE = 5000
+
+CLAIM_COLUMNS = ['id', 'job_id', 'alert_type', 'message', 'attempts', 'leased_until', 'email', 'phone']
+
+
+def peek(limit: int = 50) -> list:
+    """Visible pending alerts in queue order (read-only)."""
+    conn = None
+    try:
+        with system_context():
+            conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT id, job_id, alert_type, message, attempts, created_at
+            FROM alerts
+            WHERE status = 'pending' AND (leased_until IS NULL OR leased_until < CURRENT_TIMESTAMP)
+            ORDER BY id
+            LIMIT %s
+        """, (limit,))
+        columns = ['id', 'job_id', 'alert_type', 'message', 'attempts', 'created_at']
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    finally:
+        if conn:
+            release_connection(conn)
+
+
+def claim(owner: str, limit: int, visibility_timeout: int = ALERT_VISIBILITY_TIMEOUT,
+          skip_types: list = None) -> list:
+    """
+    Lease up to `limit` alerts to `owner`; returns them with the customer's
+    email/phone. Alerts whose alert_type is in `skip_types` stay pending.
+    """
+    skip_filter = "AND alert_type <> ALL(%(skip_types)s)" if skip_types else ""
+    conn = None
+    try:
+        with system_context():
+            conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            WITH claimable AS (
+                SELECT id FROM alerts
+                WHERE status = 'pending' AND (leased_until IS NULL OR leased_until < CURRENT_TIMESTAMP)
+                  {skip_filter}
+                ORDER BY id
+                LIMIT %(limit)s
+                FOR UPDATE SKIP LOCKED
+            )
+            UPDATE alerts a
+            SET leased_until = CURRENT_TIMESTAMP + make_interval(secs => %(timeout)s),
+                lease_owner = %(owner)s,
+                attempts = a.attempts + 1
+            FROM claimable c, jobs j
+            LEFT JOIN customers cu ON cu.id = j.customer_id
+            WHERE a.id = c.id AND j.id = a.job_id
+            RETURNING a.id, a.job_id, a.alert_type, a.message, a.attempts, a.leased_until,
+                      cu.email, cu.phone
+        """, {"limit": limit, "timeout": visibility_timeout, "owner": owner, "skip_types": list(skip_types or [])})
+        claimed = [dict(zip(CLAIM_COLUMNS, row)) for row in cursor.fetchall()]
+        conn.commit()
+        claimed.sort(key=lambda a: a['id'])
+        return claimed
+    except Exception:
+        if conn:
+            conn.rollback()
+        raise
+    finally:
+        if conn:
+            release_connection(conn)
+
+
+def ack(owner: str, results: list) -> list:
+    """
+    Settle leased alerts. `results` is [(alert_id, status)] with status in
+    SETTLED_STATUSES. Returns the ids actually settled (rows whose lease
+    expired and moved to another owner are left alone).
+    """
+    for _, status in results:
+        if status not in SETTLED_STATUSES:
+            raise ValueError(f"Invalid status '{status}'. Must be one of: {SETTLED_STATUSES}")
+    if not results:
+        return []
+
+    conn = None
+    try:
+        with system_context():
+            conn = get_connection()
+        cursor = conn.cursor()
+        rows = execute_values(cursor, """
+            UPDATE alerts a
+            SET status = v.status,
+                sent_at = CASE WHEN v.status = 'sent' THEN CURRENT_TIMESTAMP ELSE a.sent_at END,
+                settled_at = CURRENT_TIMESTAMP,
+                leased_until = NULL,
+                lease_owner = NULL
+            FROM (VALUES %s) AS v(id, status, owner)
+            WHERE a.id = v.id AND a.lease_owner = v.owner AND a.status = 'pending'
+            RETURNING a.id
+        """, [(alert_id, status, owner) for alert_id, status in results],
+            page_size=len(results), fetch=True)
+        conn.commit()
+        return [r[0] for r in rows]
+    except Exception:
+        if conn:
+            conn.rollback()
+        raise
+    finally:
+        if conn:
+            release_connection(conn)
+
+
+def release(owner: str, alert_ids: list) -> int:
+    """Make leased alerts visible again right away."""
+    if not alert_ids:
+        return 0
+    conn = None
+    try:
+        with system_context():
+            conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE alerts SET leased_until = NULL, lease_owner = NULL
+            WHERE id = ANY(%s) AND lease_owner = %s AND status = 'pending'
+        """, (alert_ids, owner))
+        released = cursor.rowcount
+        conn.commit()
+        return released
+    except Exception:
+        if conn:
+            conn.rollback()
+        raise
+    finally:
+        if conn:
+            release_connection(conn)
+
+
+def duplicates(owner: str, alert_ids: list, window_seconds: int) -> set:
+    """
+    Ids among `alert_ids` (leased to `owner`) that repeat another alert for
+    the same job, channel and message which was sent within the last
+    `window_seconds`, or is pending with a lower id under another
+    dispatcher's live lease (the lowest id of a concurrent pair is sent).
+    Checked against the table, so it holds across dispatchers and restarts.
+    """
+    if not alert_ids:
+        return set()
+    conn = None
+    try:
+        with system_context():
+            conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT a.id FROM alerts a
+            WHERE a.id = ANY(%(ids)s)
+              AND EXISTS (
+                  SELECT 1 FROM alerts o
+                  WHERE o.job_id = a.job_id AND o.alert_type = a.alert_type AND o.message = a.message
+                    AND o.id <> a.id
+                    AND ((o.status = 'sent'
+                          AND o.sent_at >= CURRENT_TIMESTAMP - make_interval(secs => %(window)s))
+                      OR (o.status = 'pending' AND o.id < a.id
+                          AND o.leased_until > CURRENT_TIMESTAMP
+                          AND o.lease_owner IS DISTINCT FROM %(owner)s))
+              )
+        """, {"ids": alert_ids, "window": window_seconds, "owner": owner})
+        return {row[0] for row in cursor.fetchall()}
+    finally:
+        if conn:
+            release_connection(conn)
+
+
+def archive(older_than_days: int = ALERT_ARCHIVE_AFTER_DAYS) -> int:
+    """Move settled alerts older than the window into alerts_archive, in batches."""
+    conn = None
+    total = 0
+    try:
+        with system_context():
+            conn = get_connection()
+        cursor = conn.cursor()
+        while True:
+            cursor.execute("""
+                WITH moved AS (
+                    DELETE FROM alerts WHERE id IN (
+                        SELECT id FROM alerts
+                        WHERE status <> 'pending'
+                          AND settled_at < CURRENT_TIMESTAMP - make_interval(days => %s)
+                        ORDER BY settled_at
+                        LIMIT %s
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING id, job_id, alert_type, message, sent_at, status, created_at, settled_at, attempts
+                ), archived AS (
+                    -- An id already in the archive is overwritten, never dropped with the deleted row
+                    INSERT INTO alerts_archive (id, job_id, alert_type, message, sent_at, status,
+                                                created_at, settled_at, attempts)
+                    SELECT * FROM moved
+                    ON CONFLICT (id) DO UPDATE SET
+                        job_id = EXCLUDED.job_id, alert_type = EXCLUDED.alert_type,
+                        message = EXCLUDED.message, sent_at = EXCLUDED.sent_at, status = EXCLUDED.status,
+                        created_at = EXCLUDED.created_at, settled_at = EXCLUDED.settled_at,
+                        attempts = EXCLUDED.attempts, archived_at = CURRENT_TIMESTAMP
+                    RETURNING id
+                )
+                SELECT (SELECT COUNT(*) FROM moved), (SELECT COUNT(*) FROM archived)
+            """, (older_than_days, ARCHIVE_BATCH_SIZE))
+            # Progress is counted from the DELETE: rowcount of the INSERT would undercount
+            moved, archived = cursor.fetchone()
+            if archived != moved:
+                raise RuntimeError(f"Archive batch deleted {moved} alerts but archived {archived}")
+            conn.commit()
+            total += moved
+            if moved < ARCHIVE_BATCH_SIZE:
+                return total
+    except Exception:
+        if conn:
+            conn.rollback()
+        raise
+    finally:
+        if conn:
+            release_connection(conn)
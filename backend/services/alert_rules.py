@@ -0,0 +1,249 @@
+"""
+Alert Rules Service - Turns tenant-defined triggers into queued alerts
+
+Triggers (alert_rules.trigger_type):
+- eta_within           params {"hours": 48}              open job whose ETA falls inside the window
+- milestone_delayed    params {"milestone_code": opt.}   a milestone was marked delayed
+- milestone_completed  params {"milestone_code": req.}   e.g. OOC_GRANTED completed
+- not_gated_out        params {"days": 3}                DISCHARGED N days ago, no GATE_OUT yet
+
+Each trigger is one candidate query. Evaluation runs the candidates,
+records them in alert_rule_firings (ON CONFLICT DO NOTHING, so every
+occurrence fires once) and inserts the resulting alerts - all in a single
+statement. Job/milestone write handlers evaluate just the touched job;
+the periodic sweep only runs the time-based triggers, over index-backed
+predicates (see migrations/006_create_alert_rules.sql). Evaluation is
+system work and runs with tenant isolation bypassed.
+
+Run the sweep as a worker:  python -m services.alert_rules
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import ALERT_RULE_SWEEP_INTERVAL
+from db_connection import get_connection, release_connection, system_context
+from services.alert_dispatcher import CHANNELS
+
+# Jobs discharged longer ago than this (beyond the rule's own N days) are
+# assumed handled; keeps the not_gated_out sweep to a recent index range
+SWEEP_LOOKBACK_DAYS = 30
+
+# Every candidate query returns: rule_id, job_id, fire_key, detail
+TRIGGERS = {
+    "eta_within": {
+        "required_params": ["hours"],
+        "sql": """
+            SELECT r.id AS rule_id, j.id AS job_id, 'eta:' || j.eta AS fire_key, NULL::text AS detail
+            FROM alert_rules r
+            JOIN jobs j ON j.tenant_id = r.tenant_id
+            WHERE r.trigger_type = 'eta_within' AND r.is_active = TRUE
+              AND j.ata IS NULL
+              AND j.eta >= CURRENT_DATE
+              AND j.eta <= (CURRENT_TIMESTAMP + make_interval(hours => (r.params->>'hours')::int))::date
+              {job_filter}
+        """,
+    },
+    "milestone_delayed": {
+        "required_params": [],
+        "sql": """
+            SELECT r.id AS rule_id, j.id AS job_id, 'delayed:' || m.id AS fire_key, m.milestone_name AS detail
+            FROM alert_rules r
+            JOIN jobs j ON j.tenant_id = r.tenant_id
+            JOIN job_milestones m ON m.job_id = j.id
+            WHERE r.trigger_type = 'milestone_delayed' AND r.is_active = TRUE
+              AND m.status = 'delayed'
+              AND (r.params->>'milestone_code' IS NULL OR m.milestone_code = r.params->>'milestone_code')
+              {job_filter}
+        """,
+    },
+    "milestone_completed": {
+        "required_params": ["milestone_code"],
+        "sql": """
+            SELECT r.id AS rule_id, j.id AS job_id, 'completed:' || m.id AS fire_key, m.milestone_name AS detail
+            FROM alert_rules r
+            JOIN jobs j ON j.tenant_id = r.tenant_id
+            JOIN job_milestones m ON m.job_id = j.id
+            WHERE r.trigger_type = 'milestone_completed' AND r.is_active = TRUE
+              AND m.status = 'completed'
+              AND m.milestone_code = r.params->>'milestone_code'
+              {job_filter}
+        """,
+    },
+    "not_gated_out": {
+        "required_params": ["days"],
+        "sql": f"""
+            SELECT r.id AS rule_id, j.id AS job_id, 'not_gated_out:' || m.id AS fire_key, m.milestone_name AS detail
+            FROM alert_rules r
+            JOIN jobs j ON j.tenant_id = r.tenant_id
+            JOIN job_milestones m ON m.job_id = j.id
+            WHERE r.trigger_type = 'not_gated_out' AND r.is_active = TRUE
+              AND m.milestone_code = 'DISCHARGED' AND m.status = 'completed'
+              AND m.completed_at <= CURRENT_TIMESTAMP - make_interval(days => (r.params->>'days')::int)
+              AND m.completed_at > CURRENT_TIMESTAMP - make_interval(days => (r.params->>'days')::int + {SWEEP_LOOKBACK_DAYS})
+              AND NOT EXISTS (
+                  SELECT 1 FROM job_milestones g
+                  WHERE g.job_id = j.id AND g.milestone_code = 'GATE_OUT' AND g.status = 'completed'
+              )
+              AND NOT EXISTS (
+                  SELECT 1 FROM transport t WHERE t.job_id = j.id AND t.gate_out_time IS NOT NULL
+              )
+              {{job_filter}}
+        """,
+    },
+}
+
+# Triggers that change with the clock rather than with a write
+TIME_BASED_TRIGGERS = ["eta_within", "not_gated_out"]
+
+# Which triggers a write can affect
+JOB_EVENT_TRIGGERS = ["eta_within"]
+MILESTONE_EVENT_TRIGGERS = ["milestone_delayed", "milestone_completed", "not_gated_out"]
+
+# Upper bounds for the numeric params; the candidate queries cast them to int
+PARAM_LIMITS = {"hours": 24 * 365, "days": 365}
+
+MESSAGE_PLACEHOLDERS = {
+    "{job_no}": "j.job_no",
+    "{bl_no}": "j.bl_no",
+    "{vessel_name}": "j.vessel_name",
+    "{eta}": "j.eta::text",
+    "{milestone}": "c.detail",
+}
+
+
+def validate_rule(trigger_type: str, params: dict) -> dict:
+    """
+    Raise ValueError if the trigger type is unknown or its params are
+    incomplete or out of range; returns the params to store. Every active
+    rule runs in the same sweep statement, so one bad value would fail it
+    for all tenants.
+    """
+    if trigger_type not in TRIGGERS:
+        raise ValueError(f"Invalid trigger_type. Must be one of: {list(TRIGGERS.keys())}")
+    for name in TRIGGERS[trigger_type]["required_params"]:
+        if params.get(name) in (None, ""):
+            raise ValueError(f"Trigger '{trigger_type}' requires param '{name}'")
+
+    normalized = dict(params)
+    for name, limit in PARAM_LIMITS.items():
+        if name in params:
+            value = params[name]
+            if isinstance(value, bool) or not isinstance(value, int) or not 0 < value <= limit:
+                raise ValueError(f"Param '{name}' must be an integer from 1 to {limit}")
+            normalized[name] = int(value)
+    if params.get("milestone_code") is not None:
+        if not isinstance(params["milestone_code"], str):
+            raise ValueError("Param 'milestone_code' must be a string")
+        normalized["milestone_code"] = params["milestone_code"].strip()
+    return normalized
+
+
+def validate_alert_type(alert_type: str):
+    """Raise ValueError unless alert_type is a dispatcher channel."""
+    if alert_type not in CHANNELS:
+        raise ValueError(f"Invalid alert_type. Must be one of: {CHANNELS}")
+
+
+def _render_message_sql() -> str:
+    expression = "r.message_template"
+    for placeholder, column in MESSAGE_PLACEHOLDERS.items():
+        expression = f"replace({expression}, '{placeholder}', coalesce({column}, ''))"
+    return expression
+
+
+def evaluate(triggers: list, job_id: int = None) -> int:
+    """Fire the given triggers (for one job, or all jobs). Returns the number of alerts queued."""
+    job_filter = "AND j.id = %(job_id)s" if job_id is not None else ""
+    candidates = " UNION ALL ".join(
+        TRIGGERS[t]["sql"].format(job_filter=job_filter) for t in triggers
+    )
+
+    conn = None
+    try:
+        with system_context():
+            conn = get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute(f"""
+            WITH candidates AS ({candidates}),
+            fired AS (
+                INSERT INTO alert_rule_firings (rule_id, job_id, fire_key)
+                SELECT rule_id, job_id, fire_key FROM candidates
+                ON CONFLICT DO NOTHING
+                RETURNING rule_id, job_id, fire_key
+            )
+            INSERT INTO alerts (job_id, alert_type, message)
+            SELECT f.job_id, r.alert_type, {_render_message_sql()}
+            FROM fired f
+            JOIN alert_rules r ON r.id = f.rule_id
+            JOIN jobs j ON j.id = f.job_id
+            JOIN candidates c ON c.rule_id = f.rule_id AND c.job_id = f.job_id AND c.fire_key = f.fire_key
+        """, {"job_id": job_id})
+        queued = cursor.rowcount
+
+        conn.commit()
+        return queued
+
+    except Exception:
+        if conn:
+            conn.rollback()
+        raise
+    finally:
+        if conn:
+            release_connection(conn)
+
+
+# ============================================================
+# CHANGE EVENTS - called by route handlers after commit.
+# Evaluated on a background thread so the request doesn't wait.
+# ============================================================
+
+_event_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="alert-rules")
+
+
+def _evaluate_event(triggers: list, job_id: int):
+    try:
+        queued = evaluate(triggers, job_id)
+        if queued:
+            print(f"🔔 {queued} alert(s) queued for job {job_id}")
+    except Exception as e:
+        print(f"❌ Alert rule evaluation failed for job {job_id}: {e}")
+
+
+def on_job_changed(job_id: int):
+    _event_pool.submit(_evaluate_event, JOB_EVENT_TRIGGERS, job_id)
+
+
+def on_milestone_changed(job_id: int):
+    _event_pool.submit(_evaluate_event, MILESTONE_EVENT_TRIGGERS, job_id)
+
+
+# ============================================================
+# SWEEP
+# ============================================================
+
+def run_sweep() -> int:
+    """Evaluate the time-based triggers across all jobs."""
+    return evaluate(TIME_BASED_TRIGGERS)
+
+
+def run_sweeper(stop_event: threading.Event = None):
+    """Sweep every ALERT_RULE_SWEEP_INTERVAL seconds until stopped."""
+    stop_event = stop_event or threading.Event()
+    while not stop_event.is_set():
+        try:
+            queued = run_sweep()
+            if queued:
+                print(f"🔔 Rule sweep queued {queued} alert(s)")
+        except Exception as e:
+            print(f"❌ Alert rule sweep failed: {e}")
+        stop_event.wait(ALERT_RULE_SWEEP_INTERVAL)
+
+
+if __name__ == "__main__":
+    print("Starting alert rule sweeper (Ctrl+C to stop)")
+    try:
+        run_sweeper()
+    except KeyboardInterrupt:
+        pass
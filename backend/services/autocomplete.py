@@ -0,0 +1,227 @@
+"""
+Autocomplete Service - Per-tenant in-memory prefix indexes for typeahead
+Serves customer, shipping line, vessel and port suggestions without hitting Postgres.
+
+Each tenant gets one PrefixIndex per field, built lazily from the distinct
+column values on first use and then kept fresh by the write handlers in
+routes/new_job.py and routes/customer.py. A periodic rebuild (INDEX_TTL_SECONDS)
+bounds any drift from writes made outside those handlers.
+"""
+
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Optional
+
+from db_connection import get_connection, release_connection
+
+# Fields that can be autocompleted. Ports share one index built from pol + pod.
+JOB_FIELDS = {
+    "shipping_line": ["shipping_line"],
+    "vessel_name": ["vessel_name"],
+    "port": ["pol", "pod"],
+}
+FIELDS = ["customer"] + list(JOB_FIELDS.keys())
+
+# Rebuild a tenant's indexes from the database after this long
+INDEX_TTL_SECONDS = 15 * 60
+
+# Upper bound on tenants held in memory (least recently used are dropped)
+MAX_TENANTS = 500
+
+
+class PrefixIndex:
+    """
+    Sorted array of case-folded keys. A prefix lookup is one bisect plus a
+    scan of at most `limit` neighbours, so it stays in the microsecond range
+    regardless of how many values the tenant has.
+    """
+
+    def __init__(self):
+        self._keys = []      # sorted, case-folded
+        self._entries = {}   # key -> [display value, refcount, payload]
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _count(self, value: Optional[str], payload, count: int) -> Optional[str]:
+        """Count a value into _entries; returns its key if it is new (not in _keys yet)."""
+        value = (value or "").strip()
+        if not value:
+            return None
+        key = value.casefold()
+        entry = self._entries.get(key)
+        if entry:
+            entry[1] += count
+            if payload is not None:
+                entry[2] = payload
+            return None
+        self._entries[key] = [value, count, payload]
+        return key
+
+    def add(self, value: Optional[str], payload=None, count: int = 1):
+        key = self._count(value, payload, count)
+        if key is not None:
+            insort(self._keys, key)
+
+    def load(self, items):
+        """Bulk add (value, payload, count) tuples: one sort rather than an O(n) insort per key."""
+        for value, payload, count in items:
+            self._count(value, payload, count)
+        self._keys = sorted(self._entries)
+
+    def discard(self, value: Optional[str]):
+        value = (value or "").strip()
+        if not value:
+            return
+        key = value.casefold()
+        entry = self._entries.get(key)
+        if not entry:
+            return
+        entry[1] -= 1
+        if entry[1] > 0:
+            return
+        del self._entries[key]
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
+
+    def search(self, prefix: str, limit: int = 10) -> list:
+        prefix = prefix.strip().casefold()
+        keys = self._keys
+        i = bisect_left(keys, prefix)
+        results = []
+        while i < len(keys) and len(results) < limit and keys[i].startswith(prefix):
+            value, count, payload = self._entries[keys[i]]
+            results.append((value, count, payload))
+            i += 1
+        return results
+
+
+class _TenantIndexes:
+    def __init__(self):
+        self.built_at = time.monotonic()
+        self.fields = {field: PrefixIndex() for field in FIELDS}
+        self.customer_names = {}  # customer id -> company_name, to handle renames
+
+
+_tenants = OrderedDict()  # tenant_id -> _TenantIndexes
+_lock = threading.Lock()
+
+
+def _build(tenant_id: int) -> _TenantIndexes:
+    """Load distinct values for one tenant (one round trip per table)."""
+    indexes = _TenantIndexes()
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+
+        selects = []
+        for field, columns in JOB_FIELDS.items():
+            for column in columns:
+                selects.append(f"""
+                    SELECT '{field}', {column}, COUNT(*) FROM jobs
+                    WHERE tenant_id = %(tenant_id)s AND {column} IS NOT NULL
+                    GROUP BY {column}
+                """)
+        cursor.execute(" UNION ALL ".join(selects), {"tenant_id": tenant_id})
+        values = {field: [] for field in JOB_FIELDS}
+        for field, value, count in cursor.fetchall():
+            values[field].append((value, None, count))
+        for field, items in values.items():
+            indexes.fields[field].load(items)
+
+        cursor.execute("SELECT id, company_name FROM customers WHERE tenant_id = %s", (tenant_id,))
+        customers = cursor.fetchall()
+        indexes.fields["customer"].load((company_name, customer_id, 1) for customer_id, company_name in customers)
+        indexes.customer_names.update((customer_id, company_name) for customer_id, company_name in customers)
+    finally:
+        if conn:
+            release_connection(conn)
+    return indexes
+
+
+def _get(tenant_id: int, build: bool = True) -> Optional[_TenantIndexes]:
+    with _lock:
+        indexes = _tenants.get(tenant_id)
+        if indexes and time.monotonic() - indexes.built_at < INDEX_TTL_SECONDS:
+            _tenants.move_to_end(tenant_id)
+            return indexes
+    if not build:
+        return None
+
+    indexes = _build(tenant_id)
+    with _lock:
+        _tenants[tenant_id] = indexes
+        _tenants.move_to_end(tenant_id)
+        while len(_tenants) > MAX_TENANTS:
+            _tenants.popitem(last=False)
+    return indexes
+
+
+def suggest(tenant_id: int, field: str, prefix: str, limit: int = 10) -> list:
+    """Return up to `limit` values for `field` starting with `prefix`."""
+    indexes = _get(tenant_id)
+    with _lock:
+        matches = indexes.fields[field].search(prefix, limit)
+    if field == "customer":
+        return [{"value": value, "id": payload} for value, _, payload in matches]
+    return [{"value": value, "count": count} for value, count, _ in matches]
+
+
+# ============================================================
+# WRITE HOOKS - called by route handlers after commit.
+# Only tenants whose indexes are already in memory are touched;
+# anything else is built fresh on its next lookup.
+# ============================================================
+
+def record_job(tenant_id: int, old: Optional[dict] = None, new: Optional[dict] = None):
+    """Apply a job insert/update/delete (old and/or new column values)."""
+    indexes = _get(tenant_id, build=False)
+    if not indexes:
+        return
+    with _lock:
+        for field, columns in JOB_FIELDS.items():
+            for column in columns:
+                old_value = (old or {}).get(column)
+                new_value = (new or {}).get(column)
+                if old is not None and new is not None and old_value == new_value:
+                    continue
+                if old is not None:
+                    indexes.fields[field].discard(old_value)
+                if new is not None:
+                    indexes.fields[field].add(new_value)
+
+
+def record_customer(tenant_id: int, customer_id: int, company_name: str):
+    """Apply a customer insert or rename."""
+    indexes = _get(tenant_id, build=False)
+    if not indexes:
+        return
+    with _lock:
+        previous = indexes.customer_names.get(customer_id)
+        if previous == company_name:
+            return
+        if previous is not None:
+            indexes.fields["customer"].discard(previous)
+        indexes.fields["customer"].add(company_name, payload=customer_id)
+        indexes.customer_names[customer_id] = company_name
+
+
+def remove_customer(tenant_id: int, customer_id: int):
+    """Apply a customer delete."""
+    indexes = _get(tenant_id, build=False)
+    if not indexes:
+        return
+    with _lock:
+        previous = indexes.customer_names.pop(customer_id, None)
+        if previous is not None:
+            indexes.fields["customer"].discard(previous)
+
+
+def invalidate(tenant_id: int):
+    """Drop a tenant's indexes (e.g. after a bulk load); rebuilt on next lookup."""
+    with _lock:
+        _tenants.pop(tenant_id, None)
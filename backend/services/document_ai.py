@@ -1,12 +1,16 @@
 """
 Document AI Service - Extract INCOTERM and other data from documents
-Uses Google Cloud Document AI for OCR and text extraction
+Uses a PDF's own text, local OCR or Google Cloud Document AI for text
+extraction (services/ocr_backends.py)
 """
 
 import os
 import re
-from google.cloud import documentai_v1 as documentai
-from google.oauth2 import service_account
+import time
+from contextlib import closing
+
+from config import PDF_SCAN_MAX_PAGES
+from services import metrics, ocr_backends, parse_pool, tracing
 
 # Path to service account key
 SERVICE_ACCOUNT_FILE = os.path.join(
@@ -41,125 +45,269 @@ INCOTERM_CATEGORIES = {
 
 def get_document_ai_client():
     """Get authenticated Document AI client."""
+    # Imported here so the text helpers below work without the Google SDK
+    from google.cloud import documentai_v1 as documentai
+    from google.oauth2 import service_account
+
     credentials = service_account.Credentials.from_service_account_file(
         SERVICE_ACCOUNT_FILE
     )
     return documentai.DocumentProcessorServiceClient(credentials=credentials)
 
 
-def extract_text_from_document(file_path: str) -> str:
+MIME_TYPES = {
+    ".pdf": "application/pdf",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".tiff": "image/tiff",
+    ".tif": "image/tiff",
+}
+
+
+def _document_ai_text(file_path: str, ext: str) -> str:
+    """OCR the file with Document AI; raises if it isn't available."""
+    from google.cloud import documentai_v1 as documentai
+    client = get_document_ai_client()
+    
+    # The API takes the whole document inline
+    with open(file_path, "rb") as f:
+        file_content = f.read()
+    mime_type = MIME_TYPES.get(ext, "application/pdf")
+    
+    raw_document = documentai.RawDocument(
+        content=file_content,
+        mime_type=mime_type
+    )
+    
+    # Create request - using inline processing (no processor needed for basic OCR)
+    # Note: For production, you should create a processor in Document AI console
+    request = documentai.ProcessRequest(
+        name=f"projects/{PROJECT_ID}/locations/{LOCATION}/processors/pretrained-ocr-v2.0-2021-04-02",
+        raw_document=raw_document
+    )
+    
+    with metrics.ocr_timer("document_ai"), tracing.span("ocr.document_ai", mime_type=mime_type):
+        result = client.process_document(request=request)
+    return result.document.text
+
+
+def iter_pdf_pages(source, max_pages: int = None):
     """
-    Extract text from a document using Google Cloud Document AI.
-    Falls back to simple text extraction if Document AI is not configured.
+    Yield a PDF's embedded text one page at a time (PyMuPDF).
+    `source` is a file path - MuPDF then reads pages from disk as they're
+    needed instead of loading the whole file - or the file's bytes.
+    Stops after max_pages pages (default PDF_SCAN_MAX_PAGES, 0 = all);
+    closing the generator early closes the document.
     """
+    import fitz  # PyMuPDF
+    
+    if max_pages is None:
+        max_pages = PDF_SCAN_MAX_PAGES
+    
+    doc = None
+    failed = False
+    started = time.perf_counter()
+    elapsed = 0.0  # PyMuPDF time only, not the consumer's
     try:
-        # Read file
-        with open(file_path, "rb") as f:
-            file_content = f.read()
-        
-        # Determine MIME type
-        ext = os.path.splitext(file_path)[1].lower()
-        mime_types = {
-            ".pdf": "application/pdf",
-            ".jpg": "image/jpeg",
-            ".jpeg": "image/jpeg",
-            ".png": "image/png",
-            ".tiff": "image/tiff",
-            ".tif": "image/tiff",
-        }
-        mime_type = mime_types.get(ext, "application/pdf")
-        
-        # Try Document AI OCR
-        try:
-            client = get_document_ai_client()
-            
-            # Use OCR processor endpoint
-            # Format: projects/{project}/locations/{location}/processors/{processor}
-            # For basic OCR, we can use the raw document processing
-            
-            raw_document = documentai.RawDocument(
-                content=file_content,
-                mime_type=mime_type
-            )
-            
-            # Create request - using inline processing (no processor needed for basic OCR)
-            # Note: For production, you should create a processor in Document AI console
-            request = documentai.ProcessRequest(
-                name=f"projects/{PROJECT_ID}/locations/{LOCATION}/processors/pretrained-ocr-v2.0-2021-04-02",
-                raw_document=raw_document
-            )
-            
-            result = client.process_document(request=request)
-            return result.document.text
-            
-        except Exception as e:
-            print(f"Document AI error (will use fallback): {e}")
-            # Fall back to simple text for testing
-            return extract_text_fallback(file_content, ext)
-            
-    except Exception as e:
-        print(f"Error extracting text: {e}")
-        return ""
+        if isinstance(source, str):
+            doc = fitz.open(source, filetype="pdf")
+        else:
+            doc = fitz.open(stream=source, filetype="pdf")
+        pages = min(max_pages, doc.page_count) if max_pages else doc.page_count
+        for number in range(pages):
+            text = doc.load_page(number).get_text()
+            elapsed += time.perf_counter() - started
+            yield text
+            started = time.perf_counter()
+        elapsed += time.perf_counter() - started
+    except Exception:
+        failed = True
+        elapsed += time.perf_counter() - started
+        raise
+    finally:
+        if doc is not None:
+            doc.close()
+        metrics.observe_ocr("pymupdf", elapsed, failed=failed)
+
+
+@tracing.traced("ocr.extract_text_from_document")
+def extract_text_from_document(file_path: str, max_pages: int = None) -> str:
+    """
+    Extract text from a document: the PDF's own text layer, then local OCR,
+    then Google Cloud Document AI (services/ocr_backends.py, OCR_BACKENDS).
+    Returns "" if none of them finds any.
+    """
+    text, _ = ocr_backends.extract_text(file_path, max_pages)
+    return text
 
 
+@tracing.traced("ocr.extract_text_fallback")
 def extract_text_fallback(file_content: bytes, ext: str) -> str:
     """Fallback text extraction for testing."""
     # For PDFs, try to extract embedded text
     if ext == ".pdf":
         try:
-            import fitz  # PyMuPDF
-            doc = fitz.open(stream=file_content, filetype="pdf")
-            text = ""
-            for page in doc:
-                text += page.get_text()
-            return text
-        except:
+            return parse_pool.run(_pdf_text, file_content)
+        except parse_pool.ParsePoolError:
+            raise
+        except Exception:
             pass
     return ""
 
 
-def find_incoterm(text: str) -> dict:
+def _pdf_text(source, max_pages: int = None) -> str:
+    """Parse pool task: a PDF's whole embedded text (path or bytes)."""
+    return "".join(iter_pdf_pages(source, max_pages))
+
+
+class EmbeddedTextBackend(ocr_backends.OcrBackend):
+    """A PDF's own text layer, parsed in the parse pool; empty for scanned PDFs."""
+
+    name = ocr_backends.EMBEDDED
+    extensions = frozenset({".pdf"})
+
+    def extract(self, file_path: str, ext: str, max_pages: int = None) -> str:
+        return parse_pool.run(_pdf_text, file_path, max_pages)
+
+
+class DocumentAiBackend(ocr_backends.OcrBackend):
+    """Google Cloud Document AI; available with the SDK installed and the service account key present."""
+
+    name = ocr_backends.DOCUMENT_AI
+    extensions = frozenset(MIME_TYPES)
+
+    def __init__(self):
+        self._configured = None
+
+    def available(self) -> bool:
+        if self._configured is None:
+            try:
+                from google.cloud import documentai_v1  # noqa: F401
+                self._configured = os.path.exists(SERVICE_ACCOUNT_FILE)
+            except ImportError:
+                self._configured = False
+        return self._configured
+
+    def extract(self, file_path: str, ext: str, max_pages: int = None) -> str:
+        return _document_ai_text(file_path, ext)
+
+
+ocr_backends.register(EmbeddedTextBackend())
+ocr_backends.register(DocumentAiBackend())
+
+
+# Spelled-out forms, matched anywhere (no word boundaries), checked after the codes
+INCOTERM_VARIANTS = [
+    ("C & F", "C&F"),
+    ("C AND F", "C&F"),
+    ("EX-WORKS", "EXW"),
+    ("EX WORKS", "EXW"),
+    ("COST AND FREIGHT", "CFR"),
+    ("COST INSURANCE FREIGHT", "CIF"),
+    ("FREE ON BOARD", "FOB"),
+    ("FREE CARRIER", "FCA"),
+]
+
+_INCOTERM_CANONICAL = {**{term: term for term in INCOTERMS}, **dict(INCOTERM_VARIANTS)}
+_INCOTERM_CODES = frozenset(INCOTERMS)
+
+# Variants only decide when the text names no code; then in INCOTERM_VARIANTS order
+_VARIANT_PRIORITY = {variant: rank for rank, (variant, _) in enumerate(INCOTERM_VARIANTS)}
+
+# One pass over the text for every code and variant. The capturing lookahead
+# makes hits overlap-safe ("C & FOB" yields both "C & F" and "FOB"); the
+# leading first-letter class lets the regex engine skip other positions fast.
+_INCOTERM_SCANNER = re.compile(
+    "(?=[" + "".join(sorted({match[0] for match in _INCOTERM_CANONICAL})) + "])"
+    r"(?=(\b(?:" + "|".join(re.escape(term) for term in INCOTERMS) + r")\b"
+    + "".join("|" + re.escape(variant) for variant, _ in INCOTERM_VARIANTS) + "))"
+)
+
+# Charge labels in priority order; OTHER / ADDITIONAL need the word CHARGE(S).
+# Each whitespace run follows a required token, so a label followed by a long
+# blank gap and no amount fails in linear time (the old per-label patterns
+# chained optional tokens between \s* runs and backtracked polynomially).
+MISC_CHARGE_LABELS = ["MISCELLANEOUS", "MISC", "OTHER", "ADDITIONAL"]
+
+_CHARGES_SCANNER = re.compile(
+    r"(?=[MOA])(?:(?P<label>MISCELLANEOUS|MISC\.?)\s*(?:CHARGES?\s*)?"
+    r"|(?P<label_charges>OTHER|ADDITIONAL)\s*CHARGES?\s*)"
+    r"(?:[:\-]\s*)?(?:(?:USD|INR|RS\.?)\s*)?"
+    r"(?P<amount>[\d,]+\.?\d*)"
+)
+
+
+def scan_incoterms(text: str) -> list:
+    """
+    Every INCOTERM code or spelled-out variant in the text, in order:
+    [{"term": canonical code, "match": text matched, "position": offset}].
+    Offsets are into text.upper() (the same as text for ASCII).
+    """
+    return [
+        {"term": _INCOTERM_CANONICAL[m.group(1)], "match": m.group(1), "position": m.start()}
+        for m in _INCOTERM_SCANNER.finditer(text.upper())
+    ]
+
+
+def scan_misc_charges(text: str) -> list:
     """
-    Find INCOTERM in extracted text.
-    Returns dict with term, category, and required documents.
+    Every charge label followed by an amount, in order:
+    [{"label": one of MISC_CHARGE_LABELS, "amount": float or None, "position": offset}].
     """
     text_upper = text.upper()
+    # Every label is MISC... or ends in CHARGE(S); nothing to scan without either
+    if "MISC" not in text_upper and "CHARGE" not in text_upper:
+        return []
     
-    detected_term = None
-    
-    # Search for INCOTERM patterns
-    for term in INCOTERMS:
-        # Look for term with word boundaries
-        pattern = r'\b' + re.escape(term) + r'\b'
-        if re.search(pattern, text_upper):
-            detected_term = term
-            break
-    
-    # Also check for common variations
-    if not detected_term:
-        if "C & F" in text_upper or "C AND F" in text_upper:
-            detected_term = "C&F"
-        elif "EX-WORKS" in text_upper or "EX WORKS" in text_upper:
-            detected_term = "EXW"
-        elif "COST AND FREIGHT" in text_upper:
-            detected_term = "CFR"
-        elif "COST INSURANCE FREIGHT" in text_upper:
-            detected_term = "CIF"
-        elif "FREE ON BOARD" in text_upper:
-            detected_term = "FOB"
-        elif "FREE CARRIER" in text_upper:
-            detected_term = "FCA"
-    
-    if not detected_term:
+    candidates = []
+    for m in _CHARGES_SCANNER.finditer(text_upper):
+        try:
+            amount = float(m.group("amount").replace(",", ""))
+        except ValueError:
+            amount = None
+        candidates.append({
+            "label": (m.group("label") or m.group("label_charges")).rstrip("."),
+            "amount": amount,
+            "position": m.start(),
+        })
+    return candidates
+
+
+def _incoterm_rank(candidate: dict) -> tuple:
+    if candidate["match"] in _INCOTERM_CODES:
+        return (0, candidate["position"])
+    return (1, _VARIANT_PRIORITY[candidate["match"]], candidate["position"])
+
+
+def find_incoterm(text: str, candidates: list = None) -> dict:
+    """
+    Find INCOTERM in extracted text: the first code in the text decides
+    (CIF on page 1 beats DAP on page 3); spelled-out variants only count
+    when no code appears. The answer doesn't depend on where the text is
+    cut into pages, so IncotermScanner can stop at the first page naming a
+    code and still agree with a whole-text scan (OCR, Document AI).
+    Returns dict with term, category, and required documents, plus where it
+    was found and every candidate seen (scan_incoterms, or pass them in).
+    """
+    if candidates is None:
+        candidates = scan_incoterms(text)
+    best = min(candidates, key=_incoterm_rank, default=None)
+    
+    if not best:
         return {
             "detected": False,
             "term": None,
+            "position": None,
             "category": None,
             "required_docs": ["bl", "invoice", "pl"],
             "needs_freight": False,
-            "extract_misc": False
+            "extract_misc": False,
+            "candidates": []
         }
     
+    detected_term = best["term"]
+    
     # Determine category
     category = "basic"
     needs_freight = False
@@ -181,71 +329,180 @@ def find_incoterm(text: str) -> dict:
     return {
         "detected": True,
         "term": detected_term,
+        "position": best["position"],
         "category": category,
         "required_docs": required_docs,
         "needs_freight": needs_freight,
-        "extract_misc": extract_misc
+        "extract_misc": extract_misc,
+        "candidates": candidates
     }
 
 
-def extract_misc_charges(text: str) -> float:
+class IncotermScanner:
+    """
+    find_incoterm for text that arrives in chunks (pages), so reading can
+    stop early: feed() returns True once a code such as FOB has been seen.
+    find_incoterm picks the first code in the text, which is then known;
+    spelled-out variants rank below codes, so those alone keep it going.
+    The result equals find_incoterm on the whole text. Matches spanning
+    two chunks are found; positions are offsets into the concatenated text.
+    """
+
+    # Rescanned from the previous chunk: the longest code/variant plus one
+    # character of context for the word boundary
+    OVERLAP = max(len(match) for match in _INCOTERM_CANONICAL) + 1
+
+    def __init__(self):
+        self.candidates = []
+        self.scanned = 0  # characters fed so far
+        self.confirmed = False
+        self._tail = ""
+        self._flushed = False
+
+    def _scan(self, text: str, final: bool):
+        chunk = self._tail + text
+        offset = self.scanned - len(self._tail)
+        for candidate in scan_incoterms(chunk):
+            end = candidate["position"] + len(candidate["match"])
+            if end < len(self._tail):
+                continue  # found last time
+            if end == len(chunk) and not final:
+                continue  # the next chunk may continue the word; decide then
+            candidate["position"] += offset
+            self.candidates.append(candidate)
+            if candidate["match"] in _INCOTERM_CODES:
+                self.confirmed = True
+        self.scanned += len(text)
+        self._tail = chunk[-self.OVERLAP:]
+
+    def feed(self, text: str) -> bool:
+        self._scan(text, final=False)
+        return self.confirmed
+
+    def result(self) -> dict:
+        if not self._flushed:
+            self._flushed = True
+            self._scan("", final=True)
+        return find_incoterm("", self.candidates)
+
+
+def extract_misc_charges(text: str, candidates: list = None) -> float:
     """
     Extract miscellaneous charges amount from invoice text.
-    Returns the amount found, or 0 if not found.
+    Returns the amount found, or 0 if not found. The first hit of the
+    highest-priority label wins; pass scan_misc_charges() output as
+    `candidates` to avoid scanning twice.
     """
-    text_upper = text.upper()
+    if candidates is None:
+        candidates = scan_misc_charges(text)
     
-    # Common patterns for misc charges
-    patterns = [
-        r'MISCELLANEOUS\s*(?:CHARGES?)?\s*[:\-]?\s*(?:USD|INR|RS\.?)?\s*([\d,]+\.?\d*)',
-        r'MISC\.?\s*(?:CHARGES?)?\s*[:\-]?\s*(?:USD|INR|RS\.?)?\s*([\d,]+\.?\d*)',
-        r'OTHER\s*CHARGES?\s*[:\-]?\s*(?:USD|INR|RS\.?)?\s*([\d,]+\.?\d*)',
-        r'ADDITIONAL\s*CHARGES?\s*[:\-]?\s*(?:USD|INR|RS\.?)?\s*([\d,]+\.?\d*)',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text_upper)
-        if match:
-            try:
-                amount_str = match.group(1).replace(",", "")
-                return float(amount_str)
-            except:
-                pass
+    for label in MISC_CHARGE_LABELS:
+        first = next((c for c in candidates if c["label"] == label), None)
+        if first and first["amount"] is not None:
+            return first["amount"]
     
     return 0.0
 
 
-def process_packing_list(file_path: str) -> dict:
+def _scan_pdf_incoterm(file_path: str, max_pages: int = None) -> tuple:
+    """
+    Parse pool task: stream a PDF's pages into IncotermScanner until one
+    names a code. Returns (characters read, find_incoterm result).
+    """
+    scanner = IncotermScanner()
+    with closing(iter_pdf_pages(file_path, max_pages)) as pages:
+        for page in pages:
+            if scanner.feed(page):
+                break
+    return scanner.scanned, scanner.result()
+
+
+@tracing.traced("ocr.process_packing_list")
+def process_packing_list(file_path: str, max_pages: int = None) -> dict:
     """
     Process a packing list document:
-    1. Extract text using Document AI
-    2. Find INCOTERM
+    1. Stream a PDF's text layer page by page, stopping at the first page
+       that names an INCOTERM code
+    2. No text layer (scans, images): OCR it (services/ocr_backends.py) and
+       find INCOTERM in the result
+    Both pick the first code in the document (find_incoterm), so a later
+    page naming another code doesn't change the result.
     3. Return results with document requirements
+    Scanning runs in the parse pool; its errors (busy, timeout) are raised.
     """
-    text = extract_text_from_document(file_path)
-    incoterm_result = find_incoterm(text)
+    ext = os.path.splitext(file_path)[1].lower()
+    scanned, result = 0, find_incoterm("", [])
+    try:
+        if ocr_backends.EMBEDDED in ocr_backends.route(ext):
+            with ocr_backends.attempt(ocr_backends.EMBEDDED) as embedded:
+                scanned, result = parse_pool.run(_scan_pdf_incoterm, file_path, max_pages)
+                embedded.chars = scanned
+            if embedded.found:
+                return {"text_extracted": True, "text_length": scanned, **result}
+    except parse_pool.ParsePoolError:
+        raise
+    except Exception as e:
+        print(f"Error extracting text: {e}")
+    
+    text, _ = ocr_backends.extract_text(file_path, max_pages, skip=(ocr_backends.EMBEDDED,))
+    if len(text) > scanned:
+        scanned, result = len(text), parse_pool.run(find_incoterm, text)
     
     return {
-        "text_extracted": len(text) > 0,
-        "text_length": len(text),
-        **incoterm_result
+        "text_extracted": scanned > 0,
+        "text_length": scanned,
+        **result
     }
 
 
-def process_invoice(file_path: str, extract_misc: bool = False) -> dict:
+def _scan_pdf_charges(file_path: str, max_pages: int = None, scan: bool = True) -> tuple:
+    """
+    Parse pool task: a PDF's embedded text and its misc-charge candidates
+    (None unless `scan`), so the text itself never leaves the worker.
+    Returns (text length, non-blank characters, candidates).
+    """
+    text = _pdf_text(file_path, max_pages)
+    return len(text), len(text.strip()), scan_misc_charges(text) if scan else None
+
+
+@tracing.traced("ocr.process_invoice")
+def process_invoice(file_path: str, extract_misc: bool = False, max_pages: int = None) -> dict:
     """
     Process an invoice document:
-    1. Extract text using Document AI
-    2. If extract_misc is True, find miscellaneous charges
+    1. A PDF's text layer is read and, with extract_misc, scanned for
+       miscellaneous charges in one parse pool task
+    2. No text layer (scans, images): OCR it (services/ocr_backends.py)
+       and scan the result
+    Scanning runs in the parse pool; its errors (busy, timeout) are raised.
     """
-    text = extract_text_from_document(file_path)
+    ext = os.path.splitext(file_path)[1].lower()
+    length, candidates, found = 0, [], False
+    try:
+        if ocr_backends.EMBEDDED in ocr_backends.route(ext):
+            with ocr_backends.attempt(ocr_backends.EMBEDDED) as embedded:
+                length, embedded.chars, candidates = parse_pool.run(
+                    _scan_pdf_charges, file_path, max_pages, extract_misc
+                )
+            found = embedded.found
+    except parse_pool.ParsePoolError:
+        raise
+    except Exception as e:
+        print(f"Error extracting text: {e}")
+    
+    if not found:
+        text, _ = ocr_backends.extract_text(file_path, max_pages, skip=(ocr_backends.EMBEDDED,))
+        if len(text) > length:
+            length = len(text)
+            candidates = parse_pool.run(scan_misc_charges, text) if extract_misc else None
     
     result = {
-        "text_extracted": len(text) > 0,
-        "text_length": len(text),
+        "text_extracted": length > 0,
+        "text_length": length,
     }
     
     if extract_misc:
-        result["misc_charges"] = extract_misc_charges(text)
+        candidates = candidates or []
+        result["misc_charges"] = extract_misc_charges("", candidates)
+        result["misc_charges_candidates"] = candidates
     
     return result
@@ -0,0 +1,190 @@
+"""
+Metrics Service - Prometheus metrics for requests, the DB pool, queries and OCR
+
+Exposed at GET /metrics (main.py) when METRICS_ENABLED:
+
+- http_request_duration_seconds{method, route, status}  per route template, not raw path
+- http_requests_in_flight{method}
+- db_pool_checkout_seconds                               get_connection(): wait for a pooled connection + tenant
+                                                         setup (a fresh connect when no pool was opened)
+- db_pool_connections{state}                             in_use / idle / max of the pool
+- db_query_duration_seconds{query}                       per query name (db_connection.InstrumentedCursor)
+- ocr_duration_seconds{backend, outcome}                 per engine call: pymupdf, tesseract, document_ai
+- ocr_backend_duration_seconds{backend, outcome}         per routed attempt (services/ocr_backends.py);
+                                                         outcome ok / empty (fell through) / error
+- parse_pool_tasks                                       in flight in services/parse_pool.py
+- parse_pool_rejected_total, parse_pool_restarts_total{reason}
+
+Recording a sample is a lock and a few float adds, cheap enough to leave
+on in production. With several uvicorn workers set PROMETHEUS_MULTIPROC_DIR
+so /metrics aggregates all of them.
+"""
+
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+)
+
+# Route label for requests no route matched (404s, static files) - keeps label cardinality bounded
+UNMATCHED_ROUTE = "unmatched"
+
+_FAST_BUCKETS = (.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+_OCR_BUCKETS = (.1, .25, .5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency",
+    ["method", "route", "status"], buckets=_FAST_BUCKETS
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests being handled",
+    ["method"], multiprocess_mode="livesum"
+)
+DB_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds", "Time to get a database connection",
+    buckets=_FAST_BUCKETS
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections", "Database pool connections",
+    ["state"], multiprocess_mode="livesum"
+)
+DB_QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds", "Statement execution time by query name",
+    ["query"], buckets=_FAST_BUCKETS
+)
+DB_QUERY_ERRORS = Counter(
+    "db_query_errors_total", "Statements that raised",
+    ["query"]
+)
+OCR_SECONDS = Histogram(
+    "ocr_duration_seconds", "OCR / text extraction time per document",
+    ["backend", "outcome"], buckets=_OCR_BUCKETS
+)
+OCR_BACKEND_SECONDS = Histogram(
+    "ocr_backend_duration_seconds", "Text extraction time per backend attempt, incl. parse pool wait",
+    ["backend", "outcome"], buckets=_OCR_BUCKETS
+)
+PARSE_POOL_TASKS = Gauge(
+    "parse_pool_tasks", "Document parse tasks submitted to the process pool and not finished",
+    multiprocess_mode="livesum"
+)
+PARSE_POOL_REJECTED = Counter(
+    "parse_pool_rejected_total", "Parse tasks turned away because the pool queue was full"
+)
+PARSE_POOL_RESTARTS = Counter(
+    "parse_pool_restarts_total", "Parse pool restarts",
+    ["reason"]
+)
+
+
+def observe_query(name: str, seconds: float, failed: bool = False):
+    DB_QUERY_SECONDS.labels(name).observe(seconds)
+    if failed:
+        DB_QUERY_ERRORS.labels(name).inc()
+
+
+def observe_checkout(seconds: float):
+    DB_CHECKOUT_SECONDS.observe(seconds)
+
+
+# Set in parse pool worker processes: OCR samples are handed back to the
+# parent (services/parse_pool.py) instead of going to the child's registry
+_ocr_buffer = None
+
+
+def buffer_ocr_observations():
+    global _ocr_buffer
+    _ocr_buffer = []
+
+
+def drain_ocr_observations() -> list:
+    """OCR samples buffered since the last call, as (backend, seconds, failed)."""
+    global _ocr_buffer
+    if not _ocr_buffer:
+        return []
+    drained, _ocr_buffer = _ocr_buffer, []
+    return drained
+
+
+def observe_ocr(backend: str, seconds: float, failed: bool = False):
+    if _ocr_buffer is not None:
+        _ocr_buffer.append((backend, seconds, failed))
+        return
+    OCR_SECONDS.labels(backend, "error" if failed else "ok").observe(seconds)
+
+
+def observe_ocr_backend(backend: str, seconds: float, outcome: str):
+    OCR_BACKEND_SECONDS.labels(backend, outcome).observe(seconds)
+
+
+def set_pool_stats(in_use: int, idle: int, max_connections: int):
+    DB_POOL_CONNECTIONS.labels("in_use").set(in_use)
+    DB_POOL_CONNECTIONS.labels("idle").set(idle)
+    DB_POOL_CONNECTIONS.labels("max").set(max_connections)
+
+
+class ocr_timer:
+    """Times one OCR call: `with metrics.ocr_timer("document_ai"): ...` (outcome=error if it raises)."""
+
+    def __init__(self, backend: str):
+        self.backend = backend
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe_ocr(self.backend, time.perf_counter() - self.started, failed=exc_type is not None)
+        return False
+
+
+def render() -> tuple:
+    """(body, content type) for the /metrics endpoint."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+# ============================================================
+# ASGI MIDDLEWARE
+# ============================================================
+
+def route_template(scope) -> str:
+    """Path template of the route that handled the request, e.g. /api/new-jobs/{job_id}."""
+    # The router stores the matched route in the scope; newer FastAPI versions keep
+    # the include_router prefix only on the effective route context
+    route = scope.get("fastapi", {}).get("effective_route_context") or scope.get("route")
+    return getattr(route, "path_format", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Per-route latency and in-flight requests. Pure ASGI (no extra task per request)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        in_flight = REQUESTS_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            REQUEST_LATENCY.labels(method, route_template(scope), str(status[0])).observe(time.perf_counter() - started)
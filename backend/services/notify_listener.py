@@ -0,0 +1,112 @@
+"""
+Notify Listener Service - One background LISTEN connection per process
+
+Services subscribe a callback to a Postgres NOTIFY channel:
+
+    notify_listener.subscribe("session_revocations", on_revoked)
+
+The callback receives the notification payload (str). After the listener
+(re)connects it is called once with None, meaning "notifications may have
+been missed - resync from the table".
+
+Callbacks run on the listener thread and must be quick.
+"""
+
+import select
+import threading
+import time
+
+import psycopg2
+
+from config import DB_CONFIG
+
+# Seconds between reconnect attempts
+RECONNECT_DELAY = 5
+
+_subscribers = {}  # channel -> [callback]
+_lock = threading.Lock()
+_thread = None
+_conn = None
+
+
+def _quote_channel(channel: str) -> str:
+    if not channel.replace("_", "").isalnum():
+        raise ValueError(f"Invalid NOTIFY channel '{channel}'")
+    return f'"{channel}"'
+
+
+def _call(callback, payload):
+    try:
+        callback(payload)
+    except Exception as e:
+        print(f"❌ NOTIFY callback {getattr(callback, '__name__', callback)} failed: {e}")
+
+
+def _connect():
+    global _conn
+    conn = psycopg2.connect(**DB_CONFIG)
+    conn.autocommit = True
+    # Publish the connection before reading the channel list, so a concurrent
+    # subscribe() either shows up in the list or LISTENs on the connection itself
+    _conn = conn
+    with _lock:
+        channels = list(_subscribers)
+    cursor = conn.cursor()
+    for channel in channels:
+        cursor.execute(f"LISTEN {_quote_channel(channel)}")
+
+
+def _run():
+    global _conn
+    while True:
+        try:
+            _connect()
+            with _lock:
+                callbacks = [cb for cbs in _subscribers.values() for cb in cbs]
+            for callback in callbacks:
+                _call(callback, None)
+
+            while True:
+                if select.select([_conn], [], [], 60) == ([], [], []):
+                    continue
+                _conn.poll()
+                while _conn.notifies:
+                    notify = _conn.notifies.pop(0)
+                    with _lock:
+                        callbacks = list(_subscribers.get(notify.channel, []))
+                    for callback in callbacks:
+                        _call(callback, notify.payload)
+        except Exception as e:
+            print(f"⚠️ NOTIFY listener disconnected: {e}")
+            try:
+                if _conn:
+                    _conn.close()
+            except Exception:
+                pass
+            _conn = None
+            time.sleep(RECONNECT_DELAY)
+
+
+def subscribe(channel: str, callback):
+    """Call callback(payload) for every NOTIFY on channel (and callback(None) on (re)connect)."""
+    global _thread
+    _quote_channel(channel)
+    with _lock:
+        _subscribers.setdefault(channel, []).append(callback)
+        start = _thread is None
+        if start:
+            _thread = threading.Thread(target=_run, name="notify-listener", daemon=True)
+            _thread.start()
+    conn = _conn
+    if not start and conn is not None:
+        # Already connected: start listening on the new channel right away
+        # (psycopg2 connections may be shared between threads)
+        try:
+            conn.cursor().execute(f"LISTEN {_quote_channel(channel)}")
+        except Exception as e:
+            print(f"⚠️ LISTEN {channel} failed (will retry on reconnect): {e}")
+
+
+def notify(cursor, channel: str, payload: str = ""):
+    """Queue a NOTIFY in the caller's transaction (delivered on commit)."""
+    cursor.execute("SELECT pg_notify(%s, %s)", (channel, payload))
@@ -0,0 +1,198 @@
+"""
+OCR Backends - Pluggable text extraction with a cheapest-first routing policy
+
+    text, backend = ocr_backends.extract_text(file_path)
+
+extract_text() tries the backends named in OCR_BACKENDS, in that order, and
+returns the first text with at least OCR_MIN_TEXT_CHARS non-blank characters.
+Backends that don't take the file type, aren't available, fail or come back
+(nearly) empty are passed over; if none reaches the minimum, the longest text
+found is returned. Default order:
+
+- embedded:    a PDF's own text layer (PyMuPDF) - no OCR, milliseconds
+- tesseract:   local OCR with the tesseract CLI; images, and scanned PDFs
+               rendered page by page at TESSERACT_DPI (first TESSERACT_MAX_PAGES).
+               Works without network
+- document_ai: Google Cloud Document AI
+
+embedded and document_ai are registered by services/document_ai.py; other
+engines subclass OcrBackend and register() themselves the same way. Local
+engines run in the parse pool (services/parse_pool.py). A task that times
+out or crashes its worker counts as a failed attempt and the next backend
+is tried; ParsePoolBusy is raised, since every local backend would hit it.
+
+Every attempt is timed in ocr_backend_duration_seconds{backend, outcome}.
+"""
+
+import os
+import shutil
+import subprocess
+import time
+from abc import ABC, abstractmethod
+
+from config import (
+    OCR_BACKENDS, OCR_MIN_TEXT_CHARS, PDF_SCAN_MAX_PAGES, PARSE_POOL_TASK_TIMEOUT,
+    TESSERACT_CMD, TESSERACT_LANG, TESSERACT_DPI, TESSERACT_TIMEOUT, TESSERACT_MAX_PAGES
+)
+from services import metrics, parse_pool, tracing
+
+EMBEDDED = "embedded"
+TESSERACT = "tesseract"
+DOCUMENT_AI = "document_ai"
+
+IMAGE_EXTENSIONS = frozenset({".jpg", ".jpeg", ".png", ".tiff", ".tif"})
+
+
+class OcrBackend(ABC):
+    """One way to get a document's text. Subclasses set name and extensions and implement extract()."""
+
+    name = None
+    extensions = frozenset()  # lower-case, with the dot
+
+    def available(self) -> bool:
+        """Whether the engine is installed / configured; checked before every attempt, so keep it cheap."""
+        return True
+
+    @abstractmethod
+    def extract(self, file_path: str, ext: str, max_pages: int = None) -> str:
+        """The document's text ("" if none); raising counts as a failed attempt."""
+
+
+_backends = {}
+
+
+def register(backend: OcrBackend):
+    """Make a backend routable under its name (listing it in OCR_BACKENDS enables it)."""
+    _backends[backend.name] = backend
+
+
+def route(ext: str) -> list:
+    """Names of the backends extract_text() would try for a file type, in order."""
+    return [name for name in OCR_BACKENDS if name in _backends and ext in _backends[name].extensions]
+
+
+class attempt:
+    """
+    Times one backend attempt:
+    `with ocr_backends.attempt("tesseract") as a: a.chars = len(text.strip())`
+    (outcome=error if it raises, empty below OCR_MIN_TEXT_CHARS, else ok).
+    """
+
+    def __init__(self, backend: str):
+        self.backend = backend
+        self.chars = 0
+
+    @property
+    def found(self) -> bool:
+        return self.chars >= OCR_MIN_TEXT_CHARS
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        outcome = "error" if exc_type is not None else "ok" if self.found else "empty"
+        metrics.observe_ocr_backend(self.backend, time.perf_counter() - self.started, outcome)
+        return False
+
+
+def extract_text(file_path: str, max_pages: int = None, skip: tuple = ()) -> tuple:
+    """
+    A document's text from the first backend that finds some, as
+    (text, backend name); ("", None) when no backend applies.
+    `skip` names backends the caller has already tried.
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    best, best_chars, best_name = "", -1, None
+    for name in route(ext):
+        backend = _backends[name]
+        if name in skip or not backend.available():
+            continue
+        try:
+            with attempt(name) as timed, tracing.span("ocr.backend", backend=name):
+                text = backend.extract(file_path, ext, max_pages) or ""
+                timed.chars = len(text.strip())
+        except parse_pool.ParsePoolBusy:
+            raise
+        except Exception as e:  # includes ParseTimeout / ParseWorkerCrashed
+            print(f"⚠️ OCR backend {name} failed (trying the next): {e}")
+            continue
+        if timed.found:
+            return text, name
+        if timed.chars > best_chars:
+            best, best_chars, best_name = text, timed.chars, name
+    return best, best_name
+
+
+# ============================================================
+# TESSERACT (local OCR)
+# ============================================================
+
+# Parse pool limit per tesseract task. tesseract's own timeout fires first
+# and kills the child process; the rest is for rendering and queueing
+TESSERACT_TASK_TIMEOUT = TESSERACT_TIMEOUT + PARSE_POOL_TASK_TIMEOUT
+
+def _tesseract(source: str, image: bytes = None) -> str:
+    """Run the tesseract CLI on an image file, or on `image` bytes with source="stdin"."""
+    with metrics.ocr_timer(TESSERACT):
+        completed = subprocess.run(
+            [TESSERACT_CMD, source, "stdout", "-l", TESSERACT_LANG],
+            input=image, capture_output=True, timeout=TESSERACT_TIMEOUT, check=True
+        )
+    return completed.stdout.decode("utf-8", errors="replace")
+
+
+def tesseract_image(file_path: str) -> str:
+    """Parse pool task: OCR an image file."""
+    return _tesseract(file_path)
+
+
+def pdf_page_count(file_path: str) -> int:
+    """Parse pool task: how many pages a PDF has."""
+    import fitz  # PyMuPDF
+
+    with fitz.open(file_path, filetype="pdf") as doc:
+        return doc.page_count
+
+
+def tesseract_page(file_path: str, number: int) -> str:
+    """Parse pool task: OCR one PDF page, rendered to PNG at TESSERACT_DPI."""
+    import fitz  # PyMuPDF
+
+    with fitz.open(file_path, filetype="pdf") as doc:
+        image = doc.load_page(number).get_pixmap(dpi=TESSERACT_DPI).tobytes("png")
+    return _tesseract("stdin", image)
+
+
+class TesseractBackend(OcrBackend):
+    """Local OCR via the tesseract executable, run in the parse pool."""
+
+    name = TESSERACT
+    extensions = IMAGE_EXTENSIONS | {".pdf"}
+
+    def __init__(self):
+        self._installed = None
+
+    def available(self) -> bool:
+        if self._installed is None:
+            self._installed = shutil.which(TESSERACT_CMD) is not None
+        return self._installed
+
+    def extract(self, file_path: str, ext: str, max_pages: int = None) -> str:
+        """An image in one task; a PDF one page per task (at most max_pages and TESSERACT_MAX_PAGES)."""
+        if ext != ".pdf":
+            return parse_pool.run(tesseract_image, file_path, timeout=TESSERACT_TASK_TIMEOUT)
+
+        if max_pages is None:
+            max_pages = PDF_SCAN_MAX_PAGES
+        pages = parse_pool.run(pdf_page_count, file_path)
+        for limit in (max_pages, TESSERACT_MAX_PAGES):
+            if limit:
+                pages = min(pages, limit)
+        return "".join(
+            parse_pool.run(tesseract_page, file_path, number, timeout=TESSERACT_TASK_TIMEOUT)
+            for number in range(pages)
+        )
+
+
+register(TesseractBackend())
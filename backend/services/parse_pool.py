@@ -0,0 +1,199 @@
+"""
+Parse Pool Service - Worker processes for CPU-bound local document parsing
+
+    from services import parse_pool
+    text = parse_pool.run(some_module_level_function, file_path)
+
+PyMuPDF text extraction and regex scanning hold the GIL. Inline they block a
+request thread, and threads still serialize on the GIL. Here they run in a
+ProcessPoolExecutor instead, so concurrent uploads use every core:
+
+- warm workers: PARSE_POOL_WORKERS processes are started by start() (app
+  startup), forked from a forkserver that has already imported PyMuPDF and
+  services.document_ai. Each is replaced after PARSE_POOL_MAX_TASKS_PER_CHILD
+  tasks.
+- bounded queue: at most workers + PARSE_POOL_MAX_QUEUE tasks in flight;
+  beyond that run() raises ParsePoolBusy at once instead of queueing.
+- per-task timeout: PARSE_POOL_TASK_TIMEOUT seconds, queueing included. A task
+  still waiting is cancelled. A task still running means a stuck worker, and
+  the pool is restarted to kill it.
+- crash recovery: a worker that dies (e.g. MuPDF crashing on a malformed
+  file) breaks the pool. The pool is replaced and each affected task is
+  retried once on the new pool. A task that breaks it again fails with
+  ParseWorkerCrashed.
+
+Task functions and their arguments are pickled, so tasks must be
+module-level functions. OCR metrics recorded in a worker are handed back
+with the result and recorded in the calling process.
+
+With PARSE_POOL_WORKERS=0 (and inside a worker) run() calls the function
+inline.
+"""
+
+import multiprocessing
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from config import (
+    PARSE_POOL_WORKERS, PARSE_POOL_MAX_QUEUE, PARSE_POOL_TASK_TIMEOUT, PARSE_POOL_MAX_TASKS_PER_CHILD
+)
+from services import metrics, tracing
+
+# Imported once in the forkserver, inherited by every worker
+PRELOAD_MODULES = ["fitz", "services.document_ai"]
+
+
+class ParsePoolError(Exception):
+    """A parse task could not be run to completion."""
+
+
+class ParsePoolBusy(ParsePoolError):
+    """Too many parse tasks in flight; try again later."""
+
+
+class ParseTimeout(ParsePoolError):
+    """A parse task exceeded its timeout."""
+
+
+class ParseWorkerCrashed(ParsePoolError):
+    """The worker process died while running the task."""
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(max(PARSE_POOL_WORKERS, 1) + PARSE_POOL_MAX_QUEUE)
+_in_worker = False
+_restarts = 0
+
+
+# ============================================================
+# WORKER SIDE
+# ============================================================
+
+def _init_worker():
+    global _in_worker
+    _in_worker = True
+    metrics.buffer_ocr_observations()
+
+
+def _ping():
+    return True
+
+
+def _call(func, args: tuple) -> tuple:
+    """Run one task in the worker; returns (result, buffered OCR samples)."""
+    metrics.drain_ocr_observations()
+    return func(*args), metrics.drain_ocr_observations()
+
+
+# ============================================================
+# POOL MANAGEMENT
+# ============================================================
+
+def _context():
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(PRELOAD_MODULES)
+        return context
+    # Windows has no forkserver; spawned workers import the modules on their first task
+    return multiprocessing.get_context("spawn")
+
+
+def _new_pool() -> ProcessPoolExecutor:
+    kwargs = {}
+    if PARSE_POOL_MAX_TASKS_PER_CHILD and sys.version_info >= (3, 11):
+        kwargs["max_tasks_per_child"] = PARSE_POOL_MAX_TASKS_PER_CHILD
+    pool = ProcessPoolExecutor(
+        max_workers=PARSE_POOL_WORKERS, mp_context=_context(), initializer=_init_worker, **kwargs
+    )
+    # Workers start on demand; one no-op per worker brings them all up now
+    for _ in range(PARSE_POOL_WORKERS):
+        pool.submit(_ping)
+    return pool
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = _new_pool()
+        return _pool
+
+
+def _restart(broken: ProcessPoolExecutor, reason: str):
+    """Replace `broken` (unless another thread already did) and kill its workers."""
+    global _pool, _restarts
+    with _pool_lock:
+        if _pool is not broken:
+            return
+        _pool = _new_pool()
+        _restarts += 1
+    metrics.PARSE_POOL_RESTARTS.labels(reason).inc()
+    print(f"⚠️ Parse pool restarted ({reason})")
+
+    # Stuck workers don't exit on shutdown(); their tasks fail with BrokenProcessPool
+    for process in list((getattr(broken, "_processes", None) or {}).values()):
+        process.terminate()
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def start():
+    """Start the warm workers now rather than on the first upload."""
+    if PARSE_POOL_WORKERS > 0:
+        _get_pool()
+
+
+def shutdown():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def stats() -> dict:
+    in_flight = max(PARSE_POOL_WORKERS, 1) + PARSE_POOL_MAX_QUEUE - _slots._value
+    return {"workers": PARSE_POOL_WORKERS, "in_flight": in_flight, "restarts": _restarts}
+
+
+# ============================================================
+# RUNNING TASKS
+# ============================================================
+
+def run(func, *args, timeout: float = None):
+    """Run func(*args) in a pool worker and return its result; raises ParsePoolError subclasses."""
+    if PARSE_POOL_WORKERS <= 0 or _in_worker:
+        return func(*args)
+
+    timeout = timeout or PARSE_POOL_TASK_TIMEOUT
+    name = func.__name__
+    if not _slots.acquire(blocking=False):
+        metrics.PARSE_POOL_REJECTED.inc()
+        raise ParsePoolBusy(f"Document parsing is busy ({stats()['in_flight']} tasks in flight)")
+
+    metrics.PARSE_POOL_TASKS.inc()
+    try:
+        with tracing.span("parse_pool.run", task=name):
+            for attempt in (1, 2):
+                pool = _get_pool()
+                try:
+                    future = pool.submit(_call, func, args)
+                    result, observations = future.result(timeout=timeout)
+                except FutureTimeout:
+                    if not future.cancel():
+                        _restart(pool, "timeout")
+                    raise ParseTimeout(f"{name} took longer than {timeout:g}s")
+                except BrokenProcessPool:
+                    _restart(pool, "crash")
+                    if attempt == 2:
+                        raise ParseWorkerCrashed(f"Worker process died while running {name}")
+                    continue
+
+                for backend, seconds, failed in observations:
+                    metrics.observe_ocr(backend, seconds, failed)
+                return result
+    finally:
+        metrics.PARSE_POOL_TASKS.dec()
+        _slots.release()
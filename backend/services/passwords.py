@@ -0,0 +1,99 @@
+"""
+Password Service - Salted, memory-hard password hashing
+
+Stored format:  scrypt$<log2 N>$<r>$<p>$<salt b64>$<hash b64>
+
+Accounts created before this service have unsalted SHA-256 hex digests.
+verify_password() still accepts those and reports needs_rehash=True, so
+the login route rewrites them as scrypt on the next successful login.
+
+Hashing is deliberately slow (~50-100 ms, 32 MB). The *_async helpers run
+it on a small dedicated pool so a burst of logins can't tie up the
+request threads or the event loop.
+"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from config import PASSWORD_HASH_WORKERS, PASSWORD_SCRYPT_LOG_N
+
+SCHEME = "scrypt"
+SCRYPT_R = 8
+SCRYPT_P = 1
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+LEGACY_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+
+_hash_pool = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+
+
+def _scrypt(password: str, salt: bytes, log_n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode(), salt=salt, n=2 ** log_n, r=r, p=p,
+        maxmem=256 * (2 ** log_n) * r * p, dklen=KEY_BYTES
+    )
+
+
+def hash_password(password: str) -> str:
+    """Hash a password for storage."""
+    salt = os.urandom(SALT_BYTES)
+    key = _scrypt(password, salt, PASSWORD_SCRYPT_LOG_N, SCRYPT_R, SCRYPT_P)
+    return "$".join([
+        SCHEME, str(PASSWORD_SCRYPT_LOG_N), str(SCRYPT_R), str(SCRYPT_P),
+        base64.b64encode(salt).decode(), base64.b64encode(key).decode()
+    ])
+
+
+def verify_password(password: str, stored: str) -> tuple:
+    """Check a password against a stored hash. Returns (matches, needs_rehash)."""
+    if not stored:
+        return False, False
+
+    if LEGACY_SHA256.match(stored):
+        candidate = hashlib.sha256(password.encode()).hexdigest()
+        matches = hmac.compare_digest(candidate, stored)
+        return matches, matches
+
+    try:
+        scheme, log_n, r, p, salt, key = stored.split("$")
+        if scheme != SCHEME:
+            return False, False
+        log_n, r, p = int(log_n), int(r), int(p)
+        expected = base64.b64decode(key)
+        candidate = _scrypt(password, base64.b64decode(salt), log_n, r, p)
+    except (ValueError, TypeError):
+        return False, False
+
+    matches = hmac.compare_digest(candidate, expected)
+    outdated = (log_n, r, p) != (PASSWORD_SCRYPT_LOG_N, SCRYPT_R, SCRYPT_P)
+    return matches, matches and outdated
+
+
+# A hash of a random password; checked when the email is unknown so that
+# response time doesn't reveal which emails have accounts
+_DUMMY_HASH = None
+
+
+def verify_dummy(password: str):
+    global _DUMMY_HASH
+    if _DUMMY_HASH is None:
+        _DUMMY_HASH = hash_password(base64.b64encode(os.urandom(12)).decode())
+    verify_password(password, _DUMMY_HASH)
+
+
+async def hash_password_async(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_hash_pool, hash_password, password)
+
+
+async def verify_password_async(password: str, stored: str) -> tuple:
+    return await asyncio.get_running_loop().run_in_executor(_hash_pool, verify_password, password, stored)
+
+
+async def verify_dummy_async(password: str):
+    await asyncio.get_running_loop().run_in_executor(_hash_pool, verify_dummy, password)
@@ -0,0 +1,277 @@
+"""
+Profiler Service - On-demand stack-sampling profiler (py-spy style, in process)
+
+A background thread snapshots every thread's Python stack with
+sys._current_frames() every few milliseconds. Nothing is instrumented
+and nothing runs between snapshots, so the overhead is bounded by the
+sampling interval and only paid while a profile is being taken.
+
+Two ways to use it (both for operators only, session_tokens.is_operator -
+a worker serves every tenant, and its stacks show their requests):
+- GET /api/admin/profile?seconds=10    whole worker for N seconds (routes/admin.py)
+- any request with ?profile=1          ProfileMiddleware profiles that request and
+                                       returns the profile instead of its body. Only
+                                       stacks working for that request are kept: its
+                                       coroutines on the event loop and the sync code
+                                       it hands to the threadpool, not other requests
+                                       running in the same worker meanwhile
+
+Output is a speedscope file (https://www.speedscope.app, one profile per
+thread) or folded stacks for flamegraph.pl (format=folded). Threads that
+are just waiting (idle pool workers, the event loop's select) are left
+out. One profile runs at a time per worker.
+"""
+
+import asyncio
+import contextvars
+import os
+import sys
+import threading
+import time
+from urllib.parse import parse_qs
+
+from config import PROFILE_MAX_SECONDS
+from serialization import dumps
+from services.session_tokens import is_operator, session_from_authorization
+
+DEFAULT_INTERVAL = 0.005
+MAX_STACK_DEPTH = 200
+
+# (file basename, function) of leaf frames that mean "blocked, not working"
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("base_events.py", "_run_once"),
+}
+
+_active = threading.Lock()
+
+# Set by ProfileMiddleware for the profiled request (see _runs_request)
+_profiled_request = contextvars.ContextVar("profiled_request", default=None)
+
+# asyncio runs every callback and task step through Handle._run, under the task's context
+_HANDLE_RUN = asyncio.Handle._run.__code__
+
+
+class ProfilerBusy(Exception):
+    """Another profile is already running in this worker."""
+
+
+def _runs_request(frame, request) -> bool:
+    """
+    Whether a thread's stack is working for the profiled request: the
+    middleware's own frame is on it (the request's coroutines on the event
+    loop), or it runs under a copy of the request's context - a task it
+    spawned (asyncio Handle._run) or sync code in the threadpool (anyio's
+    worker calls context.run(func)).
+    """
+    while frame is not None:
+        if frame is request:
+            return True
+        code = frame.f_code
+        if code is _HANDLE_RUN:
+            context = getattr(frame.f_locals.get("self"), "_context", None)
+        elif code.co_name == "run" and "context" in code.co_varnames:
+            context = frame.f_locals.get("context")
+        else:
+            context = None
+        if isinstance(context, contextvars.Context) and context.get(_profiled_request) is request:
+            return True
+        frame = frame.f_back
+    return False
+
+
+class StackSampler:
+    """
+    Samples all other threads' stacks (except `ignore` idents) until stop();
+    with `request`, only stacks working for that request (ProfileMiddleware).
+    """
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, ignore: tuple = (), request=None):
+        self.interval = interval
+        self.ignore = set(ignore)
+        self.request = request
+        self._frame_index = {}   # (name, file, line) -> index into _frames
+        self._frames = []
+        self._samples = {}       # thread ident -> [(stack, weight)]
+        self._stop = threading.Event()
+        self._thread = None
+        self.duration = 0.0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        self.ignore.add(threading.get_ident())
+        started = last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            weight, last = now - last, now
+            for ident, frame in sys._current_frames().items():
+                if ident in self.ignore:
+                    continue
+                if self.request is not None and not _runs_request(frame, self.request):
+                    continue
+                stack = self._stack(frame)
+                if stack:
+                    self._samples.setdefault(ident, []).append((stack, weight))
+        self.duration = time.perf_counter() - started
+
+    def _stack(self, frame) -> list:
+        """Frame indexes root first; empty when the thread is idle."""
+        code = frame.f_code
+        if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+            return []
+        stack = []
+        while frame is not None and len(stack) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            key = (code.co_name, code.co_filename, frame.f_lineno)
+            index = self._frame_index.get(key)
+            if index is None:
+                index = self._frame_index[key] = len(self._frames)
+                self._frames.append(key)
+            stack.append(index)
+            frame = frame.f_back
+        stack.reverse()
+        return stack
+
+    def _thread_names(self) -> dict:
+        return {t.ident: t.name for t in threading.enumerate()}
+
+    def speedscope(self, name: str) -> dict:
+        names = self._thread_names()
+        profiles = []
+        for ident, samples in sorted(self._samples.items(), key=lambda item: -len(item[1])):
+            profiles.append({
+                "type": "sampled",
+                "name": names.get(ident, f"thread-{ident}"),
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": round(sum(weight for _, weight in samples), 6),
+                "samples": [stack for stack, _ in samples],
+                "weights": [round(weight, 6) for _, weight in samples],
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "4s-logistics-profiler",
+            "activeProfileIndex": 0,
+            "shared": {"frames": [{"name": n, "file": f, "line": l} for n, f, l in self._frames]},
+            "profiles": profiles,
+        }
+
+    def folded(self) -> str:
+        """One 'thread;root;...;leaf count' line per distinct stack."""
+        names = self._thread_names()
+        counts = {}
+        for ident, samples in self._samples.items():
+            thread = names.get(ident, f"thread-{ident}")
+            for stack, _ in samples:
+                key = ";".join([thread] + [f"{self._frames[i][0]} ({os.path.basename(self._frames[i][1])}:{self._frames[i][2]})" for i in stack])
+                counts[key] = counts.get(key, 0) + 1
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(counts.items()))
+
+
+def render(sampler: StackSampler, name: str, fmt: str = "speedscope") -> tuple:
+    """(body bytes, media type, file name) for a finished sampler."""
+    if fmt == "folded":
+        return sampler.folded().encode(), "text/plain", "profile.folded.txt"
+    return dumps(sampler.speedscope(name)), "application/json", "profile.speedscope.json"
+
+
+def profile_for(seconds: float, interval: float = DEFAULT_INTERVAL) -> StackSampler:
+    """Sample the whole worker for `seconds` (blocks the caller). Raises ProfilerBusy."""
+    if not _active.acquire(blocking=False):
+        raise ProfilerBusy("A profile is already running in this worker")
+    try:
+        # The calling thread only sleeps; leave it out
+        sampler = StackSampler(interval, ignore=(threading.get_ident(),))
+        sampler.start()
+        time.sleep(min(seconds, PROFILE_MAX_SECONDS))
+        sampler.stop()
+        return sampler
+    finally:
+        _active.release()
+
+
+# ============================================================
+# PER-REQUEST PROFILING (?profile=1)
+# ============================================================
+
+def _is_operator(scope) -> bool:
+    headers = dict(scope.get("headers") or [])
+    authorization = headers.get(b"authorization")
+    if not authorization:
+        return False
+    try:
+        session = session_from_authorization(authorization.decode("latin-1"))
+    except Exception:
+        return False
+    return is_operator(session)
+
+
+class ProfileMiddleware:
+    """
+    Operator requests with ?profile=1 get a profile of themselves back
+    instead of the response body (original status in X-Profiled-Status).
+    For anyone else the parameter is ignored.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or b"profile=" not in scope.get("query_string", b""):
+            await self.app(scope, receive, send)
+            return
+        query = parse_qs(scope["query_string"].decode("latin-1"))
+        if query.get("profile") != ["1"] or not _is_operator(scope):
+            await self.app(scope, receive, send)
+            return
+        if not _active.acquire(blocking=False):
+            await _send(send, 409, b'{"detail":"A profile is already running in this worker"}', "application/json")
+            return
+
+        status = [None]
+
+        async def discard(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+
+        # This coroutine's frame is on the event loop's stack whenever the request runs there
+        request = sys._getframe()
+        token = _profiled_request.set(request)
+        sampler = StackSampler(request=request)
+        try:
+            sampler.start()
+            try:
+                await self.app(scope, receive, discard)
+            finally:
+                sampler.stop()
+        finally:
+            _profiled_request.reset(token)
+            _active.release()
+
+        fmt = query.get("profile_format", ["speedscope"])[0]
+        body, media_type, filename = render(sampler, f"{scope['method']} {scope['path']}", fmt)
+        await _send(send, 200, body, media_type, [
+            (b"content-disposition", f'attachment; filename="{filename}"'.encode()),
+            (b"x-profiled-status", str(status[0]).encode()),
+        ])
+
+
+async def _send(send, status: int, body: bytes, media_type: str, headers: list = None):
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", media_type.encode()), (b"content-length", str(len(body)).encode())] + (headers or []),
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,169 @@
+"""
+Rate Limiter Service - Sliding-window request throttling
+
+Counts use the sliding-window-counter approximation: one counter for the
+current fixed window and one for the previous, weighted by how much of
+the previous window still overlaps the sliding window. Two integers per
+key, so millions of keys stay cheap.
+
+Backends:
+- MemoryBackend (default): per process, bounded OrderedDict with LRU eviction
+- RedisBackend: shared by every worker; selected with RATE_LIMIT_BACKEND=redis://...
+  (requires the `redis` package)
+
+Only allowed hits are counted, so a client that keeps hammering while
+throttled is let back in as soon as its earlier attempts age out.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import HTTPException, Request
+
+from config import RATE_LIMIT_BACKEND, RATE_LIMIT_MAX_KEYS, TRUST_FORWARDED_FOR
+
+
+def _estimate(previous: int, current: int, window: int, now: float) -> tuple:
+    """(weighted count in the sliding window, seconds elapsed in the current window)"""
+    elapsed = now % window
+    return previous * (1 - elapsed / window) + current, elapsed
+
+
+def _retry_after(previous: int, current: int, limit: int, window: int, now: float) -> int:
+    """Seconds until one more hit would be allowed."""
+    estimated, elapsed = _estimate(previous, current, window, now)
+    excess = estimated + 1 - limit
+    remaining = window - elapsed
+    if previous and current < limit:
+        # The previous window's share decays linearly over the current window
+        decay = excess * window / previous
+        if decay <= remaining:
+            return max(1, math.ceil(decay))
+    return max(1, math.ceil(remaining))
+
+
+class MemoryBackend:
+    """Per-process counters: key -> [window_id, current_count, previous_count]."""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._counters = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, limit: int, window: int) -> int:
+        """Count a hit if allowed. Returns 0 if allowed, else seconds to wait."""
+        now = time.time()
+        window_id = int(now // window)
+        with self._lock:
+            entry = self._counters.get(key)
+            if entry is None:
+                entry = [window_id, 0, 0]
+                self._counters[key] = entry
+                if len(self._counters) > self.max_keys:
+                    self._counters.popitem(last=False)
+            else:
+                self._counters.move_to_end(key)
+                if entry[0] != window_id:
+                    entry[2] = entry[1] if entry[0] == window_id - 1 else 0
+                    entry[1] = 0
+                    entry[0] = window_id
+
+            estimated, _ = _estimate(entry[2], entry[1], window, now)
+            if estimated + 1 > limit:
+                return _retry_after(entry[2], entry[1], limit, window, now)
+            entry[1] += 1
+            return 0
+
+
+class RedisBackend:
+    """
+    Counters in Redis (one key per fixed window), shared by all workers.
+    A hit is counted first (INCR + EXPIRE + GET of the previous window in
+    one Lua script, so atomic across workers) and then compared with the
+    limit; a rejected hit is taken back with DECR. Concurrent attempts
+    therefore each see a distinct count and can't all slip through.
+    """
+
+    _HIT_SCRIPT = """
+        local current = redis.call('INCR', KEYS[2])
+        if current == 1 then
+            redis.call('EXPIRE', KEYS[2], ARGV[1])
+        end
+        return {tonumber(redis.call('GET', KEYS[1]) or '0'), current}
+    """
+
+    def __init__(self, url: str):
+        import redis
+        self._redis = redis.Redis.from_url(url)
+        self._hit = self._redis.register_script(self._HIT_SCRIPT)
+
+    def hit(self, key: str, limit: int, window: int) -> int:
+        now = time.time()
+        window_id = int(now // window)
+        current_key = f"ratelimit:{key}:{window_id}"
+        previous, current = self._hit(keys=[f"ratelimit:{key}:{window_id - 1}", current_key], args=[window * 2])
+
+        # `current` includes this hit
+        estimated, _ = _estimate(previous, current, window, now)
+        if estimated > limit:
+            self._redis.decr(current_key)
+            return _retry_after(previous, current - 1, limit, window, now)
+        return 0
+
+
+def _create_backend():
+    if RATE_LIMIT_BACKEND.startswith(("redis://", "rediss://")):
+        try:
+            return RedisBackend(RATE_LIMIT_BACKEND)
+        except ImportError:
+            print("⚠️ RATE_LIMIT_BACKEND is Redis but the redis package is not installed - using in-memory limits")
+    return MemoryBackend()
+
+
+_backend = _create_backend()
+
+
+class RateLimiter:
+    """`limit` hits per `window` seconds per key, within one named scope."""
+
+    def __init__(self, scope: str, limit: int, window: int, backend=None):
+        self.scope = scope
+        self.limit = limit
+        self.window = window
+        self.backend = backend or _backend
+
+    def hit(self, key: str) -> int:
+        """0 if allowed (and counted), else seconds until the next allowed hit."""
+        try:
+            return self.backend.hit(f"{self.scope}:{key}", self.limit, self.window)
+        except Exception as e:
+            # A broken shared backend must not lock everyone out
+            print(f"⚠️ Rate limiter backend error ({self.scope}): {e}")
+            return 0
+
+
+def client_ip(request: Request) -> str:
+    if TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def enforce(*checks):
+    """
+    Raise 429 if any (limiter, key) pair is over its limit.
+    Every check is evaluated so each key is counted for this attempt.
+    """
+    retry_after = 0
+    for limiter, key in checks:
+        if key:
+            retry_after = max(retry_after, limiter.hit(key))
+    if retry_after:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many attempts. Please try again later.",
+            headers={"Retry-After": str(retry_after)}
+        )
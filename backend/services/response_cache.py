@@ -0,0 +1,152 @@
+"""
+Response Cache Service - Per-tenant cache for read-heavy list endpoints
+
+    @router.get("/customers")
+    @response_cache.cached("customers")
+    def get_all_customers(tenant_id: Optional[int] = None): ...
+
+    # in write handlers, after commit
+    response_cache.invalidate("customers", tenant_id)
+
+Entries are keyed by namespace, tenant, the request's DB tenant context
+(so row-level security can't leak one tenant's cached rows to another)
+and the handler's normalized arguments. Memory is bounded (LRU,
+RESPONSE_CACHE_MAX_ENTRIES) and every entry expires after its TTL.
+
+Invalidation bumps a generation counter per (namespace, tenant) instead
+of scanning entries; stale entries are simply never hit again and age
+out of the LRU. Invalidating a tenant also invalidates the namespace's
+unscoped (all-tenant) entries, but not other tenants'.
+
+With RESPONSE_CACHE_SHARED_INVALIDATION, invalidations are also sent
+over Postgres NOTIFY so every uvicorn worker drops them.
+"""
+
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+from config import RESPONSE_CACHE_TTL, RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_SHARED_INVALIDATION
+from db_connection import get_connection, release_connection, get_tenant_context, system_context
+from services import notify_listener
+
+INVALIDATION_CHANNEL = "response_cache_invalidation"
+
+ALL_TENANTS = "*"
+
+_entries = OrderedDict()  # key -> (expires_at, generations, value)
+_generations = {}         # (namespace, tenant) -> int
+_epoch = 0                # bumped by clear()
+_lock = threading.Lock()
+_subscribed = False
+
+_hits = 0
+_misses = 0
+
+
+def _generation(namespace: str, tenant) -> int:
+    return _generations.get((namespace, tenant), 0)
+
+
+def _current_generations(namespace: str, tenant) -> tuple:
+    # (everything, whole namespace, this tenant - or the unscoped lists when tenant is None)
+    return (_epoch, _generation(namespace, ALL_TENANTS), _generation(namespace, tenant))
+
+
+def _key(namespace: str, tenant, kwargs: dict) -> tuple:
+    params = tuple(sorted((k, v) for k, v in kwargs.items() if v is not None))
+    return (namespace, tenant, get_tenant_context(), params)
+
+
+def _subscribe():
+    global _subscribed
+    if _subscribed or not RESPONSE_CACHE_SHARED_INVALIDATION:
+        return
+    _subscribed = True
+    notify_listener.subscribe(INVALIDATION_CHANNEL, _on_invalidation)
+
+
+def cached(namespace: str, ttl: float = RESPONSE_CACHE_TTL):
+    """Cache a (sync) route handler's return value; its tenant_id kwarg (if any) scopes invalidation."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            global _hits, _misses
+            _subscribe()
+            tenant = kwargs.get("tenant_id")
+            key = _key(namespace, tenant, kwargs)
+            now = time.monotonic()
+
+            with _lock:
+                generations = _current_generations(namespace, tenant)
+                entry = _entries.get(key)
+                if entry and entry[0] > now and entry[1] == generations:
+                    _entries.move_to_end(key)
+                    _hits += 1
+                    return entry[2]
+                _misses += 1
+
+            value = func(*args, **kwargs)
+
+            with _lock:
+                # Skip storing if a write invalidated this namespace meanwhile
+                if _current_generations(namespace, tenant) == generations:
+                    _entries[key] = (now + ttl, generations, value)
+                    _entries.move_to_end(key)
+                    while len(_entries) > RESPONSE_CACHE_MAX_ENTRIES:
+                        _entries.popitem(last=False)
+            return value
+        return wrapper
+    return decorator
+
+
+def _invalidate_local(namespace: str, tenant_id=None):
+    with _lock:
+        if tenant_id is None:
+            _generations[(namespace, ALL_TENANTS)] = _generation(namespace, ALL_TENANTS) + 1
+        else:
+            # The tenant's entries and the unscoped lists that include its rows
+            _generations[(namespace, tenant_id)] = _generation(namespace, tenant_id) + 1
+            _generations[(namespace, None)] = _generation(namespace, None) + 1
+
+
+def _on_invalidation(payload):
+    if payload is None:
+        clear()
+        return
+    namespace, _, tenant = payload.partition(":")
+    _invalidate_local(namespace, int(tenant) if tenant else None)
+
+
+def invalidate(namespace: str, tenant_id: int = None):
+    """Drop cached responses for one tenant (or the whole namespace) in every worker."""
+    _invalidate_local(namespace, tenant_id)
+    if not RESPONSE_CACHE_SHARED_INVALIDATION:
+        return
+
+    conn = None
+    try:
+        with system_context():
+            conn = get_connection()
+        cursor = conn.cursor()
+        notify_listener.notify(cursor, INVALIDATION_CHANNEL, f"{namespace}:{tenant_id if tenant_id is not None else ''}")
+        conn.commit()
+    except Exception as e:
+        # Other workers fall back to TTL expiry
+        print(f"⚠️ Cache invalidation broadcast failed ({namespace}): {e}")
+    finally:
+        if conn:
+            release_connection(conn)
+
+
+def clear():
+    global _epoch
+    with _lock:
+        _epoch += 1
+        _entries.clear()
+
+
+def stats() -> dict:
+    with _lock:
+        return {"entries": len(_entries), "hits": _hits, "misses": _misses}
@@ -0,0 +1,294 @@
+"""
+Session Token Service - Signed, stateless session tokens (JWT, HS256)
+
+/auth/login issues a token carrying everything request handlers usually
+look up: user id, tenant id, name, role and the tenant's plan. Validation
+is a signature + expiry check and a lookup in an in-process revocation
+set, so authorizing a request costs no database round trip.
+
+Revocation (logout):
+- revoked_tokens holds the jti of every revoked, not yet expired token
+- revoke() inserts the row and NOTIFYs session_revocations with the jti
+- every process keeps the set in memory: loaded at startup
+  (start_revocation_sync(), from main.py), updated from NOTIFY
+  (services/notify_listener.py), and fully reloaded after a listener
+  reconnect and every SESSION_REVOCATION_REFRESH seconds by a background
+  thread. Token validation only ever reads the in-memory set
+
+Usage in routes:
+
+    @router.get("/things")
+    def get_things(session: dict = Depends(require_session)):
+        session["tenant_id"], session["user_id"], session["role"], ...
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+from config import (
+    ENVIRONMENT, SESSION_SECRET, SESSION_TTL_SECONDS, SESSION_REVOCATION_REFRESH, OPERATOR_TENANT_IDS
+)
+from db_connection import get_connection, release_connection
+from services import notify_listener
+
+REVOCATION_CHANNEL = "session_revocations"
+
+# Clock skew tolerated when checking exp
+LEEWAY_SECONDS = 30
+
+if SESSION_SECRET:
+    _secret = SESSION_SECRET.encode()
+elif ENVIRONMENT == "production":
+    # A per-process key fails tokens across uvicorn workers and logs everyone out on restart
+    raise RuntimeError("SESSION_SECRET must be set in production (the same value for every worker)")
+else:
+    print("⚠️ SESSION_SECRET not set - using a random per-process key; tokens won't survive a restart")
+    _secret = os.urandom(32)
+
+_HEADER = base64.urlsafe_b64encode(
+    json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode()
+).rstrip(b"=")
+
+
+class TokenError(Exception):
+    """Token is malformed, forged, expired or revoked."""
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+def _sign(signing_input: bytes) -> bytes:
+    return _b64encode(hmac.new(_secret, signing_input, hashlib.sha256).digest())
+
+
+def issue_token(user: dict, tenant: dict, ttl: int = SESSION_TTL_SECONDS) -> tuple:
+    """Create a token for a logged-in user. Returns (token, expires_at epoch seconds)."""
+    now = int(time.time())
+    claims = {
+        "sub": user["id"],
+        "tid": tenant["id"],
+        "name": user.get("name"),
+        "email": user.get("email"),
+        "role": user.get("role"),
+        "plan": tenant.get("plan"),
+        "jti": uuid.uuid4().hex,
+        "iat": now,
+        "exp": now + ttl,
+    }
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    signing_input = _HEADER + b"." + payload
+    return (signing_input + b"." + _sign(signing_input)).decode(), claims["exp"]
+
+
+def decode_token(token: str) -> dict:
+    """Verify a token and return its claims; raises TokenError."""
+    try:
+        header, payload, signature = token.encode().split(b".")
+    except ValueError:
+        raise TokenError("Malformed token")
+
+    if header != _HEADER or not hmac.compare_digest(signature, _sign(header + b"." + payload)):
+        raise TokenError("Invalid token signature")
+
+    try:
+        claims = json.loads(_b64decode(payload))
+    except ValueError:
+        raise TokenError("Malformed token")
+
+    if claims.get("exp", 0) + LEEWAY_SECONDS < time.time():
+        raise TokenError("Token expired")
+    if is_revoked(claims.get("jti")):
+        raise TokenError("Token revoked")
+    return claims
+
+
+# ============================================================
+# REVOCATION LIST
+# ============================================================
+
+_revoked = {}  # jti -> exp (epoch seconds)
+_revoked_lock = threading.Lock()
+_sync_lock = threading.Lock()
+_sync_started = False
+
+
+def _load_revocations():
+    """Replace the in-process set with the unexpired rows of revoked_tokens."""
+    global _revoked
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT jti, EXTRACT(EPOCH FROM expires_at)
+            FROM revoked_tokens WHERE expires_at > CURRENT_TIMESTAMP
+        """)
+        revoked = {jti: float(exp) for jti, exp in cursor.fetchall()}
+    finally:
+        if conn:
+            release_connection(conn)
+    with _revoked_lock:
+        _revoked = revoked
+
+
+def _on_revocation(payload: Optional[str]):
+    if payload is None:
+        _load_revocations()
+        return
+    jti, _, exp = payload.partition(":")
+    with _revoked_lock:
+        _revoked[jti] = float(exp or time.time() + SESSION_TTL_SECONDS)
+
+
+def _refresh_loop():
+    while True:
+        time.sleep(SESSION_REVOCATION_REFRESH)
+        try:
+            _load_revocations()
+        except Exception as e:
+            print(f"⚠️ Revocation list refresh failed (keeping the current one): {e}")
+
+
+def start_revocation_sync(load: bool = True):
+    """
+    Subscribe to revocation NOTIFYs and start the periodic reload thread
+    (once per process). With load=True the list is also loaded now, so
+    call it at startup rather than from a request.
+    """
+    global _sync_started
+    with _sync_lock:
+        if _sync_started:
+            return
+        _sync_started = True
+    notify_listener.subscribe(REVOCATION_CHANNEL, _on_revocation)
+    threading.Thread(target=_refresh_loop, name="session-revocations", daemon=True).start()
+    if load:
+        try:
+            _load_revocations()
+        except Exception as e:
+            print(f"⚠️ Revocation list load failed (the listener will retry): {e}")
+
+
+def is_revoked(jti: str) -> bool:
+    """In-memory lookup only; never touches the database."""
+    if not _sync_started:
+        # Not started at startup (scripts, tests): the listener's first
+        # connect loads the list in the background
+        start_revocation_sync(load=False)
+    with _revoked_lock:
+        exp = _revoked.get(jti)
+    return exp is not None and exp + LEEWAY_SECONDS >= time.time()
+
+
+def revoke(claims: dict):
+    """Revoke a token (by its claims) in every process."""
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO revoked_tokens (jti, user_id, expires_at)
+            VALUES (%s, %s, to_timestamp(%s))
+            ON CONFLICT (jti) DO NOTHING
+        """, (claims["jti"], claims["sub"], claims["exp"]))
+        cursor.execute("DELETE FROM revoked_tokens WHERE expires_at < CURRENT_TIMESTAMP - INTERVAL '1 day'")
+        notify_listener.notify(cursor, REVOCATION_CHANNEL, f"{claims['jti']}:{claims['exp']}")
+        conn.commit()
+    except Exception:
+        if conn:
+            conn.rollback()
+        raise
+    finally:
+        if conn:
+            release_connection(conn)
+
+    # Don't wait for our own NOTIFY to come back
+    with _revoked_lock:
+        _revoked[claims["jti"]] = float(claims["exp"])
+
+
+# ============================================================
+# FASTAPI DEPENDENCIES
+# ============================================================
+
+def _session_from_claims(claims: dict) -> dict:
+    return {
+        "user_id": claims["sub"],
+        "tenant_id": claims["tid"],
+        "name": claims.get("name"),
+        "email": claims.get("email"),
+        "role": claims.get("role"),
+        "plan": claims.get("plan"),
+        "jti": claims["jti"],
+        "exp": claims["exp"],
+    }
+
+
+def _bearer_token(authorization: Optional[str]) -> Optional[str]:
+    if not authorization:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return token.strip()
+
+
+def session_from_authorization(authorization: Optional[str]) -> Optional[dict]:
+    """Session for an Authorization header value, None if absent; raises TokenError if invalid."""
+    token = _bearer_token(authorization)
+    if token is None:
+        return None
+    return _session_from_claims(decode_token(token))
+
+
+def optional_session(authorization: Optional[str] = Header(None)) -> Optional[dict]:
+    """Dependency: the caller's session, or None when no token was sent."""
+    try:
+        return session_from_authorization(authorization)
+    except TokenError as e:
+        raise HTTPException(status_code=401, detail=str(e), headers={"WWW-Authenticate": "Bearer"})
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Session check unavailable: {str(e)}")
+
+
+def require_session(authorization: Optional[str] = Header(None)) -> dict:
+    """Dependency: the caller's session; 401 without a valid token."""
+    session = optional_session(authorization)
+    if session is None:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    return session
+
+
+def require_admin(authorization: Optional[str] = Header(None)) -> dict:
+    """Dependency: like require_session, but only for role 'admin'."""
+    session = require_session(authorization)
+    if session["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Admin role required")
+    return session
+
+
+def is_operator(session: Optional[dict]) -> bool:
+    """An admin of one of the OPERATOR_TENANT_IDS (any tenant can create its own admins)."""
+    return bool(session) and session["role"] == "admin" and session["tenant_id"] in OPERATOR_TENANT_IDS
+
+
+def require_operator(authorization: Optional[str] = Header(None)) -> dict:
+    """Dependency: like require_admin, but only for admins of an operator tenant."""
+    session = require_session(authorization)
+    if not is_operator(session):
+        raise HTTPException(status_code=403, detail="Operator access required")
+    return session
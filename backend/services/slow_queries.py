@@ -0,0 +1,169 @@
+"""
+Slow Query Service - Logs slow statements and samples their query plans
+
+db_connection.InstrumentedCursor calls record() for every statement that
+ran longer than SLOW_QUERY_THRESHOLD_MS. Each one is logged with its
+normalized SQL (literals replaced by ?), the shape of its parameters
+(types only, never values), its row count and the function that ran it
+(e.g. routes.new_job.get_all_new_jobs).
+
+With SLOW_QUERY_EXPLAIN_SAMPLE_RATE > 0, a sample of the slow read-only
+statements is re-run as EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) and the
+plan is stored in slow_query_plans (migrations/011_create_slow_query_plans.sql):
+- scrubbed first: psycopg2 interpolates parameters client-side, so conditions
+  like Filter / Index Cond hold the literal values (emails, names, BL numbers);
+  every string in the plan gets the same ? replacement as the normalized SQL
+- on a separate connection in a background thread, so the request isn't delayed
+- under the request's tenant context, in a READ ONLY transaction that is rolled back
+- only SELECT / WITH statements without writes or row locks (ANALYZE executes them)
+- one capture in flight per process, SLOW_QUERY_EXPLAIN_PER_MINUTE overall
+  (services/rate_limiter.py) and a statement_timeout on each
+"""
+
+import contextvars
+import random
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from psycopg2.extras import Json
+
+from config import (
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE, SLOW_QUERY_EXPLAIN_PER_MINUTE, SLOW_QUERY_EXPLAIN_TIMEOUT_MS
+)
+from db_connection import get_connection, release_connection
+from services import tracing
+from services.rate_limiter import RateLimiter
+
+# Stored plans are kept this long
+PLAN_RETENTION_DAYS = 30
+
+MAX_SQL_LENGTH = 2000
+MAX_SHAPE_LENGTH = 500
+
+_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+_READ_ONLY = re.compile(r"^\s*(SELECT|WITH)\b", re.I)
+_WRITES = re.compile(
+    r"\b(INSERT|UPDATE|DELETE|MERGE|nextval|setval|set_config|pg_notify)\b|\bFOR\s+(NO\s+KEY\s+)?(UPDATE|SHARE|KEY)\b",
+    re.I
+)
+
+_explain_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+_explain_slot = threading.BoundedSemaphore(1)
+_explain_limiter = RateLimiter("slow_query_explain", SLOW_QUERY_EXPLAIN_PER_MINUTE, 60)
+
+
+def _sql_text(query, cursor) -> str:
+    if isinstance(query, bytes):
+        return query.decode("utf-8", errors="replace")
+    if isinstance(query, str):
+        return query
+    try:
+        return query.as_string(cursor)  # psycopg2.sql.Composed
+    except Exception:
+        return str(query)
+
+
+def normalize_sql(sql: str) -> str:
+    """SQL with comments dropped, literals replaced by ? and whitespace collapsed."""
+    sql = _COMMENT.sub(" ", sql)
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    return _WHITESPACE.sub(" ", sql).strip()[:MAX_SQL_LENGTH]
+
+
+def scrub_plan(plan):
+    """An EXPLAIN (FORMAT JSON) plan with quoted and numeric literals in its strings replaced by ?."""
+    if isinstance(plan, dict):
+        return {key: scrub_plan(value) for key, value in plan.items()}
+    if isinstance(plan, list):
+        return [scrub_plan(value) for value in plan]
+    if isinstance(plan, str):
+        return _NUMBER.sub("?", _STRING.sub("?", plan))
+    return plan
+
+
+def _type_name(value) -> str:
+    if isinstance(value, (list, tuple)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def params_shape(params) -> str:
+    """Parameter types without their values, e.g. (int, str, list[3])."""
+    if params is None:
+        return ""
+    if isinstance(params, dict):
+        shape = "{" + ", ".join(f"{k}: {_type_name(v)}" for k, v in params.items()) + "}"
+    elif isinstance(params, (list, tuple)):
+        shape = "(" + ", ".join(_type_name(v) for v in params) + ")"
+    else:
+        shape = _type_name(params)
+    return shape[:MAX_SHAPE_LENGTH]
+
+
+def record(cursor, query, params, seconds: float, query_name: str, explain: bool = True):
+    """Log one slow statement and maybe sample its plan."""
+    sql = _sql_text(query, cursor)
+    normalized = normalize_sql(sql)
+    shape = params_shape(params)
+    duration_ms = seconds * 1000
+    trace_id = tracing.current_trace_id()
+    print(f"🐢 Slow query {duration_ms:.0f}ms in {query_name} "
+          f"(rows={cursor.rowcount}, params={shape or '-'}{f', trace_id={trace_id}' if trace_id else ''}): {normalized}")
+
+    # Never sample the capture's own statements
+    if explain and not query_name.startswith(__name__) and _should_explain(sql):
+        args = (sql, params, query_name, normalized, shape, duration_ms, cursor.rowcount)
+        try:
+            _explain_pool.submit(contextvars.copy_context().run, _capture, *args)
+        except RuntimeError as e:  # interpreter shutting down
+            _explain_slot.release()
+            print(f"⚠️ Slow query plan capture skipped ({query_name}): {e}")
+
+
+def _should_explain(sql: str) -> bool:
+    """Sampling and rate limits; on True the caller holds the capture slot."""
+    if SLOW_QUERY_EXPLAIN_SAMPLE_RATE <= 0 or random.random() >= SLOW_QUERY_EXPLAIN_SAMPLE_RATE:
+        return False
+    if not _READ_ONLY.match(sql) or _WRITES.search(sql):
+        return False
+    if not _explain_slot.acquire(blocking=False):
+        return False
+    if _explain_limiter.hit("all"):
+        _explain_slot.release()
+        return False
+    return True
+
+
+def _capture(sql, params, query_name, normalized, shape, duration_ms, row_count):
+    """Re-run the statement under EXPLAIN ANALYZE and store the plan (background thread)."""
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SET TRANSACTION READ ONLY")
+        cursor.execute("SET LOCAL statement_timeout = %s", (SLOW_QUERY_EXPLAIN_TIMEOUT_MS,))
+        cursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql, params)
+        plan = scrub_plan(cursor.fetchone()[0])
+        conn.rollback()
+
+        cursor.execute("""
+            INSERT INTO slow_query_plans (query_name, normalized_sql, params_shape, duration_ms, row_count, plan,
+                                          literals_scrubbed)
+            VALUES (%s, %s, %s, %s, %s, %s, TRUE)
+        """, (query_name[:200], normalized, shape, round(duration_ms, 2), row_count, Json(plan)))
+        cursor.execute("DELETE FROM slow_query_plans WHERE captured_at < CURRENT_TIMESTAMP - make_interval(days => %s)",
+                       (PLAN_RETENTION_DAYS,))
+        conn.commit()
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        print(f"⚠️ Slow query plan capture failed ({query_name}): {e}")
+    finally:
+        if conn:
+            release_connection(conn)
+        _explain_slot.release()
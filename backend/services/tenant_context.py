@@ -0,0 +1,58 @@
+"""
+Tenant Context Middleware - Scopes every request's database work to one tenant
+
+Sets db_connection's tenant context for the duration of the request, so
+each connection checked out while handling it runs under the row-level
+security policies for that tenant:
+
+1. Bearer session token (services/session_tokens.py) -> its tenant
+2. Otherwise, unless TENANT_ISOLATION_STRICT, the legacy ?tenant_id= query parameter
+3. Otherwise unscoped: no tenant rows visible
+
+Invalid tokens are ignored here; require_session rejects them with 401.
+Pure ASGI, so the context var is visible to sync handlers (run in the
+threadpool with a copy of the context) and to streaming response bodies.
+"""
+
+from urllib.parse import parse_qs
+
+from config import TENANT_ISOLATION_STRICT
+from db_connection import set_tenant_context, reset_tenant_context
+from services.session_tokens import session_from_authorization
+
+
+def _tenant_from_scope(scope):
+    headers = dict(scope.get("headers") or [])
+    authorization = headers.get(b"authorization")
+    if authorization:
+        try:
+            session = session_from_authorization(authorization.decode("latin-1"))
+            if session:
+                return session["tenant_id"]
+        except Exception:
+            pass
+
+    if not TENANT_ISOLATION_STRICT:
+        values = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("tenant_id")
+        if values:
+            try:
+                return int(values[0])
+            except ValueError:
+                pass
+    return None
+
+
+class TenantContextMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = set_tenant_context(_tenant_from_scope(scope))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            reset_tenant_context(token)
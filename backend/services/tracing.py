@@ -0,0 +1,194 @@
+"""
+Tracing Service - OpenTelemetry spans for requests, DB work, OCR and uploads
+
+Off unless TRACING_EXPORTER is set:
+- "otlp":    OTLP/HTTP to a local collector (OTEL_EXPORTER_OTLP_ENDPOINT,
+             default http://localhost:4318; needs opentelemetry-exporter-otlp-proto-http)
+- "file":    one JSON span per line appended to TRACING_FILE
+- "console": spans printed to stdout
+
+Spans:
+- TracingMiddleware: one server span per request ("GET /api/new-jobs/{job_id}"),
+  continuing an incoming W3C traceparent; the trace id is returned in X-Trace-Id
+- db.get_connection and db.query (db_connection.py)
+- ocr.* (services/document_ai.py, services/ocr_backends.py) and upload.* (routes/upload.py)
+
+Log correlation: records from the logging module (uvicorn's access and
+error logs) are prefixed with [trace_id=...] while a span is active, and
+current_trace_id() is available for print-style log lines.
+
+When tracing is off, or opentelemetry isn't installed, span() returns a
+shared no-op context manager, so the call sites cost next to nothing.
+"""
+
+import contextlib
+import functools
+import logging
+import os
+
+from config import TRACING_EXPORTER, TRACING_FILE, TRACING_SAMPLE_RATIO
+from services.metrics import route_template
+
+try:
+    from opentelemetry import propagate, trace
+except ImportError:  # optional dependency
+    propagate = trace = None
+
+SERVICE_NAME = "4s-logistics-api"
+
+# Longest SQL text attached to db.query spans
+MAX_STATEMENT_LENGTH = 1000
+
+_NOOP = contextlib.nullcontext()
+_tracer = None
+
+
+def enabled() -> bool:
+    return _tracer is not None
+
+
+def _exporter():
+    if TRACING_EXPORTER == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter()
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+    if TRACING_EXPORTER == "file":
+        out = open(TRACING_FILE, "a", encoding="utf-8")
+        return ConsoleSpanExporter(out=out, formatter=lambda span: span.to_json(indent=None) + "\n")
+    if TRACING_EXPORTER == "console":
+        return ConsoleSpanExporter()
+    raise ValueError(f"Unknown TRACING_EXPORTER '{TRACING_EXPORTER}'. Must be one of: otlp, file, console")
+
+
+def init_tracing() -> bool:
+    """Install the tracer provider and exporter from config. Returns True if tracing is on."""
+    global _tracer
+    if _tracer is not None:
+        return True
+    if not TRACING_EXPORTER:
+        return False
+    if trace is None:
+        print("⚠️ TRACING_EXPORTER is set but opentelemetry is not installed - tracing disabled")
+        return False
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+        provider = TracerProvider(
+            resource=Resource.create({"service.name": os.getenv("OTEL_SERVICE_NAME", SERVICE_NAME)}),
+            sampler=ParentBased(TraceIdRatioBased(TRACING_SAMPLE_RATIO)),
+        )
+        provider.add_span_processor(BatchSpanProcessor(_exporter()))
+    except Exception as e:
+        print(f"⚠️ Tracing setup failed - tracing disabled: {e}")
+        return False
+
+    trace.set_tracer_provider(provider)
+    _tracer = trace.get_tracer(__name__)
+    _install_log_correlation()
+    print(f"🔭 Tracing enabled ({TRACING_EXPORTER})")
+    return True
+
+
+# ============================================================
+# SPANS
+# ============================================================
+
+def span(name: str, **attributes):
+    """Context manager for a child span of the current one (no-op when tracing is off)."""
+    if _tracer is None:
+        return _NOOP
+    return _tracer.start_as_current_span(name, attributes=attributes or None)
+
+
+def traced(name: str):
+    """Decorator form of span()."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def db_span(query_name: str, query):
+    """Span around one statement; the SQL text is attached without its parameters."""
+    if _tracer is None:
+        return _NOOP
+    attributes = {"db.system": "postgresql", "db.operation.name": query_name}
+    if isinstance(query, str):
+        attributes["db.query.text"] = query.strip()[:MAX_STATEMENT_LENGTH]
+    return _tracer.start_as_current_span("db.query", attributes=attributes)
+
+
+def current_trace_id() -> str:
+    """Hex trace id of the active span, or '' when there is none."""
+    if _tracer is None:
+        return ""
+    context = trace.get_current_span().get_span_context()
+    return format(context.trace_id, "032x") if context.is_valid else ""
+
+
+# ============================================================
+# LOG CORRELATION
+# ============================================================
+
+class _TraceIdFilter(logging.Filter):
+    def filter(self, record):
+        trace_id = current_trace_id()
+        if trace_id and not getattr(record, "trace_id", None):
+            record.trace_id = trace_id
+            record.msg = f"[trace_id={trace_id}] {record.msg}"
+        return True
+
+
+def _install_log_correlation():
+    log_filter = _TraceIdFilter()
+    for name in ("", "uvicorn", "uvicorn.error", "uvicorn.access"):
+        for handler in logging.getLogger(name).handlers:
+            handler.addFilter(log_filter)
+
+
+# ============================================================
+# ASGI MIDDLEWARE
+# ============================================================
+
+class TracingMiddleware:
+    """Server span per HTTP request. Pure ASGI; the span is current for the whole request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or _tracer is None:
+            await self.app(scope, receive, send)
+            return
+
+        carrier = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope.get("headers") or []}
+        method = scope["method"]
+
+        with _tracer.start_as_current_span(
+            method,
+            context=propagate.extract(carrier),
+            kind=trace.SpanKind.SERVER,
+            attributes={"http.request.method": method, "url.path": scope["path"]},
+        ) as request_span:
+            trace_id = current_trace_id().encode()
+
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    request_span.set_attribute("http.response.status_code", message["status"])
+                    if message["status"] >= 500:
+                        request_span.set_status(trace.Status(trace.StatusCode.ERROR))
+                    message = {**message, "headers": list(message.get("headers", [])) + [(b"x-trace-id", trace_id)]}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                template = route_template(scope)
+                request_span.set_attribute("http.route", template)
+                request_span.update_name(f"{method} {template}")
@@ -60,6 +60,13 @@ interface Job {
   created_at: string;
 }
 
+// Columns the grid uses; the API returns only these (?fields=)
+const JOB_LIST_FIELDS = [
+  "id", "tenant_id", "job_no", "customer_id", "customer_name", "bl_file_path",
+  "packing_list_path", "incoterm", "invoice_path", "freight_payment_path",
+  "misc_charges_amount", "status", "created_at",
+].join(",");
+
 interface Customer {
   id: number;
   company_name: string;
@@ -158,8 +165,8 @@ export default function JobList() {
     try {
       const tenantId = getTenantId();
       const url = tenantId
-        ? `${API_URL}/new-jobs?tenant_id=${tenantId}`
-        : `${API_URL}/new-jobs`;
+        ? `${API_URL}/new-jobs?tenant_id=${tenantId}&fields=${JOB_LIST_FIELDS}`
+        : `${API_URL}/new-jobs?fields=${JOB_LIST_FIELDS}`;
 
       const response = await fetch(url);
       if (response.ok) {